@@ -0,0 +1,199 @@
+"""
+Parallel ingestion of Affymetrix .CEL files into one samples x probes matrix.
+
+Each chip is parsed in a worker process and its flattened intensities are
+written straight into its row of a preallocated memory-mapped .npy file.
+A JSON sidecar index records, per row, the chip name, its condition
+directory (Acetate, Proline, wt-Anaerobic, ...) and whether it has been
+ingested, so an interrupted run resumes with the chips still missing.
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+from pathlib import Path
+
+import numpy as np
+
+MATRIX = "intensities.npy"
+INDEX = "index.json"
+
+
+def find_cel_files(root):
+    """
+    Returns (condition, path) pairs for every .CEL file below root, where the
+    condition is the name of the directory containing the file.
+    """
+    root = Path(root)
+    found = [p for p in root.rglob("*") if p.suffix.lower() == ".cel" and p.is_file()]
+    return sorted((p.parent.name, p) for p in found)
+
+
+def read_intensities(path):
+    """
+    Reads a .CEL file with Bio.Affy and returns its intensities as a flat array.
+    """
+    from Bio.Affy import CelFile
+
+    try:
+        with open(path, "r") as handle:
+            c = CelFile.read(handle)
+    except (UnicodeDecodeError, ValueError):
+        # Version 4 files are binary
+        with open(path, "rb") as handle:
+            c = CelFile.read(handle)
+    return np.asarray(c.intensities).ravel()
+
+
+def _write_row(values, matrix_path, row):
+    try:
+        out = np.load(matrix_path, mmap_mode="r+")
+        if values.size != out.shape[1]:
+            raise ValueError(f"expected {out.shape[1]} probes, got {values.size}")
+        out[row] = values
+        out.flush()
+        del out
+    except Exception as e:
+        return row, "failed", f"{type(e).__name__}: {e}"
+    return row, "done", None
+
+
+def _ingest_one(path, matrix_path, row):
+    try:
+        values = read_intensities(path)
+    except Exception as e:
+        return row, "failed", f"{type(e).__name__}: {e}"
+    return _write_row(values, matrix_path, row)
+
+
+def _write_index(out_dir, index):
+    path = Path(out_dir) / INDEX
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w") as handle:
+        json.dump(index, handle, indent=1)
+    os.replace(tmp, path)
+
+
+def _ensure_matrix(matrix_path, n_rows, n_probes, dtype):
+    if matrix_path.exists():
+        old = np.load(matrix_path, mmap_mode="r")
+        if old.shape[0] >= n_rows:
+            return
+        # More chips than rows: copy the ingested rows into a larger matrix
+        tmp = matrix_path.with_name(matrix_path.name + ".tmp")
+        new = np.lib.format.open_memmap(tmp, mode="w+", dtype=old.dtype, shape=(n_rows, n_probes))
+        new[:old.shape[0]] = old
+        new.flush()
+        del new, old
+        os.replace(tmp, matrix_path)
+    else:
+        out = np.lib.format.open_memmap(matrix_path, mode="w+", dtype=dtype, shape=(n_rows, n_probes))
+        del out
+
+
+def ingest(root, out_dir, n_jobs=None, dtype=np.float32, retry_failed=False):
+    """
+    Ingests every .CEL file below root into out_dir/intensities.npy.
+
+    Chips already marked as done in out_dir/index.json are skipped, so the
+    call can be repeated after an interruption or when new chips arrive.
+
+    Parameters:
+    -----------
+    root : str or Path
+        Directory searched recursively for .CEL files.
+
+    out_dir : str or Path
+        Directory of the matrix and its index.
+
+    n_jobs : int, optional (default=None)
+        Number of worker processes. None uses all CPUs.
+
+    dtype : numpy dtype, optional (default=np.float32)
+        Storage dtype of a newly created matrix.
+
+    retry_failed : bool, optional (default=False)
+        Whether to parse chips again that failed in a previous run.
+
+    Returns:
+    --------
+    index : dict
+        The sidecar index, with one entry per matrix row under 'chips'.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    matrix_path = out_dir / MATRIX
+    index_path = out_dir / INDEX
+    if index_path.exists():
+        with open(index_path) as handle:
+            index = json.load(handle)
+    else:
+        index = {"n_probes": None, "chips": []}
+
+    known = {(c["condition"], c["chip"]) for c in index["chips"]}
+    for condition, path in find_cel_files(root):
+        if (condition, path.stem) not in known:
+            index["chips"].append({"row": len(index["chips"]), "chip": path.stem, "condition": condition,
+                                   "path": str(path), "status": "pending", "error": None})
+    skip = {"done"} if retry_failed else {"done", "failed"}
+    pending = [c for c in index["chips"] if c["status"] not in skip]
+    if not pending:
+        return index
+
+    probe = None
+    if index["n_probes"] is None:
+        # The first readable chip sets the number of probes; unreadable ones fail as in the workers
+        for i, chip in enumerate(pending):
+            try:
+                values = read_intensities(chip["path"])
+            except Exception as e:
+                chip.update(status="failed", error=f"{type(e).__name__}: {e}")
+                continue
+            index["n_probes"] = int(values.size)
+            probe, pending = (chip, values), pending[i + 1:]
+            break
+        else:
+            _write_index(out_dir, index)
+            return index
+    _ensure_matrix(matrix_path, len(index["chips"]), index["n_probes"], dtype)
+    if probe is not None:
+        # Already parsed, so written here rather than parsed again by a worker
+        chip, values = probe
+        _, status, error = _write_row(values, matrix_path, chip["row"])
+        chip.update(status=status, error=error)
+    _write_index(out_dir, index)
+    if not pending:
+        return index
+
+    # Spawned: a forked worker deadlocks if the caller already runs numba or BLAS threads
+    with ProcessPoolExecutor(max_workers=n_jobs, mp_context=get_context("spawn")) as executor:
+        futures = [executor.submit(_ingest_one, c["path"], matrix_path, c["row"]) for c in pending]
+        for future in as_completed(futures):
+            row, status, error = future.result()
+            index["chips"][row].update(status=status, error=error)
+            _write_index(out_dir, index)
+    return index
+
+
+def load_intensities(out_dir):
+    """
+    Returns the read-only memory-mapped matrix and the index of an ingested directory.
+    """
+    out_dir = Path(out_dir)
+    with open(out_dir / INDEX) as handle:
+        index = json.load(handle)
+    return np.load(out_dir / MATRIX, mmap_mode="r"), index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest .CEL files into a samples x probes matrix")
+    parser.add_argument("root")
+    parser.add_argument("out_dir")
+    parser.add_argument("--n-jobs", type=int, default=None)
+    parser.add_argument("--retry-failed", action="store_true")
+    args = parser.parse_args()
+    index = ingest(args.root, args.out_dir, n_jobs=args.n_jobs, retry_failed=args.retry_failed)
+    done = sum(c["status"] == "done" for c in index["chips"])
+    print(f"{done}/{len(index['chips'])} chips ingested")
@@ -0,0 +1,219 @@
+"""
+Binary, memory-mapped store for the gravier_csv datasets.
+
+The first load of a dataset parses its CSV once and writes the feature
+matrix and the label codes as .npy files next to a small JSON metadata file
+(feature names, classes, shape, source state). Later loads memory-map the
+matrix read-only. The store is rebuilt when the source's mtime or size
+changes and its content hash differs from the recorded one. A dataset has one
+source: its CSV when there is one, else its .RData file, decoded by
+Datasets.rdata.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+CSV_DIR = Path(__file__).resolve().parents[2] / "data" / "gravier" / "gravier_csv"
+# Expression values need no more than single precision; selectors accumulate in float64
+DEFAULT_DTYPE = np.float32
+
+
+def _paths(name, cache_dir, dtype):
+    cache_dir = Path(cache_dir)
+    return {
+        "meta": cache_dir / f"{name}.json",
+        "y": cache_dir / f"{name}.y.npy",
+        "X": cache_dir / f"{name}.X.{np.dtype(dtype).name}.npy",
+    }
+
+
+def _file_hash(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _atomic_save(path, array):
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as handle:
+        np.save(handle, array)
+    os.replace(tmp, path)
+
+
+def _atomic_write_json(path, data):
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w") as handle:
+        json.dump(data, handle)
+    os.replace(tmp, path)
+
+
+def _label_codes(labels):
+    classes, codes = np.unique(labels, return_inverse=True)
+    code_dtype = np.int8 if len(classes) <= np.iinfo(np.int8).max else np.int32
+    return classes, codes.astype(code_dtype)
+
+
+def list_datasets(csv_dir=None):
+    """
+    Returns the names of the CSV datasets in csv_dir.
+    """
+    return sorted(p.stem for p in Path(csv_dir or CSV_DIR).glob("*.csv"))
+
+
+def write_store(source_path, stat, cache_dir, dtype, X, labels, feature_names, label_name):
+    """
+    Writes a parsed dataset into the binary store, named after its source file.
+
+    Parameters:
+    -----------
+    source_path : Path
+        The CSV or .RData file the dataset was read from.
+
+    stat : os.stat_result
+        Stat of source_path taken before it was read.
+
+    X : ndarray of shape (n_samples, n_features)
+        Feature matrix in the storage dtype.
+
+    labels : array-like of shape (n_samples,)
+        Class labels, stored as integer codes.
+
+    Returns:
+    --------
+    meta : dict
+        The metadata written next to the arrays.
+    """
+    source_path = Path(source_path)
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    name = source_path.stem
+    paths = _paths(name, cache_dir, dtype)
+    classes, codes = _label_codes(np.asarray(labels))
+
+    # Matrices of other dtypes belong to the old contents
+    for old in cache_dir.glob(f"{name}.X.*.npy"):
+        old.unlink()
+    _atomic_save(paths["X"], X)
+    _atomic_save(paths["y"], codes)
+    meta = {
+        "name": name,
+        "shape": list(X.shape),
+        "feature_names": list(feature_names),
+        "label_name": label_name,
+        "classes": classes.tolist(),
+        "source": {"path": str(source_path), "mtime_ns": stat.st_mtime_ns, "size": stat.st_size,
+                   "sha1": _file_hash(source_path)},
+    }
+    _atomic_write_json(paths["meta"], meta)
+    return meta
+
+
+def convert_csv(csv_path, cache_dir, dtype=DEFAULT_DTYPE):
+    """
+    Parses one CSV (features first, label in the last column) into the binary store.
+
+    Returns the metadata dictionary written next to the arrays.
+    """
+    csv_path = Path(csv_path)
+    stat = csv_path.stat()
+    df = pd.read_csv(csv_path)
+    return write_store(csv_path, stat, cache_dir, dtype, df.iloc[:, :-1].to_numpy(dtype=dtype),
+                       df.iloc[:, -1].to_numpy(), df.columns[:-1].tolist(), df.columns[-1])
+
+
+def _is_current(meta, source_path, meta_path):
+    stat = source_path.stat()
+    source = meta["source"]
+    if source["mtime_ns"] == stat.st_mtime_ns and source["size"] == stat.st_size:
+        return True
+    if source["size"] != stat.st_size or source["sha1"] != _file_hash(source_path):
+        return False
+    # Touched but unchanged: only refresh the recorded mtime
+    source["mtime_ns"] = stat.st_mtime_ns
+    _atomic_write_json(meta_path, meta)
+    return True
+
+
+def load_metadata(name, csv_dir=None, cache_dir=None, dtype=DEFAULT_DTYPE):
+    """
+    Returns the metadata of a dataset, converting its CSV (or, without one,
+    its .RData file) first if needed.
+    """
+    csv_dir = Path(csv_dir or CSV_DIR)
+    cache_dir = Path(cache_dir or csv_dir / ".cache")
+    csv_path = csv_dir / f"{name}.csv"
+    paths = _paths(name, cache_dir, dtype)
+
+    meta = None
+    if paths["meta"].exists() and paths["y"].exists():
+        with open(paths["meta"]) as handle:
+            meta = json.load(handle)
+        recorded = Path(meta["source"]["path"])
+        if csv_path.exists() and recorded.suffix != ".csv":
+            # Converted from the .RData file; the CSV is the source when there is one
+            meta = None
+        elif recorded.exists() and not _is_current(meta, recorded, paths["meta"]):
+            meta = None
+    if meta is None:
+        return _convert(csv_path, cache_dir, dtype)
+    if not paths["X"].exists():
+        # Cast an already stored matrix at least as precise rather than parsing the CSV again
+        itemsize = np.dtype(dtype).itemsize
+        stored = [np.load(path, mmap_mode="r") for path in sorted(cache_dir.glob(f"{name}.X.*.npy"))]
+        stored = [X for X in stored if X.dtype.itemsize >= itemsize]
+        if stored:
+            _atomic_save(paths["X"], stored[0].astype(dtype))
+        elif csv_path.exists():
+            _atomic_save(paths["X"], pd.read_csv(csv_path).iloc[:, :-1].to_numpy(dtype=dtype))
+        else:
+            return _convert(csv_path, cache_dir, dtype)
+    return meta
+
+
+def _convert(csv_path, cache_dir, dtype):
+    if not csv_path.exists():
+        from .rdata import RDATA_DIR, convert_rdata
+
+        rdata_path = RDATA_DIR / f"{csv_path.stem}.RData"
+        if rdata_path.exists():
+            return convert_rdata(rdata_path, cache_dir, dtype)
+    return convert_csv(csv_path, cache_dir, dtype)
+
+
+def load_dataset(name, csv_dir=None, cache_dir=None, dtype=DEFAULT_DTYPE):
+    """
+    Loads a gravier_csv dataset as (X, y) without copying.
+
+    Parameters:
+    -----------
+    name : str
+        Dataset name, e.g. 'alon'.
+
+    csv_dir : str or Path, optional (default=None)
+        Directory with the CSV files. Defaults to data/gravier/gravier_csv.
+
+    cache_dir : str or Path, optional (default=None)
+        Directory of the binary store. Defaults to csv_dir/.cache.
+
+    dtype : numpy dtype, optional (default=DEFAULT_DTYPE, float32)
+        Storage dtype of the feature matrix.
+
+    Returns:
+    --------
+    X : read-only memory-mapped array of shape (n_samples, n_features)
+
+    y : read-only memory-mapped array of shape (n_samples,)
+        Integer class codes indexing load_metadata(name)['classes'].
+    """
+    csv_dir = Path(csv_dir or CSV_DIR)
+    cache_dir = Path(cache_dir or csv_dir / ".cache")
+    load_metadata(name, csv_dir, cache_dir, dtype)
+    paths = _paths(name, cache_dir, dtype)
+    return np.load(paths["X"], mmap_mode="r"), np.load(paths["y"], mmap_mode="r")
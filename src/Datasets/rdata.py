@@ -0,0 +1,349 @@
+"""
+Pure-Python reader for .RData files (XDR serialization, format versions 2 and 3).
+
+Replaces the rpy2 round trip of data/gravier/converting.ipynb, which loaded
+every file in R, wrote it out with write.csv and parsed the text back. The
+gzip, bzip2 or xz stream is decompressed on the fly and numeric vectors are
+read straight into NumPy arrays. convert_all writes the gravier datasets
+without a gravier_csv export into the binary store of Datasets.loader, one
+process per file; the others are stored from their CSV, their one source:
+
+    cd src
+    python -m Datasets.rdata --n-jobs 8
+"""
+
+import argparse
+import bz2
+import gzip
+import lzma
+import re
+import struct
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+import numpy as np
+
+from . import loader
+
+RDATA_DIR = Path(__file__).resolve().parents[2] / "data" / "gravier" / "RData"
+
+# SEXP types
+NILSXP, SYMSXP, LISTSXP, CLOSXP, ENVSXP, PROMSXP, LANGSXP = 0, 1, 2, 3, 4, 5, 6
+CHARSXP, LGLSXP, INTSXP, REALSXP, CPLXSXP, STRSXP = 9, 10, 13, 14, 15, 16
+DOTSXP, VECSXP, EXPRSXP, RAWSXP, S4SXP = 17, 19, 20, 24, 25
+# Serialization pseudo-types
+ALTREP_SXP, ATTRLISTSXP, ATTRLANGSXP = 238, 239, 240
+BASEENV_SXP, EMPTYENV_SXP, BASENAMESPACE_SXP = 241, 242, 250
+MISSINGARG_SXP, UNBOUNDVALUE_SXP, GLOBALENV_SXP, NILVALUE_SXP, REFSXP = 251, 252, 253, 254, 255
+NAMESPACESXP, PACKAGESXP, PERSISTSXP = 249, 248, 247
+
+NA_INTEGER = -(1 << 31)
+_INVALID_NAME_CHARS = re.compile(r"[^\w.]")
+_PAIRS = (LISTSXP, LANGSXP, CLOSXP, PROMSXP, DOTSXP, ATTRLISTSXP, ATTRLANGSXP)
+_NUMERIC = {LGLSXP: ">i4", INTSXP: ">i4", REALSXP: ">f8", CPLXSXP: ">c16"}
+_SPECIAL = {NILVALUE_SXP: None, EMPTYENV_SXP: "<emptyenv>", BASEENV_SXP: "<baseenv>",
+            GLOBALENV_SXP: "<globalenv>", UNBOUNDVALUE_SXP: "<unbound>", MISSINGARG_SXP: "<missing>",
+            BASENAMESPACE_SXP: "<basenamespace>"}
+
+
+class RObject:
+    """
+    A decoded R value: value is a NumPy array for logical, integer, double and
+    complex vectors, a list for character vectors and lists, and a list of
+    (tag, value) pairs for pairlists. attributes maps names to RObjects.
+    """
+
+    __slots__ = ("type", "value", "attributes")
+
+    def __init__(self, type, value, attributes=None):
+        self.type = type
+        self.value = value
+        self.attributes = attributes or {}
+
+    def attr(self, name, default=None):
+        value = self.attributes.get(name)
+        return default if value is None else value.value
+
+    def __repr__(self):
+        return f"RObject(type={self.type}, attributes={sorted(self.attributes)})"
+
+
+def open_stream(path):
+    """
+    Opens an .RData file, decompressing gzip, bzip2 or xz by its magic bytes.
+    """
+    with open(path, "rb") as handle:
+        magic = handle.read(6)
+    if magic[:2] == b"\x1f\x8b":
+        return gzip.open(path, "rb")
+    if magic[:3] == b"BZh":
+        return bz2.open(path, "rb")
+    if magic == b"\xfd7zXZ\x00":
+        return lzma.open(path, "rb")
+    return open(path, "rb")
+
+
+class _Parser:
+    def __init__(self, stream):
+        self.stream = stream
+        self.refs = []
+
+    def read(self, n):
+        data = self.stream.read(n)
+        if len(data) != n:
+            raise EOFError("Truncated RData stream")
+        return data
+
+    def int(self):
+        return struct.unpack(">i", self.read(4))[0]
+
+    def length(self):
+        n = self.int()
+        if n == -1:
+            high, low = struct.unpack(">II", self.read(8))
+            n = (high << 32) + low
+        return n
+
+    def header(self):
+        magic = self.read(5)
+        if magic not in (b"RDX2\n", b"RDX3\n"):
+            raise ValueError(f"Not an RData file (magic {magic!r})")
+        if self.read(2) != b"X\n":
+            raise ValueError("Only the XDR (binary, big-endian) RData format is supported")
+        version = self.int()
+        self.int()  # R version that wrote the file
+        self.int()  # minimal R version to read it
+        if version == 3:
+            self.read(self.int())  # native encoding
+        elif version != 2:
+            raise ValueError(f"Unsupported serialization version {version}")
+
+    def attributes(self, has_attr):
+        if not has_attr:
+            return {}
+        pairs = self.item()
+        return {tag: value for tag, value in pairs.value} if pairs is not None else {}
+
+    def item(self):
+        flags = self.int()
+        kind = flags & 0xFF
+        has_attr, has_tag = bool(flags & (1 << 9)), bool(flags & (1 << 10))
+
+        if kind in _SPECIAL:
+            return _SPECIAL[kind]
+        if kind == REFSXP:
+            index = flags >> 8
+            return self.refs[(index or self.int()) - 1]
+        if kind in (PERSISTSXP, NAMESPACESXP, PACKAGESXP):
+            self.int()  # always 0
+            value = RObject(kind, [self.item() for _ in range(self.int())])
+            self.refs.append(value)
+            return value
+        if kind == SYMSXP:
+            name = self.item()
+            value = name.value if isinstance(name, RObject) else name
+            self.refs.append(value)
+            return value
+        if kind == ENVSXP:
+            env = RObject(ENVSXP, {})
+            self.refs.append(env)
+            self.int()  # locked
+            env.value = {"enclos": self.item(), "frame": self.item(), "hashtab": self.item()}
+            env.attributes = self.attributes(True)
+            return env
+        if kind in _PAIRS:
+            return self.pairlist(kind, has_attr, has_tag)
+        if kind == CHARSXP:
+            n = self.int()
+            return RObject(CHARSXP, None if n == -1 else self.read(n).decode("utf-8", errors="replace"))
+        if kind in _NUMERIC:
+            n = self.length()
+            value = np.frombuffer(self.read(n * np.dtype(_NUMERIC[kind]).itemsize), dtype=_NUMERIC[kind])
+            return RObject(kind, value, self.attributes(has_attr))
+        if kind == STRSXP:
+            value = [self.item().value for _ in range(self.length())]
+            return RObject(kind, value, self.attributes(has_attr))
+        if kind in (VECSXP, EXPRSXP):
+            value = [self.item() for _ in range(self.length())]
+            return RObject(kind, value, self.attributes(has_attr))
+        if kind == RAWSXP:
+            return RObject(kind, self.read(self.length()), self.attributes(has_attr))
+        if kind == S4SXP:
+            return RObject(kind, None, self.attributes(has_attr))
+        if kind == ALTREP_SXP:
+            return self.altrep()
+        raise ValueError(f"Unsupported SEXP type {kind}")
+
+    def pairlist(self, kind, has_attr, has_tag):
+        # Pairlists are read iteratively; their tails would otherwise nest one call per element
+        items, attributes = [], None
+        while True:
+            attrs = self.attributes(has_attr)
+            attributes = attrs if attributes is None else attributes
+            tag = self.item() if has_tag else None
+            items.append((tag, self.item()))
+            flags = self.int()
+            kind_next = flags & 0xFF
+            if kind_next != kind:
+                if kind_next != NILVALUE_SXP:
+                    raise ValueError(f"Unsupported pairlist tail of type {kind_next}")
+                break
+            has_attr, has_tag = bool(flags & (1 << 9)), bool(flags & (1 << 10))
+        return RObject(kind, items, attributes)
+
+    def altrep(self):
+        info = self.item()
+        state = self.item()
+        attributes = self.item()
+        name = info.value[0][1] if isinstance(info, RObject) else None
+        if name == "compact_intseq":
+            n, start, step = state.value
+            value = (start + step * np.arange(int(n))).astype(">i4")
+            result = RObject(INTSXP, value)
+        elif name == "compact_realseq":
+            n, start, step = state.value
+            result = RObject(REALSXP, start + step * np.arange(int(n)))
+        elif name in ("wrap_integer", "wrap_real", "wrap_logical", "wrap_string", "wrap_complex", "wrap_list"):
+            result = state.value[0]
+        elif name == "deferred_string":
+            original = state.value[0][1]
+            result = RObject(STRSXP, [str(v) for v in original.value])
+        else:
+            raise ValueError(f"Unsupported ALTREP class {name!r}")
+        if isinstance(attributes, RObject):
+            result.attributes = {tag: value for tag, value in attributes.value}
+        return result
+
+
+def read_rdata(path):
+    """
+    Returns the objects saved in an .RData file as {name: RObject}.
+    """
+    with open_stream(path) as stream:
+        parser = _Parser(stream)
+        parser.header()
+        saved = parser.item()
+    return {tag: value for tag, value in saved.value}
+
+
+def _labels(y):
+    """
+    Returns the labels of a factor, or the values of a plain vector, as strings.
+    """
+    levels = y.attr("levels")
+    if levels is not None:
+        codes = np.asarray(y.value, dtype=np.int64)
+        labels = np.array(levels, dtype=object)[np.where(codes == NA_INTEGER, 0, codes - 1)]
+        return np.where(codes == NA_INTEGER, None, labels)
+    return np.array([str(v) for v in y.value], dtype=object)
+
+
+def _matrix(x, dtype):
+    """
+    Returns a matrix or data.frame as an (n_samples, n_features) array and its column names.
+    """
+    if x.type == VECSXP:
+        # data.frame: one vector per column
+        names = x.attr("names")
+        X = np.empty((len(x.value[0].value) if x.value else 0, len(x.value)), dtype=dtype)
+        for j, column in enumerate(x.value):
+            X[:, j] = column.value
+        return X, list(names)
+    n_rows, n_cols = (int(d) for d in x.attr("dim"))
+    # R stores matrices column-major
+    X = np.asarray(x.value.reshape(n_cols, n_rows).T, dtype=dtype)
+    dimnames = x.attr("dimnames")
+    names = dimnames[1].value if dimnames and isinstance(dimnames[1], RObject) else None
+    # data.frame() numbers the columns of a matrix without column names
+    return X, list(names) if names is not None else [str(j + 1) for j in range(n_cols)]
+
+
+def read_dataset(path, dtype=np.float64):
+    """
+    Reads a gravier .RData file holding a list(x, y).
+
+    Returns X of shape (n_samples, n_features), the labels as strings and the
+    feature names as R's write.csv gives them in the gravier_csv files: prefixed
+    with 'x.' and with characters invalid in R names replaced by '.'.
+    """
+    objects = read_rdata(path)
+    data = next(iter(objects.values()))
+    fields = dict(zip(data.attr("names"), data.value))
+    X, names = _matrix(fields["x"], dtype)
+    return X, _labels(fields["y"]), [_INVALID_NAME_CHARS.sub(".", f"x.{name}") for name in names]
+
+
+def convert_rdata(rdata_path, cache_dir, dtype=loader.DEFAULT_DTYPE):
+    """
+    Converts one .RData file into the binary store of Datasets.loader.
+
+    Returns the metadata dictionary written next to the arrays.
+    """
+    rdata_path = Path(rdata_path)
+    stat = rdata_path.stat()
+    X, labels, feature_names = read_dataset(rdata_path, dtype)
+    return loader.write_store(rdata_path, stat, cache_dir, dtype, X, labels.astype(str), feature_names, "y")
+
+
+def list_rdata(rdata_dir=None):
+    """
+    Returns the names of the .RData datasets in rdata_dir.
+    """
+    return sorted(p.stem for p in Path(rdata_dir or RDATA_DIR).glob("*.RData"))
+
+
+def convert_all(rdata_dir=None, cache_dir=None, dtype=loader.DEFAULT_DTYPE, n_jobs=None, csv_dir=None):
+    """
+    Converts in parallel every .RData file of rdata_dir whose dataset has no
+    CSV in csv_dir, and returns {name: metadata}.
+    """
+    rdata_dir = Path(rdata_dir or RDATA_DIR)
+    csv_dir = Path(csv_dir or loader.CSV_DIR)
+    cache_dir = Path(cache_dir or csv_dir / ".cache")
+    with_csv = set(loader.list_datasets(csv_dir))
+    paths = [rdata_dir / f"{name}.RData" for name in list_rdata(rdata_dir) if name not in with_csv]
+    # Spawned: a forked worker deadlocks if the caller already runs numba or BLAS threads
+    with ProcessPoolExecutor(max_workers=n_jobs, mp_context=get_context("spawn")) as executor:
+        metas = executor.map(convert_rdata, paths, [cache_dir] * len(paths), [dtype] * len(paths))
+        return {path.stem: meta for path, meta in zip(paths, metas)}
+
+
+def verify(name, rdata_dir=None, csv_dir=None, rtol=1e-6):
+    """
+    Checks that an .RData file decodes to the same matrix, labels and feature
+    names as its gravier_csv export. Raises AssertionError on a mismatch.
+    """
+    import pandas as pd
+
+    X, labels, names = read_dataset(Path(rdata_dir or RDATA_DIR) / f"{name}.RData")
+    df = pd.read_csv(Path(csv_dir or loader.CSV_DIR) / f"{name}.csv")
+    if list(df.columns[:-1]) != names:
+        raise AssertionError(f"{name}: feature names differ from the CSV")
+    if not np.allclose(X, df.iloc[:, :-1].to_numpy(dtype=np.float64), rtol=rtol, equal_nan=True):
+        raise AssertionError(f"{name}: values differ from the CSV")
+    if not np.array_equal(labels.astype(str), df.iloc[:, -1].to_numpy().astype(str)):
+        raise AssertionError(f"{name}: labels differ from the CSV")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rdata-dir", type=Path, default=RDATA_DIR)
+    parser.add_argument("--cache-dir", type=Path, default=None)
+    parser.add_argument("--dtype", default=np.dtype(loader.DEFAULT_DTYPE).name)
+    parser.add_argument("--n-jobs", type=int, default=None)
+    parser.add_argument("--verify", action="store_true", help="compare with the gravier_csv files where present")
+    args = parser.parse_args(argv)
+    metas = convert_all(args.rdata_dir, args.cache_dir, np.dtype(args.dtype), args.n_jobs)
+    for name, meta in metas.items():
+        print(f"{name:>14}: {meta['shape'][0]} x {meta['shape'][1]}, classes {meta['classes']}")
+    if args.verify:
+        for name in sorted(set(list_rdata(args.rdata_dir)) & set(loader.list_datasets())):
+            verify(name, args.rdata_dir)
+            print(f"{name:>14}: matches the CSV")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
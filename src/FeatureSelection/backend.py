@@ -0,0 +1,132 @@
+"""
+Array backends for the selectors.
+
+The NumPy backend runs its reductions over column blocks on a thread pool.
+Accelerator backends import their libraries only when they are created, so
+modules that dispatch through get_backend can be imported on CPU-only nodes.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .parallel import effective_n_jobs
+from .streaming import anova_f, chunked_f_classif
+
+
+class NumpyBackend:
+    """
+    Multi-threaded NumPy backend.
+
+    Parameters:
+    -----------
+    n_jobs : int, optional (default=None)
+        Number of threads. None means 1 and -1 means all CPUs.
+
+    block_size : int, optional (default=2048)
+        Number of columns per block of a threaded reduction.
+    """
+
+    name = "numpy"
+    xp = np
+
+    def __init__(self, n_jobs=None, block_size=2048):
+        self.n_jobs = n_jobs
+        self.block_size = block_size
+
+    def asarray(self, X, dtype=None):
+        return np.asarray(X, dtype=dtype)
+
+    def to_numpy(self, a):
+        return np.asarray(a)
+
+    def f_classif(self, X, y):
+        return chunked_f_classif(X, np.asarray(y), block_size=self.block_size, n_jobs=self.n_jobs)
+
+    def standardize(self, X):
+        """
+        Returns X scaled to zero mean and unit variance per column, like StandardScaler.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        out = np.empty_like(X)
+
+        def scale(start):
+            block = X[:, start:start + self.block_size]
+            std = block.std(axis=0)
+            std[std == 0] = 1.0
+            np.divide(block - block.mean(axis=0), std, out=out[:, start:start + self.block_size])
+
+        self.map(scale, range(0, X.shape[1], self.block_size))
+        return out
+
+    def map(self, fn, items):
+        """
+        Applies fn to every item on the backend's thread pool and returns the results in order.
+        """
+        workers = effective_n_jobs(self.n_jobs)
+        if workers == 1:
+            return [fn(item) for item in items]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(fn, items))
+
+
+class CupyBackend:
+    """
+    CUDA backend on CuPy. CuPy is imported when the backend is created.
+    """
+
+    name = "cupy"
+
+    def __init__(self, n_jobs=None, block_size=None):
+        import cupy
+
+        self.xp = cupy
+        self.n_jobs = n_jobs
+        self.block_size = block_size
+
+    def asarray(self, X, dtype=None):
+        return self.xp.asarray(np.asarray(X), dtype=dtype)
+
+    def to_numpy(self, a):
+        return self.xp.asnumpy(a)
+
+    def f_classif(self, X, y):
+        cp = self.xp
+        classes, codes = np.unique(np.asarray(y), return_inverse=True)
+        onehot = cp.zeros((len(codes), len(classes)))
+        onehot[cp.arange(len(codes)), cp.asarray(codes)] = 1.0
+        X = cp.asarray(X, dtype=cp.float64)
+        sums = cp.asnumpy(onehot.T @ X)
+        sumsq = cp.asnumpy(onehot.T @ (X * X))
+        return anova_f(cp.asnumpy(onehot.sum(axis=0)), sums, sumsq)
+
+    def standardize(self, X):
+        cp = self.xp
+        X = cp.asarray(X, dtype=cp.float64)
+        std = X.std(axis=0)
+        std[std == 0] = 1.0
+        return (X - X.mean(axis=0)) / std
+
+    def map(self, fn, items):
+        return [fn(item) for item in items]
+
+
+_BACKENDS = {"numpy": NumpyBackend, "cupy": CupyBackend}
+
+
+def register_backend(name, factory):
+    """
+    Registers a backend factory called as factory(n_jobs=..., block_size=...).
+    """
+    _BACKENDS[name] = factory
+
+
+def get_backend(name="numpy", **kwargs):
+    """
+    Creates the backend registered under name. Accelerator libraries are imported here.
+    """
+    try:
+        factory = _BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown backend {name!r}, expected one of {sorted(_BACKENDS)}") from None
+    return factory(**kwargs)
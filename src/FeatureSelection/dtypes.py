@@ -0,0 +1,52 @@
+"""
+dtype policy of the selectors.
+
+Expression matrices are stored and scanned in float32, which halves memory
+and bandwidth against float64. Sums, sums of squares and least-squares
+problems are accumulated in float64 over blocks of the matrix, so only one
+block at a time is upcast.
+"""
+
+import numpy as np
+
+ACCUMULATOR = np.float64
+
+
+def float_dtype(X, dtype=None):
+    """
+    Returns dtype when given, else the dtype of X when it is float32 or float64,
+    else float64.
+    """
+    if dtype is not None:
+        return np.dtype(dtype)
+    kind = getattr(X, "dtype", None)
+    if kind in (np.float32, np.float64):
+        return np.dtype(kind)
+    return np.dtype(ACCUMULATOR)
+
+
+def as_float(X, dtype=None):
+    """
+    Returns X as a floating array of float_dtype(X, dtype). Arrays, memory maps
+    included, that already have that dtype are returned without copying.
+    """
+    return np.asarray(X, dtype=float_dtype(X, dtype))
+
+
+def accumulate_gram(X, y=None, block_rows=256):
+    """
+    Returns X^T X (and X^T y, y^T y when y is given) in float64, upcasting X
+    one block of rows at a time.
+    """
+    n_samples, n_features = X.shape
+    gram = np.zeros((n_features, n_features), dtype=ACCUMULATOR)
+    xty = np.zeros(n_features, dtype=ACCUMULATOR)
+    for start in range(0, n_samples, block_rows):
+        block = np.asarray(X[start:start + block_rows], dtype=ACCUMULATOR)
+        gram += block.T @ block
+        if y is not None:
+            xty += block.T @ np.asarray(y[start:start + block_rows], dtype=ACCUMULATOR)
+    if y is None:
+        return gram
+    y = np.asarray(y, dtype=ACCUMULATOR)
+    return gram, xty, float(y @ y)
@@ -1,12 +1,13 @@
 import numpy as np
-import pandas as pd
-import cudf
-import cuml
-from sklearn.feature_selection import SelectKBest, f_classif
 
-class MicroarrayFeatureSelector:
+from .backend import get_backend
+from .plan import SelectionPlanMixin
+from .streaming import top_k
+
+class MicroarrayFeatureSelector(SelectionPlanMixin):
     """
-    Class for performing feature selection on microarray data using SelectKBest and f_classif from scikit-learn.
+    Class for performing feature selection on microarray data using the ANOVA F statistic,
+    dispatched through an array backend.
 
     Parameters:
     -----------
@@ -14,12 +15,26 @@ class MicroarrayFeatureSelector:
         Number of features to select. If None, half of the features will be selected.
 
     gpu : bool, optional (default=False)
-        Whether to use GPU acceleration with cuDF and cuML.
+        Whether to use GPU acceleration. Shorthand for backend='cupy'.
+
+    backend : str, optional (default=None)
+        Name of the array backend, see FeatureSelection.backend. Defaults to 'cupy'
+        if gpu is set and 'numpy' otherwise. Accelerator libraries are imported only
+        when their backend is selected.
+
+    n_jobs : int, optional (default=None)
+        Number of threads of the NumPy backend. None means 1 and -1 means all CPUs.
     """
 
-    def __init__(self, k=None, gpu=False):
+    def __init__(self, k=None, gpu=False, backend=None, n_jobs=None):
         self.k = k
         self.gpu = gpu
+        self.backend = backend
+        self.n_jobs = n_jobs
+
+    def _get_backend(self):
+        name = self.backend or ("cupy" if self.gpu else "numpy")
+        return get_backend(name, n_jobs=self.n_jobs)
 
     def fit_transform(self, X, y):
         """
@@ -38,24 +53,20 @@ class MicroarrayFeatureSelector:
         X_new : array-like of shape (n_samples, k)
             The transformed input samples with only the selected features.
         """
-        if self.gpu:
-            X = cudf.DataFrame.from_pandas(pd.DataFrame(X))
-            y = cudf.Series(y)
-        else:
-            X = pd.DataFrame(X)
+        backend = self._get_backend()
+        X = backend.asarray(X)
 
         n_samples, n_features = X.shape
+        self.n_features_in_ = n_features
 
         if self.k is None:
             self.k = n_features // 2
 
-        if self.gpu:
-            X = cuml.preprocessing.StandardScaler().fit_transform(X)
-            selector = cuml.feature_selection.SelectKBest(cuml.feature_selection.f_classif, k=self.k)
-            X_new = selector.fit_transform(X, y)
-            X_new = X_new.to_pandas().values
-        else:
-            selector = SelectKBest(f_classif, k=self.k)
-            X_new = selector.fit_transform(X, y)
+        # The GPU path scores standardized columns, whether chosen by gpu=True or backend='cupy'
+        if backend.name == "cupy":
+            X = backend.standardize(X)
+        self.scores_, self.pvalues_ = backend.f_classif(X, y)
+        self.feature_indices_ = top_k(self.scores_, self.k)
+        X_new = backend.to_numpy(X[:, backend.xp.asarray(self.feature_indices_)])
 
         return X_new
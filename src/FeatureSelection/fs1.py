@@ -1,6 +1,13 @@
+import numpy as np
 from sklearn.feature_selection import SelectKBest, f_classif
 
-class MicroarrayFeatureSelector:
+from .dtypes import as_float
+from .path import SelectionPath
+from .plan import SelectionPlanMixin
+from .streaming import ClassStats, chunked_f_classif, top_k
+from .univariate import select_top_k
+
+class MicroarrayFeatureSelector(SelectionPlanMixin):
     """
     Class for performing feature selection on microarray data using SelectKBest and f_classif from scikit-learn.
 
@@ -8,10 +15,108 @@ class MicroarrayFeatureSelector:
     -----------
     k : int or float, optional (default=None)
         Number of features to select. If None, half of the features will be selected.
+
+    block_size : int, optional (default=None)
+        If given, the F statistics are computed over column blocks of this many
+        features, so X can be a memory-mapped matrix larger than RAM.
+
+    n_jobs : int, optional (default=None)
+        Number of threads scoring column blocks in the chunked mode. None means 1 and -1 means all CPUs.
+
+    dtype : numpy dtype, optional (default=None)
+        Dtype X is scanned in. None keeps float32 and float64 input as is. The
+        statistics of float32 input are accumulated in float64, block by block.
     """
 
-    def __init__(self, k=None):
+    def __init__(self, k=None, block_size=None, n_jobs=None, dtype=None):
         self.k = k
+        self.block_size = block_size
+        self.n_jobs = n_jobs
+        self.dtype = dtype
+
+    def _n_selected(self, n_features):
+        return n_features // 2 if self.k is None else self.k
+
+    def fit(self, X, y):
+        """
+        Compute the F statistics of all features and select the k best.
+
+        Parameters:
+        -----------
+        X : array-like of shape (n_samples, n_features)
+            The training input samples. May be a memory-mapped array in the chunked mode.
+
+        y : array-like of shape (n_samples,)
+            The target values (class labels) as integers or strings.
+
+        Returns:
+        --------
+        self : object
+        """
+        self._stats = None
+        X = as_float(X, self.dtype)
+        self.n_features_in_ = X.shape[1]
+        if self.block_size is None and X.dtype == np.float64:
+            self.scores_, self.pvalues_ = f_classif(X, y)
+        else:
+            # f_classif would sum squares in float32; the blocks are upcast instead
+            self.scores_, self.pvalues_ = chunked_f_classif(X, y, block_size=self.block_size or 2048,
+                                                            n_jobs=self.n_jobs)
+        self.feature_indices_ = top_k(self.scores_, self._n_selected(X.shape[1]), self.block_size)
+        return self
+
+    def fit_path(self, X, y, ks):
+        """
+        Score all features once and return the nested selections for every k in ks.
+
+        Parameters:
+        -----------
+        X : array-like of shape (n_samples, n_features)
+            The training input samples.
+
+        y : array-like of shape (n_samples,)
+            The target values (class labels) as integers or strings.
+
+        ks : iterable of int
+            Numbers of features to select.
+
+        Returns:
+        --------
+        path : SelectionPath
+            path.indices(k) gives the k best features, best first, and
+            path.transform(X) the transformed views for all k.
+        """
+        self.fit(X, y)
+        self.path_ = SelectionPath(select_top_k(self.scores_, max(ks)), ks)
+        return self.path_
+
+    def partial_fit(self, X, y, classes=None):
+        """
+        Update the per-class counts, sums and sums of squares with a batch of
+        samples and reselect the k best features, without keeping earlier batches.
+
+        Parameters:
+        -----------
+        X : array-like of shape (n_samples, n_features)
+            A batch of training samples.
+
+        y : array-like of shape (n_samples,)
+            The class labels of the batch.
+
+        classes : array-like, optional (default=None)
+            All class labels, if known in advance.
+
+        Returns:
+        --------
+        self : object
+        """
+        if getattr(self, "_stats", None) is None:
+            self._stats = ClassStats(X.shape[1], classes)
+        self.n_features_in_ = X.shape[1]
+        self._stats.update(X, y, block_size=self.block_size, n_jobs=self.n_jobs)
+        self.scores_, self.pvalues_ = self._stats.f_scores()
+        self.feature_indices_ = top_k(self.scores_, self._n_selected(X.shape[1]), self.block_size)
+        return self
 
     def fit_transform(self, X, y):
         """
@@ -30,10 +135,23 @@ class MicroarrayFeatureSelector:
         X_new : array-like of shape (n_samples, k)
             The transformed input samples with only the selected features.
         """
-        selector = SelectKBest(f_classif, k=self.k)
-        X_new = selector.fit_transform(X, y)
-        return X_new
+        X = as_float(X, self.dtype)
+        self.n_features_in_ = X.shape[1]
+        if self.block_size is None and X.dtype == np.float64:
+            selector = SelectKBest(f_classif, k=self._n_selected(X.shape[1]))
+            X_new = selector.fit_transform(X, y)
+            self.scores_, self.pvalues_ = selector.scores_, selector.pvalues_
+            self.feature_indices_ = selector.get_support(indices=True)
+            return X_new
+        self.fit(X, y)
+        return self.transform(X)
 
 # USAGE
 # selector = MicroarrayFeatureSelector(k=1000)
 # X_selected = selector.fit_transform(X_train, y_train)
+# X_new = selector.transform(X_test)
+#
+# Chunked over a memory-mapped matrix, or over sample batches
+# selector = MicroarrayFeatureSelector(k=1000, block_size=2048, n_jobs=-1).fit(X_memmap, y)
+# for X_batch, y_batch in batches:
+#     selector.partial_fit(X_batch, y_batch, classes=['n', 't'])
@@ -0,0 +1,206 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from .path import SelectionPathMixin
+from .plan import SelectionPlanMixin
+from .univariate import STATISTICS, select_top_k, univariate_scores
+
+
+class CorrelationCache:
+    """
+    On-demand gene-gene Pearson correlations of the columns of X.
+
+    The columns are split into tiles of tile_size features. A tile is
+    standardized (zero mean, unit norm) the first time one of its features is
+    queried, and the correlations between two tiles are computed as one
+    tile_size x tile_size product of standardized tiles. Standardized tiles and
+    correlation blocks share one LRU store bounded by max_bytes, so only the
+    blocks of queried columns are ever computed and the dense p x p matrix is
+    never held.
+
+    Parameters:
+    -----------
+    X : array-like of shape (n_samples, n_features)
+        The samples. May be a memory-mapped array; tiles are read on demand.
+
+    tile_size : int, optional (default=256)
+        Number of features per tile.
+
+    max_bytes : int, optional (default=256 MiB)
+        Memory cap of the cached tiles and blocks.
+
+    dtype : numpy dtype, optional (default=np.float32)
+        Dtype of the standardized tiles and blocks. Means and norms are computed in float64.
+    """
+
+    def __init__(self, X, tile_size=256, max_bytes=256 << 20, dtype=np.float32):
+        self.X = X
+        self.n_samples, self.n_features = X.shape
+        self.tile_size = tile_size
+        self.max_bytes = max_bytes
+        self.dtype = np.dtype(dtype)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _get(self, key, compute):
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            value = compute()
+            self._entries[key] = value
+            self._bytes += value.nbytes
+            while len(self._entries) > 1 and self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                self.evictions += 1
+            return value
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def _standardized(self, t):
+        def compute():
+            start = t * self.tile_size
+            tile = np.asarray(self.X[:, start:start + self.tile_size], dtype=np.float64)
+            tile = tile - tile.mean(axis=0)
+            norm = np.sqrt(np.einsum("ij,ij->j", tile, tile))
+            norm[norm == 0] = 1.0
+            return (tile / norm).astype(self.dtype)
+
+        return self._get(("z", t), compute)
+
+    def block(self, ti, tj):
+        """
+        Returns the correlations between the features of tiles ti and tj.
+        """
+        if ti > tj:
+            return self.block(tj, ti).T
+        return self._get(("c", ti, tj), lambda: self._standardized(ti).T @ self._standardized(tj))
+
+    def correlations(self, i, columns):
+        """
+        Returns the correlations of feature i with every feature in columns.
+        """
+        columns = np.asarray(columns, dtype=np.intp)
+        out = np.empty(len(columns), dtype=self.dtype)
+        ti, oi = divmod(int(i), self.tile_size)
+        tiles = columns // self.tile_size
+        for tj in np.unique(tiles):
+            mask = tiles == tj
+            out[mask] = self.block(ti, tj)[oi, columns[mask] - tj * self.tile_size]
+        return out
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def info(self):
+        """
+        Returns the hit/miss/eviction counters and the current size.
+        """
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "entries": len(self._entries), "bytes": self._bytes}
+
+
+class MRMRSelector(SelectionPathMixin, SelectionPlanMixin):
+    """
+    Minimum-redundancy maximum-relevance feature selection.
+
+    Features are added greedily by their relevance (a univariate statistic)
+    against their mean absolute correlation with the features already
+    selected. Correlations come from a CorrelationCache, so each step only
+    computes the blocks between the newly selected feature's tile and the
+    tiles of the remaining candidates.
+
+    Parameters:
+    -----------
+    k : int, optional (default=50)
+        Number of features to select.
+
+    relevance : str, optional (default='anova_f')
+        Statistic of FeatureSelection.univariate used as relevance.
+
+    criterion : {'difference', 'quotient'}, optional (default='difference')
+        Relevance, scaled to a maximum of 1, minus the mean absolute
+        correlation, or relevance divided by it.
+
+    n_candidates : int, optional (default=None)
+        Only the n_candidates most relevant features compete. None means all features.
+
+    tile_size : int, optional (default=256)
+        Number of features per correlation tile.
+
+    max_bytes : int, optional (default=256 MiB)
+        Memory cap of the correlation cache.
+    """
+
+    def __init__(self, k=50, relevance="anova_f", criterion="difference", n_candidates=None, tile_size=256,
+                 max_bytes=256 << 20):
+        self.k = k
+        self.relevance = relevance
+        self.criterion = criterion
+        self.n_candidates = n_candidates
+        self.tile_size = tile_size
+        self.max_bytes = max_bytes
+
+    def fit(self, X, y):
+        """
+        Select k features.
+
+        Parameters:
+        -----------
+        X : array-like of shape (n_samples, n_features)
+            The training input samples.
+
+        y : array-like of shape (n_samples,)
+            The target values (class labels) as integers or strings.
+
+        Returns:
+        --------
+        self : object
+        """
+        if self.relevance not in STATISTICS:
+            raise ValueError(f"relevance must be one of {STATISTICS}, got {self.relevance!r}")
+        if self.criterion not in ("quotient", "difference"):
+            raise ValueError(f"criterion must be 'quotient' or 'difference', got {self.criterion!r}")
+        relevance = np.nan_to_num(univariate_scores(X, y, (self.relevance,))[self.relevance])
+        self.scores_ = relevance
+        if self.criterion == "difference" and relevance.max() > 0:
+            relevance = relevance / relevance.max()
+        n_features = self.n_features_in_ = X.shape[1]
+        candidates = select_top_k(relevance, self.n_candidates or n_features)
+        k = min(self.k, len(candidates))
+        self.correlation_cache_ = cache = CorrelationCache(X, self.tile_size, self.max_bytes)
+
+        selected = [int(candidates[0])] if k else []
+        remaining = np.ones(len(candidates), dtype=bool)
+        remaining[:1] = False
+        redundancy = np.zeros(len(candidates))
+        for step in range(1, k):
+            redundancy[remaining] += np.abs(cache.correlations(selected[-1], candidates[remaining]))
+            mean_redundancy = redundancy[remaining] / step
+            if self.criterion == "quotient":
+                with np.errstate(divide="ignore"):
+                    gain = relevance[candidates[remaining]] / mean_redundancy
+            else:
+                gain = relevance[candidates[remaining]] - mean_redundancy
+            best = np.flatnonzero(remaining)[np.argmax(gain)]
+            remaining[best] = False
+            selected.append(int(candidates[best]))
+
+        self.admission_order_ = np.array(selected, dtype=np.intp)
+        self.feature_indices_ = np.sort(self.admission_order_)
+        return self
+
+    def fit_transform(self, X, y):
+        return self.fit(X, y).transform(X)
+
+# USAGE
+# selector = MRMRSelector(k=50, n_candidates=2000, max_bytes=512 << 20)
+# X_selected = selector.fit_transform(X_train, y_train)
+# selector.correlation_cache_.info()
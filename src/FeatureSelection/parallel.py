@@ -0,0 +1,13 @@
+import os
+
+
+def effective_n_jobs(n_jobs):
+    """
+    Resolves an n_jobs value the way scikit-learn does: None means 1 and
+    negative values count back from the number of CPUs (-1 uses all of them).
+    """
+    if n_jobs is None or n_jobs == 0:
+        return 1
+    if n_jobs < 0:
+        return max(1, (os.cpu_count() or 1) + 1 + n_jobs)
+    return n_jobs
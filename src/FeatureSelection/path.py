@@ -0,0 +1,55 @@
+import numpy as np
+
+
+class SelectionPath:
+    """
+    Nested feature selections for several k read off one ranking.
+
+    Parameters:
+    -----------
+    order : array-like of int
+        Feature indices in the order they were ranked or admitted, best first.
+
+    ks : iterable of int
+        Selection sizes of the path.
+    """
+
+    def __init__(self, order, ks):
+        self.order = np.asarray(order, dtype=np.intp)
+        self.ks = sorted(set(int(k) for k in ks))
+        if self.ks and self.ks[-1] > len(self.order):
+            raise ValueError(f"k={self.ks[-1]} exceeds the {len(self.order)} ranked features")
+
+    def indices(self, k):
+        """
+        Returns the k first features, in admission order.
+        """
+        return self.order[:k]
+
+    @property
+    def selections(self):
+        return {k: self.indices(k) for k in self.ks}
+
+    def transform(self, X):
+        """
+        Returns {k: X restricted to the k first features} for every k of the path.
+
+        The largest selection is gathered once and the smaller ones are views of it.
+        """
+        X_max = np.asarray(X[:, self.order[:self.ks[-1]]]) if self.ks else np.asarray(X)[:, :0]
+        return {k: X_max[:, :k] for k in self.ks}
+
+
+class SelectionPathMixin:
+    """
+    fit_path for selectors that store the order in which features were admitted
+    in admission_order_.
+    """
+
+    def fit_path(self, X, y, ks):
+        """
+        Fits once and returns the SelectionPath for all k in ks.
+        """
+        self.fit(X, y)
+        self.path_ = SelectionPath(self.admission_order_, ks)
+        return self.path_
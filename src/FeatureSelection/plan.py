@@ -0,0 +1,166 @@
+import copy
+
+import numpy as np
+from sklearn.base import clone
+
+
+def selected_indices(selector):
+    """
+    Returns the selected column indices of a fitted selector, whichever
+    attribute it stores them in.
+    """
+    for name in ("feature_indices_", "selected_features_", "selected_indices_"):
+        indices = getattr(selector, name, None)
+        if indices is not None:
+            return np.asarray(indices, dtype=np.intp)
+    support = getattr(selector, "support_", None)
+    if support is not None:
+        return np.flatnonzero(support)
+    raise AttributeError(f"{type(selector).__name__} has no selected features; is it fitted?")
+
+
+def copy_estimator(estimator):
+    """
+    Returns an unfitted copy of estimator: a clone, or a deep copy for
+    selectors without get_params.
+    """
+    try:
+        return clone(estimator)
+    except TypeError:
+        return copy.deepcopy(estimator)
+
+
+class SelectionPlan:
+    """
+    Precompiled column gather for a fixed selection.
+
+    The selected indices are split once into runs of consecutive columns, so
+    transform copies each run as one slice instead of gathering column by
+    column. Output columns keep the order of indices; sorted selections give
+    the longest runs. Selections whose runs are short on average are gathered
+    with one np.take instead.
+
+    Parameters:
+    -----------
+    indices : array-like of int
+        Selected columns, in output order.
+
+    n_features : int, optional (default=None)
+        Number of columns of the input, needed by get_support.
+    """
+
+    # Shortest mean run length for which slice copies beat one np.take
+    min_run_length = 8
+
+    def __init__(self, indices, n_features=None):
+        self.indices = np.asarray(indices, dtype=np.intp).ravel()
+        self.n_features = n_features
+        if len(self.indices) and self.indices.min() < 0:
+            raise ValueError("indices must be non-negative")
+        starts = np.flatnonzero(np.r_[True, np.diff(self.indices) != 1]) if len(self.indices) else np.zeros(0, np.intp)
+        lengths = np.diff(np.r_[starts, len(self.indices)])
+        # (source column, output column, length) of every run
+        self.runs = np.column_stack([self.indices[starts], starts, lengths]).astype(np.intp)
+        self._slices = [(slice(src, src + n), slice(dst, dst + n)) for src, dst, n in self.runs.tolist()]
+        self._use_slices = len(self.runs) * self.min_run_length <= len(self.indices)
+        self._stop = int(self.indices.max()) + 1 if len(self.indices) else 0
+
+    def matches(self, indices):
+        return np.array_equal(self.indices, np.asarray(indices, dtype=np.intp).ravel())
+
+    def get_support(self, indices=False):
+        """
+        Returns a boolean mask over the input columns, or the selected indices if indices=True.
+        """
+        if indices:
+            return self.indices
+        if self.n_features is None:
+            raise ValueError("The number of input features is unknown; pass n_features")
+        mask = np.zeros(self.n_features, dtype=bool)
+        mask[self.indices] = True
+        return mask
+
+    def transform(self, X, out=None):
+        """
+        Returns X restricted to the selected columns.
+
+        Parameters:
+        -----------
+        X : array-like of shape (n_samples, n_features)
+            May be a memory-mapped array; only the selected columns are read.
+
+        out : ndarray of shape (n_samples, n_selected), optional (default=None)
+            Buffer the result is written to, instead of a new array.
+
+        Returns:
+        --------
+        X_new : ndarray of shape (n_samples, n_selected)
+        """
+        X = np.asarray(X)
+        if X.shape[1] < self._stop:
+            raise ValueError(f"X has {X.shape[1]} features, the selection needs at least {self._stop}")
+        shape = (X.shape[0], len(self.indices))
+        if out is None:
+            out = np.empty(shape, dtype=X.dtype)
+        elif out.shape != shape:
+            raise ValueError(f"out has shape {out.shape}, expected {shape}")
+        if self._use_slices or out.dtype != X.dtype:
+            for source, target in self._slices:
+                out[:, target] = X[:, source]
+        else:
+            # Indices are checked above, clip skips the buffered bounds check
+            np.take(X, self.indices, axis=1, out=out, mode="clip")
+        return out
+
+    def iter_transform(self, X, chunk_size=1024, out=None):
+        """
+        Yields the selected columns of chunk_size consecutive samples at a time.
+
+        All chunks are written to one buffer (out, if given, of shape
+        (chunk_size, n_selected)), so a yielded array is overwritten by the next
+        one; copy it to keep it. With a memory-mapped X only the current rows are paged in.
+        """
+        X = np.asarray(X)
+        if out is None:
+            out = np.empty((min(chunk_size, X.shape[0]), len(self.indices)), dtype=X.dtype)
+        for start in range(0, X.shape[0], chunk_size):
+            chunk = X[start:start + chunk_size]
+            yield self.transform(chunk, out=out[:len(chunk)])
+
+
+class SelectionPlanMixin:
+    """
+    transform, iter_transform and get_support of fitted selectors, through a
+    SelectionPlan compiled once per selection.
+    """
+
+    def selection_plan(self):
+        """
+        Returns the SelectionPlan of the current selection, rebuilt only when the selection changed.
+        """
+        indices = selected_indices(self)
+        plan = getattr(self, "_plan", None)
+        if plan is None or not plan.matches(indices):
+            n_features = getattr(self, "n_features_in_", None)
+            if n_features is None and getattr(self, "support_", None) is not None:
+                n_features = len(self.support_)
+            plan = self._plan = SelectionPlan(indices, n_features)
+        return plan
+
+    def get_support(self, indices=False):
+        """
+        Returns a boolean mask over the input features, or the selected indices if indices=True.
+        """
+        return self.selection_plan().get_support(indices)
+
+    def transform(self, X, out=None):
+        """
+        Returns X with only the selected features, written to out if given.
+        """
+        return self.selection_plan().transform(X, out=out)
+
+    def iter_transform(self, X, chunk_size=1024, out=None):
+        """
+        Yields the selected features of chunk_size samples at a time, see SelectionPlan.iter_transform.
+        """
+        return self.selection_plan().iter_transform(X, chunk_size=chunk_size, out=out)
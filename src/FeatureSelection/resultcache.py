@@ -0,0 +1,248 @@
+"""
+Persistent, content-addressed cache of fitted selectors.
+
+A fit is keyed by a digest of a strided sample of the rows of X, a full
+digest of y, the estimator's class and parameters and a hash of the source
+of the package defining it, so editing a selector or a module it uses
+invalidates its entries. The fitted array attributes (selected indices,
+scores, ...) are stored as one compressed .npz file per key; the least
+recently used files are removed beyond max_bytes.
+
+    cache = ResultCache()
+    selector = cache.fit(MicroarrayFeatureSelector(k=1000), X, y)   # second run loads from disk
+"""
+
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_DIR = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "microarray-data" / "results"
+# Directory holding SPFSR, FeatureSelection and Datasets
+SOURCE_ROOT = Path(__file__).resolve().parents[1]
+
+
+def sampled_digest(X, n_rows=32):
+    """
+    Digest of X from up to n_rows evenly spaced rows, first and last included,
+    each read in full so that every column is sampled.
+
+    Reads n_rows rows whatever the number of samples, so a memory-mapped matrix
+    is not paged in. Shape and dtype are part of the digest.
+    """
+    X = np.asarray(X)
+    h = hashlib.blake2b(str((X.shape, X.dtype.str)).encode(), digest_size=16)
+    if X.ndim != 2 or X.size == 0:
+        h.update(np.ascontiguousarray(X).tobytes())
+        return h.hexdigest()
+    n_samples = X.shape[0]
+    for row in np.unique(np.linspace(0, n_samples - 1, min(n_samples, n_rows)).astype(np.intp)):
+        h.update(np.ascontiguousarray(X[row]).tobytes())
+    return h.hexdigest()
+
+
+def _qualname(cls):
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+
+def _param_key(value):
+    """
+    Describes a parameter value without memory addresses: plain values as
+    themselves, random generators and seed sequences by their state,
+    estimators by class and parameters, functions by name and bytecode, and
+    any other object (caches, schedulers) by type.
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (list, tuple)):
+        return [_param_key(item) for item in value]
+    if isinstance(value, dict):
+        return {str(name): _param_key(item) for name, item in sorted(value.items(), key=lambda item: str(item[0]))}
+    if isinstance(value, np.dtype):
+        return value.str
+    if isinstance(value, type):
+        return _qualname(value)
+    if isinstance(value, np.ndarray):
+        return hashlib.blake2b(np.ascontiguousarray(value).tobytes(), digest_size=8).hexdigest()
+    if isinstance(value, np.random.Generator):
+        value = value.bit_generator
+    if isinstance(value, np.random.BitGenerator):
+        return {"class": _qualname(type(value)), "state": _param_key(value.state)}
+    if isinstance(value, np.random.RandomState):
+        return {"class": _qualname(type(value)), "state": _param_key(value.get_state(legacy=False))}
+    if isinstance(value, np.random.SeedSequence):
+        return {"class": _qualname(type(value)), "entropy": _param_key(value.entropy),
+                "spawn_key": _param_key(value.spawn_key), "pool_size": value.pool_size,
+                "n_children_spawned": value.n_children_spawned}
+    if hasattr(value, "get_params"):
+        return {"class": _qualname(type(value)), "params": _params(value)}
+    code = getattr(value, "__code__", None)
+    if code is not None:
+        return f"{value.__module__}.{value.__qualname__}:{hashlib.blake2b(code.co_code, digest_size=8).hexdigest()}"
+    return _qualname(type(value))
+
+
+def _params(estimator):
+    if hasattr(estimator, "get_params"):
+        params = estimator.get_params(deep=False)
+    else:
+        params = {name: value for name, value in vars(estimator).items()
+                  if not name.startswith("_") and not name.endswith("_")}
+    return {name: _param_key(value) for name, value in sorted(params.items())}
+
+
+def _source_files(estimator):
+    """
+    Source files whose edits invalidate the estimator's entries: every module
+    of its package and of FeatureSelection when it is defined in this source
+    tree, else only its own module.
+    """
+    module = sys.modules.get(type(estimator).__module__)
+    path = getattr(module, "__file__", None)
+    if path is None:
+        return []
+    path = Path(path).resolve()
+    if SOURCE_ROOT not in path.parents or path.parent == SOURCE_ROOT:
+        return [path]
+    packages = {path.relative_to(SOURCE_ROOT).parts[0], Path(__file__).resolve().parent.name}
+    return sorted(file for package in packages for file in (SOURCE_ROOT / package).rglob("*.py"))
+
+
+def _code_version(estimator):
+    files = _source_files(estimator)
+    if not files:
+        return "unknown"
+    h = hashlib.blake2b(digest_size=8)
+    for file in files:
+        try:
+            h.update(str(file.relative_to(SOURCE_ROOT) if SOURCE_ROOT in file.parents else file.name).encode())
+            h.update(file.read_bytes())
+        except OSError:
+            return "unknown"
+    return h.hexdigest()
+
+
+def _fitted_arrays(estimator):
+    """
+    Returns the public fitted attributes that are numbers, strings or arrays of them.
+    """
+    arrays, kinds = {}, {}
+    for name, value in vars(estimator).items():
+        if name.startswith("_") or not name.endswith("_") or value is None:
+            continue
+        if isinstance(value, (list, tuple, np.ndarray, int, float, np.number, str, bool)):
+            array = np.asarray(value)
+            if array.dtype != object:
+                arrays[name] = array
+                kinds[name] = "list" if isinstance(value, (list, tuple)) else (
+                    "array" if isinstance(value, np.ndarray) else "scalar")
+    return arrays, kinds
+
+
+class ResultCache:
+    """
+    On-disk cache of fitted selector attributes.
+
+    Parameters:
+    -----------
+    directory : str or Path, optional (default=None)
+        Where the entries are stored. Defaults to $XDG_CACHE_HOME/microarray-data/results.
+
+    max_bytes : int, optional (default=1 GiB)
+        Total size of the entries beyond which the least recently used are removed.
+    """
+
+    def __init__(self, directory=None, max_bytes=1 << 30):
+        self.directory = Path(directory or DEFAULT_DIR)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, estimator, X, y):
+        description = {
+            "class": f"{type(estimator).__module__}.{type(estimator).__qualname__}",
+            "params": _params(estimator),
+            "code": _code_version(estimator),
+            "X": sampled_digest(X),
+            "y": hashlib.blake2b(np.ascontiguousarray(np.asarray(y).astype(str)).tobytes(),
+                                 digest_size=16).hexdigest(),
+        }
+        return hashlib.blake2b(json.dumps(description, sort_keys=True).encode(), digest_size=20).hexdigest()
+
+    def _path(self, key):
+        return self.directory / f"{key}.npz"
+
+    def load(self, key, estimator):
+        """
+        Restores the fitted attributes stored under key onto estimator. Returns False on a miss.
+        """
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                kinds = json.loads(str(data["__kinds__"]))
+                for name, kind in kinds.items():
+                    value = data[name]
+                    setattr(estimator, name, value.tolist() if kind in ("list", "scalar") else value)
+        except (OSError, KeyError, ValueError):
+            self.misses += 1
+            return False
+        # Mark as recently used for eviction
+        os.utime(path)
+        self.hits += 1
+        return True
+
+    def save(self, key, estimator):
+        arrays, kinds = _fitted_arrays(estimator)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp = path.with_name(f"{key}.{os.getpid()}.tmp.npz")
+        np.savez_compressed(tmp, __kinds__=np.array(json.dumps(kinds)), **arrays)
+        os.replace(tmp, path)
+        self._evict()
+
+    def fit(self, estimator, X, y):
+        """
+        Fits estimator on X, y unless an identical fit is cached, and returns it.
+        """
+        key = self.key(estimator, X, y)
+        if self.load(key, estimator):
+            return estimator
+        estimator.fit(X, y)
+        self.save(key, estimator)
+        return estimator
+
+    def _entries(self):
+        entries = []
+        for path in self.directory.glob("*.npz"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        return sorted(entries)
+
+    def _evict(self):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries[:-1]:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self):
+        for _, _, path in self._entries():
+            path.unlink(missing_ok=True)
+
+    def info(self):
+        """
+        Returns the hit/miss counters and the number and total size of the entries.
+        """
+        entries = self._entries()
+        return {"hits": self.hits, "misses": self.misses, "entries": len(entries),
+                "bytes": sum(size for _, size, _ in entries)}
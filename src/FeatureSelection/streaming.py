@@ -0,0 +1,139 @@
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from scipy import stats
+
+from .parallel import effective_n_jobs
+
+
+def anova_f(counts, sums, sumsq):
+    """
+    One-way ANOVA F statistics and p-values from per-class sufficient statistics.
+
+    counts has shape (n_classes,), sums and sumsq have shape (n_classes, n_features).
+    Gives the same values as sklearn's f_classif on the pooled samples.
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    present = counts > 0
+    counts, sums, sumsq = counts[present], sums[present], sumsq[present]
+    n, n_classes = counts.sum(), len(counts)
+    total = sums.sum(axis=0)
+    sstot = sumsq.sum(axis=0) - total ** 2 / n
+    ssbn = (sums ** 2 / counts[:, None]).sum(axis=0) - total ** 2 / n
+    sswn = sstot - ssbn
+    dfbn, dfwn = n_classes - 1, n - n_classes
+    with np.errstate(divide="ignore", invalid="ignore"):
+        f = (ssbn / dfbn) / (sswn / dfwn)
+    return f, stats.f.sf(f, dfbn, dfwn)
+
+
+def _block_stats(X, onehot, start, stop):
+    block = np.asarray(X[:, start:stop], dtype=np.float64)
+    return onehot.T @ block, onehot.T @ (block * block)
+
+
+class ClassStats:
+    """
+    Per-class counts, sums and sums of squares accumulated over sample batches.
+
+    Parameters:
+    -----------
+    n_features : int
+        Number of features of every batch.
+
+    classes : array-like, optional (default=None)
+        Known class labels. Labels first seen in a later batch are appended.
+    """
+
+    def __init__(self, n_features, classes=None):
+        self.n_features = n_features
+        self.classes = [] if classes is None else list(classes)
+        self.counts = np.zeros(len(self.classes))
+        self.sums = np.zeros((len(self.classes), n_features))
+        self.sumsq = np.zeros((len(self.classes), n_features))
+
+    def _codes(self, y):
+        lookup = {c: i for i, c in enumerate(self.classes)}
+        new = [c for c in dict.fromkeys(np.asarray(y).tolist()) if c not in lookup]
+        if new:
+            for c in new:
+                lookup[c] = len(self.classes)
+                self.classes.append(c)
+            grow = len(new)
+            self.counts = np.concatenate([self.counts, np.zeros(grow)])
+            self.sums = np.vstack([self.sums, np.zeros((grow, self.n_features))])
+            self.sumsq = np.vstack([self.sumsq, np.zeros((grow, self.n_features))])
+        return np.fromiter((lookup[c] for c in np.asarray(y).tolist()), dtype=np.intp, count=len(y))
+
+    def update(self, X, y, block_size=None, n_jobs=None):
+        """
+        Adds a batch of samples, reducing it over column blocks.
+        """
+        codes = self._codes(y)
+        onehot = np.zeros((len(codes), len(self.classes)))
+        onehot[np.arange(len(codes)), codes] = 1.0
+        self.counts += onehot.sum(axis=0)
+        for start, stop, (s, sq) in _map_blocks(X, onehot, block_size, n_jobs):
+            self.sums[:, start:stop] += s
+            self.sumsq[:, start:stop] += sq
+        return self
+
+    def f_scores(self):
+        return anova_f(self.counts, self.sums, self.sumsq)
+
+
+def _map_blocks(X, onehot, block_size, n_jobs):
+    n_features = X.shape[1]
+    block_size = block_size or n_features
+    bounds = [(s, min(s + block_size, n_features)) for s in range(0, n_features, block_size)]
+    workers = effective_n_jobs(n_jobs)
+    if workers == 1:
+        for start, stop in bounds:
+            yield start, stop, _block_stats(X, onehot, start, stop)
+        return
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Keep at most two blocks per worker in flight to bound the working set
+        window = 2 * workers
+        futures = {}
+        for i, (start, stop) in enumerate(bounds):
+            futures[i] = executor.submit(_block_stats, X, onehot, start, stop)
+            if i >= window:
+                yield (*bounds[i - window], futures.pop(i - window).result())
+        for i in sorted(futures):
+            yield (*bounds[i], futures[i].result())
+
+
+def top_k(scores, k, block_size=None):
+    """
+    Returns the indices of the k highest scores, merging per-block candidates
+    through a heap. NaN scores rank lowest and ties go to the higher index,
+    like SelectKBest.
+    """
+    scores = np.where(np.isnan(scores), -np.inf, scores)
+    n_features = len(scores)
+    k = min(k, n_features)
+    if k <= 0:
+        return np.zeros(0, dtype=np.intp)
+    block_size = block_size or n_features
+    heap = []
+    for start in range(0, n_features, block_size):
+        block = scores[start:start + block_size]
+        cut = len(block) - min(k, len(block))
+        best = np.argpartition(block, cut)[cut:]
+        for i in best:
+            item = (block[i], start + int(i))
+            if len(heap) < k:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+    return np.sort(np.array([i for _, i in heap], dtype=np.intp))
+
+
+def chunked_f_classif(X, y, block_size=1024, n_jobs=None):
+    """
+    ANOVA F statistics and p-values of every column of X, computed over column
+    blocks so only a few blocks are held in memory. X may be a read-only memmap.
+    """
+    acc = ClassStats(X.shape[1]).update(X, y, block_size=block_size, n_jobs=n_jobs)
+    return acc.f_scores()
@@ -0,0 +1,93 @@
+import numpy as np
+from scipy.stats import rankdata
+
+from .streaming import anova_f
+
+STATISTICS = ("welch_t", "anova_f", "point_biserial", "rank_sum")
+
+
+def encode_labels(y):
+    """
+    Returns the sorted class labels and the integer code of every sample,
+    so string labels such as 'n'/'t' map to 0/1.
+    """
+    classes, codes = np.unique(np.asarray(y), return_inverse=True)
+    return classes, codes
+
+
+def univariate_scores(X, y, statistics=STATISTICS):
+    """
+    Computes univariate statistics for all features at once.
+
+    Class sizes, sums and sums of squares come from one-hot matrix products
+    over X (two passes), and every statistic is derived from them; the rank-sum
+    statistic adds one pass over the column ranks. Welch t and the point-biserial
+    correlation need two classes and compare the second class label with the first.
+
+    Parameters:
+    -----------
+    X : array-like of shape (n_samples, n_features)
+
+    y : array-like of shape (n_samples,)
+        Class labels as integers or strings.
+
+    statistics : tuple of str, optional (default=STATISTICS)
+        Any of 'welch_t' (absolute t with per-class population variances),
+        'anova_f', 'point_biserial' (absolute correlation) and 'rank_sum'
+        (absolute Mann-Whitney z for two classes, Kruskal-Wallis H otherwise).
+
+    Returns:
+    --------
+    scores : dict
+        Array of shape (n_features,) for every requested statistic.
+    """
+    unknown = set(statistics) - set(STATISTICS)
+    if unknown:
+        raise ValueError(f"Unknown statistics: {sorted(unknown)}")
+    X = np.asarray(X)
+    classes, codes = encode_labels(y)
+    n, n_classes = len(codes), len(classes)
+    binary_only = {"welch_t", "point_biserial"} & set(statistics)
+    if binary_only and n_classes != 2:
+        raise ValueError(f"{sorted(binary_only)} need exactly 2 classes, got {n_classes}")
+
+    onehot = np.zeros((n, n_classes))
+    onehot[np.arange(n), codes] = 1.0
+    counts = onehot.sum(axis=0)
+    sums = onehot.T @ X
+    sumsq = onehot.T @ (X * X)
+    means = sums / counts[:, None]
+    variances = np.maximum(sumsq / counts[:, None] - means ** 2, 0.0)
+
+    scores = {}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if "welch_t" in statistics:
+            scores["welch_t"] = np.abs(means[1] - means[0]) / np.sqrt(variances[1] / counts[1] + variances[0] / counts[0])
+        if "anova_f" in statistics:
+            scores["anova_f"] = anova_f(counts, sums, sumsq)[0]
+        if "point_biserial" in statistics:
+            total_var = np.maximum(sumsq.sum(axis=0) / n - (sums.sum(axis=0) / n) ** 2, 0.0)
+            scores["point_biserial"] = (np.abs(means[1] - means[0]) * np.sqrt(counts[0] * counts[1]) / n
+                                        / np.sqrt(total_var))
+        if "rank_sum" in statistics:
+            rank_sums = onehot.T @ rankdata(X, axis=0)
+            if n_classes == 2:
+                n0, n1 = counts
+                u = rank_sums[1] - n1 * (n1 + 1) / 2
+                scores["rank_sum"] = np.abs(u - n0 * n1 / 2) / np.sqrt(n0 * n1 * (n + 1) / 12)
+            else:
+                scores["rank_sum"] = 12 / (n * (n + 1)) * (rank_sums ** 2 / counts[:, None]).sum(axis=0) - 3 * (n + 1)
+    return scores
+
+
+def select_top_k(scores, k):
+    """
+    Returns the indices of the k highest scores, best first, using argpartition
+    instead of a full sort. NaN scores rank lowest.
+    """
+    scores = np.where(np.isnan(scores), -np.inf, scores)
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.zeros(0, dtype=np.intp)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top], kind="stable")]
@@ -0,0 +1,120 @@
+import hashlib
+import sys
+from collections import OrderedDict
+
+import numpy as np
+
+
+def data_token(X, y):
+    """
+    Returns a short digest identifying the contents of X and y.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for a in (X, y):
+        a = np.ascontiguousarray(a)
+        h.update(str((a.shape, a.dtype.str)).encode())
+        h.update(a.tobytes() if a.dtype != object else repr(a.tolist()).encode())
+    return h.digest()
+
+
+def subset_fingerprint(features, n_features):
+    """
+    Returns a 16-byte fingerprint of a feature set, hashed from its packed bitset.
+    """
+    mask = np.zeros(n_features, dtype=bool)
+    mask[np.fromiter(features, dtype=np.intp, count=len(features))] = True
+    return hashlib.blake2b(np.packbits(mask).tobytes(), digest_size=16).digest()
+
+
+def _sizeof(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes + 112
+    if isinstance(value, tuple):
+        return sys.getsizeof(value) + sum(_sizeof(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class ScoreCache:
+    """
+    Bounded LRU cache of feature-subset scores.
+
+    Keys combine a data token (see data_token) with a subset fingerprint, so a
+    single cache can be shared between fits on different matrices, e.g. CV
+    folds, without mixing up their scores. Copying a cache returns the same
+    object, which keeps it shared when scikit-learn clones an estimator.
+
+    Parameters:
+    -----------
+    max_entries : int, optional (default=4096)
+        Maximum number of cached scores.
+
+    max_bytes : int, optional (default=None)
+        Approximate memory cap for keys and values. None means no cap.
+    """
+
+    def __init__(self, max_entries=4096, max_bytes=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __len__(self):
+        return len(self._entries)
+
+    def key(self, token, features, n_features):
+        return token + subset_fingerprint(features, n_features)
+
+    def get(self, key, default=None):
+        try:
+            value, _ = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[1]
+        size = len(key) + _sizeof(value)
+        self._entries[key] = (value, size)
+        self._bytes += size
+        while self._entries and (len(self._entries) > self.max_entries or
+                                 (self.max_bytes is not None and self._bytes > self.max_bytes)):
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._bytes -= evicted
+            self.evictions += 1
+
+    def items(self):
+        """
+        Returns the (key, value) pairs, least recently used first.
+        """
+        return [(key, value) for key, (value, _) in self._entries.items()]
+
+    def update(self, items):
+        """
+        Puts (key, value) pairs, e.g. from items(), keeping their order of use.
+        """
+        for key, value in items:
+            self.put(key, value)
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def info(self):
+        """
+        Returns the hit/miss/eviction counters and the current size.
+        """
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "entries": len(self._entries), "bytes": self._bytes}
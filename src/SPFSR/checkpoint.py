@@ -0,0 +1,140 @@
+"""
+Evaluation/time budgets and checkpoints of the SPFSR search loops.
+
+A checkpoint holds the full state of a search at an iteration boundary
+(feature sets as sorted int32 arrays, bracket points, the Generator, score
+cache entries, budget spent) and is written to a temporary file, synced and
+renamed over the previous one, so a run killed mid-write leaves the last
+complete checkpoint in place.
+
+    selector = SPFSR(k=20, max_seconds=3600, checkpoint="run.ckpt")
+    # after preemption
+    selector = SPFSR(k=20, max_seconds=3600, checkpoint="run.ckpt", resume_from="run.ckpt").fit(X, y)
+"""
+
+import os
+import pickle
+import time
+from pathlib import Path
+
+import numpy as np
+
+FORMAT = 1
+
+
+class Budget:
+    """
+    Evaluation and wall-clock budget of a search, carried over across resumes.
+
+    Parameters:
+    -----------
+    max_evaluations : int, optional (default=None)
+        Number of evaluations after which the search stops. None means no limit.
+
+    max_seconds : float, optional (default=None)
+        Seconds after which the search stops. None means no limit.
+
+    evaluations, elapsed : optional (default=0)
+        Budget already spent by the run being resumed.
+    """
+
+    def __init__(self, max_evaluations=None, max_seconds=None, evaluations=0, elapsed=0.0):
+        self.max_evaluations = max_evaluations
+        self.max_seconds = max_seconds
+        self.evaluations = evaluations
+        self._start = time.perf_counter() - elapsed
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self._start
+
+    def spend(self, n=1):
+        self.evaluations += n
+
+    def remaining(self):
+        """
+        Returns the number of evaluations left, or None without an evaluation limit.
+        """
+        if self.max_evaluations is None:
+            return None
+        return max(self.max_evaluations - self.evaluations, 0)
+
+    def exhausted(self):
+        """
+        Returns 'max_evaluations' or 'max_seconds' once that limit is reached, else None.
+        """
+        if self.max_evaluations is not None and self.evaluations >= self.max_evaluations:
+            return "max_evaluations"
+        if self.max_seconds is not None and self.elapsed >= self.max_seconds:
+            return "max_seconds"
+        return None
+
+    def state(self):
+        return {"evaluations": self.evaluations, "elapsed": self.elapsed}
+
+
+class Checkpointer:
+    """
+    Writes checkpoints to path at most every interval seconds.
+
+    Parameters:
+    -----------
+    path : str or Path or None
+        Checkpoint file. None disables checkpointing.
+
+    interval : float, optional (default=60)
+        Minimum number of seconds between two periodic checkpoints.
+    """
+
+    def __init__(self, path, interval=60.0):
+        self.path = None if path is None else Path(path)
+        self.interval = interval
+        self._last = time.perf_counter()
+
+    def due(self):
+        return self.path is not None and time.perf_counter() - self._last >= self.interval
+
+    def save(self, estimator, token, **state):
+        """
+        Writes the search state of estimator on the data identified by token.
+        """
+        if self.path is not None:
+            save_checkpoint(self.path, {"estimator": _name(estimator), "data": token, **state})
+            self._last = time.perf_counter()
+
+
+def _name(estimator):
+    return f"{type(estimator).__module__}.{type(estimator).__qualname__}"
+
+
+def pack_features(features):
+    return np.array(sorted(features), dtype=np.int32)
+
+
+def save_checkpoint(path, state):
+    """
+    Atomically writes state to path.
+    """
+    path = Path(path)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        pickle.dump({"format": FORMAT, **state}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path, estimator, token):
+    """
+    Reads the checkpoint at path and checks that it was written by the same
+    kind of estimator on the same data (token from cache.data_token).
+    """
+    with open(path, "rb") as f:
+        state = pickle.load(f)
+    if state.get("format") != FORMAT:
+        raise ValueError(f"{path} is not a checkpoint of this version")
+    if state["estimator"] != _name(estimator):
+        raise ValueError(f"{path} was written by {state['estimator']}")
+    if state["data"] != token:
+        raise ValueError(f"{path} was written for different X or y")
+    return state
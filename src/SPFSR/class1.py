@@ -1,18 +1,42 @@
 import numpy as np
 import pandas as pd
 
-class SPFSR:
+from FeatureSelection.plan import SelectionPlanMixin
+
+from .gram import SubsetRegression
+from .trace import NULL_TRACER, make_tracer
+
+
+def fibonacci_numbers(n):
+    """
+    Returns the first n Fibonacci numbers as floats; those past the float range are inf.
+    """
+    numbers, a, b = [], 0.0, 1.0
+    for _ in range(n):
+        numbers.append(a)
+        a, b = b, a + b
+    return numbers
+
+
+class SPFSR(SelectionPlanMixin):
     
-    def __init__(self, k):
+    def __init__(self, k, callback=None, trace=False):
         self.k = k
+        self.callback = callback
+        self.trace = trace
     
     def fit(self, X, y):
-        n_features = X.shape[1]
+        n_features = self.n_features_in_ = X.shape[1]
         feature_indices = np.arange(n_features)
         x1, x3 = 0, n_features - 1
         x2 = (x1 + x3) / 2
         
+        self._tracer = make_tracer(self.trace, self.callback)
+        # Gram-matrix engine shared by every probe of this fit
+        with self._tracer.section("gram"):
+            self._engine = SubsetRegression(X, y)
         f = lambda x: self._objective_function(x, X, y)
+        fibonacci = fibonacci_numbers(n_features - self.k + 4)
         
         f1, f3 = f(x1), f(x3)
         f2 = f(x2)
@@ -20,16 +44,18 @@ class SPFSR:
         f_best = f2
         
         for i in range(n_features - self.k):
-            # Use Fibonacci search to find the next point for parabolic interpolation
-            d = (x3 - x1) / self._fibonacci(i + 2)
+            # Use Fibonacci search to find the next point for parabolic interpolation;
+            # the steps start at a third of the bracket, F(2) = 1 would jump to its end
+            d = (x3 - x1) / fibonacci[i + 4]
             x_min = x1 + d
             f_min = f(x_min)
             
+            # Points past either end of the features are clipped to it
             if x_min < x2:
-                x1, x2 = x_min, x2 - d
+                x1, x2 = x_min, max(x2 - d, 0)
                 f1, f2 = f_min, f(x2)
             elif x_min > x2:
-                x2, x3 = x_min, x2 + d
+                x2, x3 = x_min, min(x2 + d, n_features - 1)
                 f2, f3 = f_min, f(x2)
             else:
                 x1, x3 = x2, x_min
@@ -54,38 +80,45 @@ class SPFSR:
             # Update the best function value so far
             if f2 > f_best:
                 f_best = f2
+            
+            if self._tracer.iteration(i, self._get_selected_indices(x2), f2):
+                break
         
         # Save the indices of the k selected features
         self.feature_indices_ = feature_indices[self._get_selected_indices(x2)]
-    
+        del self._engine
+        if self.trace:
+            self.trace_ = self._tracer
+        self._tracer = NULL_TRACER
+        return self
+
+    def _evaluations(self, n_features):
+        """
+        Number of objective evaluations of a fit on n_features features: three
+        starting points and two per iteration.
+        """
+        return 3 + 2 * max(n_features - self.k, 0)
+
     def _objective_function(self, x, X, y):
         """
-        Computes the objective function value for a given feature subset x.
+        Computes the objective function value of the feature subset selected at point x.
         """
-        X_subset = X[:, x.astype(bool)]
+        subset = self._get_selected_indices(x)
+        engine = getattr(self, "_engine", None)
+        if engine is not None:
+            with self._tracer.section("objective"):
+                return engine.mse(subset)
+        # Least squares in float64 whatever the storage dtype of X
+        X_subset = np.asarray(X[:, subset], dtype=np.float64)
         beta = np.linalg.lstsq(X_subset, y, rcond=None)[0]
         y_pred = X_subset @ beta
         return np.mean((y - y_pred) ** 2)
     
-    def _fibonacci(self, n):
-        """
-        Computes the nth Fibonacci number.
-        """
-        if n <= 0:
-            return 0
-        elif n == 1:
-            return 1
-        else:
-            return self._fibonacci(n - 1) + self._fibonacci(n - 2)
-    
     def _get_selected_indices(self, x):
         """
-        Returns the indices of the selected features based on the interpolated value of x.
-        """
-        return [int(np.floor(x)), int(np.ceil(x))]
-    
-    def transform(self, X):
-        """
-        Returns the data matrix X with only the selected features.
+        Returns the indices of the selected features based on the interpolated
+        value of x, clipped to the features of the fit.
         """
-        return X[:, self.feature_indices_]
+        last = self.n_features_in_ - 1
+        return [min(max(int(np.floor(x)), 0), last), min(max(int(np.ceil(x)), 0), last)]
+    
\ No newline at end of file
@@ -1,119 +1,267 @@
 import numpy as np
 from sklearn.base import BaseEstimator, TransformerMixin
 
-class SPFSR(BaseEstimator, TransformerMixin):
+from FeatureSelection.dtypes import as_float
+from FeatureSelection.path import SelectionPathMixin
+from FeatureSelection.plan import SelectionPlanMixin
+
+from .cache import ScoreCache, data_token
+from .checkpoint import Budget, Checkpointer, load_checkpoint, pack_features
+from .distributed import gram_remote
+from .kernels import ridge_coefficients, score_subsets, standardize, subset_gram
+from .trace import NULL_TRACER, make_tracer
+
+class SPFSR(SelectionPathMixin, SelectionPlanMixin, BaseEstimator, TransformerMixin):
     
-    def __init__(self, k=10, max_iter=100, tol=1e-6):
+    _tracer = NULL_TRACER
+
+    def __init__(self, k=10, max_iter=100, tol=1e-6, cache=None, cache_size=4096, callback=None, trace=False,
+                 warm_start=False, random_state=None, dtype=None, n_candidates=1, max_evaluations=None,
+                 max_seconds=None, checkpoint=None, checkpoint_interval=60.0, resume_from=None, scheduler=None):
         self.k = k
         self.max_iter = max_iter
         self.tol = tol
+        self.cache = cache
+        self.cache_size = cache_size
+        self.callback = callback
+        self.trace = trace
+        self.warm_start = warm_start
+        self.random_state = random_state
+        self.dtype = dtype
+        self.n_candidates = n_candidates
+        self.max_evaluations = max_evaluations
+        self.max_seconds = max_seconds
+        self.checkpoint = checkpoint
+        self.checkpoint_interval = checkpoint_interval
+        self.resume_from = resume_from
+        self.scheduler = scheduler
         self.selected_features_ = None
 
     def fit(self, X, y):
-        n_features = X.shape[1]
+        """
+        A feature set is scored as a whole by score_subsets: the GCV error of a
+        ridge regression of the target on its standardized columns, at the
+        penalty found by parabolic interpolation. Every iteration excludes a
+        random feature and keeps the exclusion unless it raises the error. The
+        retained features are ranked by the size of their ridge coefficients,
+        followed by the eliminated ones, last eliminated first.
+
+        With warm_start=True and a previous fit on the leading rows of X, the
+        search continues from the previous feature set, rescored on all rows,
+        instead of the full set; the features are ranked the same way either
+        way. Nothing else carries over: new rows move the mean and deviation
+        of every column, so the Gram matrices are computed afresh.
+
+        With n_candidates > 1 every iteration draws that many features to
+        exclude, scores all candidate sets in one batched kernel call and
+        continues with the candidate of lowest error.
+
+        The search stops early, keeping the best set so far, once
+        max_evaluations interpolations have been computed (a candidate batch
+        is cut to the evaluations left) or max_seconds have
+        passed. With checkpoint set, the search state is written to that file
+        every checkpoint_interval seconds and when a budget runs out;
+        resume_from continues the search from such a file.
+
+        With a scheduler (distributed.Scheduler) the Gram matrices of the
+        scored sets are computed on its workers, with the same results.
+        """
+        # Stored in the storage dtype, float32 for expression matrices; the
+        # scores are accumulated in float64
+        X = as_float(X, self.dtype)
+        # This fit's dataset on the scheduler's workers, held until the fit ends
+        self._setup_key = self.scheduler.setup("gram", X) if self.scheduler is not None else None
+        try:
+            return self._fit(X, y)
+        finally:
+            if self._setup_key is not None:
+                self.scheduler.release(self._setup_key)
+            self._setup_key = None
+
+    def _fit(self, X, y):
+        n_features = self.n_features_in_ = X.shape[1]
+        # Standardized columns and the Gram matrix of the current set, dropped after the fit
+        self._Z = standardize(X)
+        self._gram = None
         if self.k > n_features:
             self.k = n_features
-        # Initialize feature set with all features
-        selected_features = set(range(n_features))
-        x_min, f_min = self._parabolic_interpolation(X, y, selected_features)
-        for i in range(self.max_iter):
-            # Randomly choose a feature to exclude
-            excluded_feature = np.random.choice(list(selected_features))
-            candidate_features = selected_features - {excluded_feature}
-            # Perform parabolic interpolation on candidate features
-            x, f = self._parabolic_interpolation(X, y, candidate_features)
-            # Check for convergence
-            if np.abs(x_min - x) < self.tol:
+        # Scores of candidate sets, shared with other fits when a cache is passed in
+        self._cache = self.cache if self.cache is not None else ScoreCache(max_entries=self.cache_size)
+        self._data_token = data_token(X, y)
+        hits, misses = self._cache.hits, self._cache.misses
+        self._tracer = make_tracer(self.trace, self.callback)
+        # Own generator, so that concurrent fits do not share the global NumPy state
+        self._rng = np.random.default_rng(self.random_state)
+        state = load_checkpoint(self.resume_from, self, self._data_token) if self.resume_from is not None else None
+        resume = state is None and self._can_warm_start(X, y)
+        if not resume:
+            self.classes_ = [] if state is None else list(state["classes"])
+        codes = self._target_codes(y)
+        self._budget = Budget(self.max_evaluations, self.max_seconds, **(state["budget"] if state else {}))
+        checkpointer = Checkpointer(self.checkpoint, self.checkpoint_interval)
+        start, eliminated = 0, []
+        if state is not None:
+            self._rng = state["rng"]
+            self._cache.update(state["cache"])
+            selected_features = set(state["selected"].tolist())
+            x_min, f_min = state["best"]
+            start, eliminated = state["iteration"], state["eliminated"].tolist()
+        elif resume:
+            # The previous best score belongs to the previous rows
+            selected_features = set(self.search_features_)
+            x_min, f_min = self._score(X, codes, selected_features)
+        else:
+            # Initialize feature set with all features
+            selected_features = set(range(n_features))
+            x_min, f_min = self._score(X, codes, selected_features)
+        self.stop_reason_ = None
+        for i in range(start, self.max_iter):
+            if len(selected_features) < 2:
                 break
-            # Determine the points to retain for the next iteration
-            if x_min > x:
-                if f_min < f:
-                    selected_features.remove(excluded_feature)
-                    x_min, f_min = x, f
-                else:
-                    selected_features = candidate_features
-                    x_min, f_min = x, f
-            else:
-                if f < f_min:
-                    selected_features.add(excluded_feature)
-                    x_min, f_min = x, f
-        self.selected_features_ = list(selected_features)[:self.k]
-
-    def transform(self, X):
-        return X[:, self.selected_features_]
-
-    def _parabolic_interpolation(self, X, y, selected_features):
-        n_samples = X.shape[0]
-        indices = list(selected_features)
-        x1, x2, x3 = [X[:, i] for i in np.random.choice(indices, size=3, replace=False)]
-        f1, f2, f3 = [y[np.argmin(x)] for x in [x1, x2, x3]]
-        for i in range(self.max_iter):
-            # Perform parabolic interpolation
-            numerator = (x2 - x1) * (x2 - x3) * (f2 - f3) + (x2 - x3) * (x3 - x1) * (f2 - f1) + (x3 - x1) * (x1 - x2) * (f3 - f1)
-            denominator = (x2 - x1) * (x2 - x3) * (x3 - x1)
-            x = 0.5 * (x1 + x2 - numerator / denominator)
-            # Check for convergence
-            if np.abs(x - x2) < self.tol:
+            self.stop_reason_ = self._budget.exhausted()
+            if self.stop_reason_ is not None:
+                self._save_checkpoint(checkpointer, i, selected_features, (x_min, f_min), eliminated)
                 break
-            # Evaluate function at new point
-            f = y[np.argmin(X[:, indices] - x, axis=0)]
-            # Update points for next iteration
-            if f2 < f3:
-                x1, x3 = x3, x2
-                x2 = x
-                f1, f3 = f3, f2
-                f2 = f
+            if self.n_candidates > 1:
+                # Score several random exclusions at once and keep the best, no more than the budget has left
+                size = min(self.n_candidates, len(selected_features))
+                if self._budget.remaining() is not None:
+                    size = min(size, self._budget.remaining())
+                excluded = self._rng.choice(sorted(selected_features), size=size, replace=False)
+                results = self._score_batch(X, codes, selected_features, excluded)
+                best = min(range(len(excluded)), key=lambda c: results[c][1])
+                excluded_feature, (x, f) = excluded[best], results[best]
             else:
-                x2, x3 = x3, x1
-                x1 = x
-                f2, f1 = f1, f
+                # Randomly choose a feature to exclude
+                excluded_feature = self._rng.choice(sorted(selected_features))
+                x, f = self._score_batch(X, codes, selected_features, [excluded_feature])[0]
+            # Keep the exclusion unless it makes the set worse
+            if f <= f_min:
+                selected_features = selected_features - {excluded_feature}
+                x_min, f_min = x, f
+                eliminated.append(int(excluded_feature))
+            if self._tracer.iteration(i, selected_features, f_min):
+                break
+            if checkpointer.due():
+                self._save_checkpoint(checkpointer, i + 1, selected_features, (x_min, f_min), eliminated)
+        if self.warm_start:
+            self.n_samples_seen_ = X.shape[0]
+            self._seen_token = self._data_token
+            self.search_features_ = sorted(selected_features)
+        # Retained features by the size of their ridge coefficient at the best penalty
+        kept = np.array(sorted(selected_features), dtype=np.intp)
+        coefficients = ridge_coefficients(self._Z, kept, self._set_gram(kept), codes, x_min)
+        kept = kept[np.argsort(-np.abs(coefficients), kind="stable")].tolist()
+        # Retained features first, then the eliminated ones, last eliminated first
+        self.admission_order_ = kept + [int(j) for j in eliminated[::-1]]
+        self.selected_features_ = self.admission_order_[:self.k]
+        self.best_score_ = float(np.mean(f_min))
+        self.n_evaluations_ = self._budget.evaluations
+        self.cache_hits_ = self._cache.hits - hits
+        self.cache_misses_ = self._cache.misses - misses
+        del self._Z, self._gram
+        if self.trace:
+            self.trace_ = self._tracer
+        self._tracer = NULL_TRACER
+        return self
 
-        return x, f
+    def _can_warm_start(self, X, y):
+        """
+        Whether the previous fit saw exactly the leading rows of X and y.
+        """
+        if not self.warm_start or getattr(self, "_seen_token", None) is None:
+            return False
+        n_seen = self.n_samples_seen_
+        if X.shape[0] < n_seen:
+            return False
+        # The token also covers the number of features
+        return data_token(X[:n_seen], y[:n_seen]) == self._seen_token
 
-    def fit(self, X, y):
-        np.random.seed(self.random_state)
-        self.indices = np.random.choice(X.shape[1], size=self.num_features, replace=False)
-        selected_features = set(self.indices)
-        n_samples = X.shape[0]
-        x1, x2, x3 = [X[:, i] for i in np.random.choice(self.indices, size=3, replace=False)]
-        f1, f2, f3 = [y[np.argmin(x)] for x in [x1, x2, x3]]
-        for i in range(self.max_iter):
-            numerator = (x2 - x1) * (x2 - x3) * (f2 - f3) + (x2 - x3) * (x3 - x1) * (f2 - f1) + (x3 - x1) * (x1 - x2) * (f3 - f1)
-            denominator = (x2 - x1) * (x2 - x3) * (x3 - x1)
-            x = 0.5 * (x1 + x2 - numerator / denominator)
-            if np.abs(x - x2) < self.tol:
-                break
-            f = y[np.argmin(X[:, self.indices] - x, axis=0)]
-            if f2 < f3:
-                x1, x3 = x3, x2
-                x2 = x
-                f1, f3 = f3, f2
-                f2 = f
-            else:
-                x2, x3 = x3, x1
-                x1 = x
-                f2, f1 = f1, f
-            
-            # Determine the points to retain for the next iteration
-            if x < x2:
-                if f < f2:
-                    selected_features.add(self.indices[0])
-                    self.indices[0] = np.argmin(X[:, self.indices[0]])
-                else:
-                    selected_features.discard(self.indices[2])
-                    self.indices[2] = np.argmax(X[:, self.indices[2]])
+    def _target_codes(self, y):
+        """
+        Returns y as numbers, mapping non-numeric labels to stable integer codes.
+        """
+        y = np.asarray(y)
+        if y.dtype.kind in "biuf":
+            return y.astype(np.float64)
+        for label in dict.fromkeys(y.tolist()):
+            if label not in self.classes_:
+                self.classes_.append(label)
+        lookup = {label: i for i, label in enumerate(self.classes_)}
+        return np.array([lookup[label] for label in y.tolist()], dtype=np.float64)
+
+    def _save_checkpoint(self, checkpointer, iteration, selected_features, best, eliminated):
+        """
+        Writes the state at the start of iteration to the checkpoint file.
+        """
+        checkpointer.save(self, self._data_token, iteration=iteration, selected=pack_features(selected_features),
+                          best=best, eliminated=np.array(eliminated, dtype=np.int32), classes=list(self.classes_),
+                          rng=self._rng, cache=self._cache.items(), budget=self._budget.state())
+
+    def _evaluations(self, n_features):
+        """
+        Upper bound on the interpolations of a fit on n_features features, the
+        unit of max_evaluations: one for the initial set and at most n_candidates
+        per iteration.
+        """
+        evaluations = 1 + self.max_iter * min(self.n_candidates, n_features)
+        return evaluations if self.max_evaluations is None else min(evaluations, self.max_evaluations)
+
+    def _score(self, X, y, selected_features):
+        """
+        Returns the score of a feature set, computing it only on a cache miss.
+        """
+        return self._score_batch(X, y, selected_features, [None])[0]
+
+    def _score_batch(self, X, y, selected_features, excluded):
+        """
+        Returns the scores of selected_features without each feature of
+        excluded (None keeps the set whole), computing the cache misses in one batch.
+        """
+        with self._tracer.section("score"):
+            subsets = [selected_features if j is None else selected_features - {j} for j in excluded]
+            keys = [self._cache.key(self._data_token, subset, X.shape[1]) for subset in subsets]
+            results = [self._cache.get(key) for key in keys]
+            missing = [c for c, result in enumerate(results) if result is None]
+            self._tracer.count("cache_miss", len(missing))
+            self._tracer.count("cache_hit", len(subsets) - len(missing))
+            self._budget.spend(len(missing))
+            if missing:
+                computed = self._parabolic_interpolation(y, selected_features, [excluded[c] for c in missing])
             else:
-                if f < f2:
-                    selected_features.add(self.indices[2])
-                    self.indices[2] = np.argmin(X[:, self.indices[2]])
+                computed = []
+            for c, result in zip(missing, computed):
+                self._cache.put(keys[c], result)
+                results[c] = result
+        return results
+
+    def _parabolic_interpolation(self, y, selected_features, excluded):
+        """
+        Scores the candidates in one kernel call; a candidate's Gram matrix is
+        the one of the current set minus the excluded column's outer product.
+        """
+        gram = self._set_gram(np.array(sorted(selected_features), dtype=np.intp))
+        grams = np.repeat(gram[None], len(excluded), axis=0)
+        for c, j in enumerate(excluded):
+            if j is not None:
+                grams[c] -= np.outer(self._Z[:, j], self._Z[:, j])
+        with self._tracer.section("interpolation"):
+            return score_subsets(grams, y, self.max_iter, self.tol)
+
+    def _set_gram(self, columns):
+        """
+        Returns the Gram matrix of the sorted columns, computed from scratch
+        once per set so that it does not depend on the path of the search.
+        """
+        if self._gram is None or not np.array_equal(self._gram[0], columns):
+            with self._tracer.section("gram"):
+                if self.scheduler is not None:
+                    gram = gram_remote(self.scheduler, self._setup_key, columns)
                 else:
-                    selected_features.discard(self.indices[0])
-                    self.indices[0] = np.argmax(X[:, self.indices[0]])
-        return self
-    
-    def transform(self, X):
-        return X[:, self.indices]
-    
+                    gram = subset_gram(self._Z, columns)
+            self._gram = (columns, gram)
+        return self._gram[1]
+
     def fit_transform(self, X, y):
         self.fit(X, y)
         return self.transform(X)
\ No newline at end of file
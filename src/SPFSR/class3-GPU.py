@@ -1,90 +1,126 @@
 """
-NOTE: This code does not work on mac os, hence they do not support NVIDIA
+NOTE: The GPU path does not work on mac os, hence they do not support NVIDIA.
+CuPy is only imported when the 'cupy' backend is selected.
 """
 
 import numpy as np
-import pandas as pd
-import cupy as cp
-import cudf
 
-class SPFSR_GPU:
-    def __init__(self, estimator, k=10, max_iter=100, tol=1e-4, gpu=False):
+from FeatureSelection.backend import get_backend
+from FeatureSelection.path import SelectionPath
+from FeatureSelection.plan import SelectionPlanMixin
+
+from .forward import ForwardSelection
+from .parallel import effective_n_jobs, split_batches
+
+class SPFSR_GPU(SelectionPlanMixin):
+    def __init__(self, estimator, k=10, max_iter=100, tol=1e-4, gpu=False, backend=None, n_jobs=None,
+                 prefer="threads", verbose=False, scheduler=None):
         self.estimator = estimator
         self.k = k
         self.max_iter = max_iter
         self.tol = tol
         self.gpu = gpu
+        self.backend = backend
+        self.n_jobs = n_jobs
+        self.prefer = prefer
+        self.verbose = verbose
+        self.scheduler = scheduler
     
-    def _parabolic_interpolation(self, X, y, selected_features):
-        n_samples = X.shape[0]
-        indices = list(selected_features)
-        x1, x2, x3 = [X[:, i] for i in cp.random.choice(indices, size=3, replace=False)]
-        f1, f2, f3 = [y[cp.argmin(x)] for x in [x1, x2, x3]]
-        for i in range(self.max_iter):
-            # Perform parabolic interpolation
-            numerator = (x2 - x1) * (x2 - x3) * (f2 - f3) + (x2 - x3) * (x3 - x1) * (f2 - f1) + (x3 - x1) * (x1 - x2) * (f3 - f1)
-            denominator = (x2 - x1) * (x2 - x3) * (x3 - x1)
-            x = 0.5 * (x1 + x2 - numerator / denominator)
-            # Check for convergence
-            if cp.abs(x - x2) < self.tol:
-                break
-            # Evaluate function at new point
-            if self.gpu:
-                f = y[cp.argmin(cp.asnumpy(cp.abs(X[:, indices] - x)), axis=0)]
-            else:
-                f = y[np.argmin(np.abs(X[:, indices] - x), axis=0)]
-            # Update points for next iteration
-            if f2 < f3:
-                x1, x3 = x3, x2
-                x2 = x
-                f1, f3 = f3, f2
-                f2 = f
-            else:
-                x2, x3 = x3, x1
-                x1 = x
-                f2, f1 = f1, f
-
-        return x, f
+    def _get_backend(self):
+        name = self.backend or ("cupy" if self.gpu else "numpy")
+        return get_backend(name, n_jobs=self.n_jobs)
 
     def fit(self, X, y):
-        if self.gpu:
-            X = cudf.DataFrame.from_pandas(pd.DataFrame(X))
-            y = cudf.Series(y)
-        else:
-            X = pd.DataFrame(X)
+        backend = self._get_backend()
+        if backend.name == "numpy":
+            return self._fit_cpu(X, y)
+        return self._fit_backend(X, y, backend)
 
-        n_samples, n_features = X.shape
-        selected_features = set(range(n_features))
-        scores = np.zeros(n_features)
-        support = np.zeros(n_features, dtype=bool)
+    def _fit_backend(self, X, y, backend):
+        """
+        Forward selection on the backend's arrays: X and y are moved to the
+        device once, and every round scores the candidates in batches through
+        backend.map, each batch in its own device buffer of the selected
+        columns plus one spare column for the candidate.
+        """
+        xp = backend.xp
+        X_dev = backend.asarray(X)
+        y_dev = backend.asarray(y)
+        n_samples, n_features = X_dev.shape
         k = min(self.k, n_features)
+        n_batches = effective_n_jobs(self.n_jobs)
+        selected, best_scores = [], []
+        available = np.ones(n_features, dtype=bool)
+
+        def score_batch(candidates):
+            s = len(selected)
+            block = xp.empty((n_samples, s + 1), dtype=X_dev.dtype)
+            block[:, :s] = X_dev[:, selected]
+            scores = np.empty(len(candidates))
+            for i, j in enumerate(candidates):
+                block[:, s] = X_dev[:, j]
+                scores[i] = float(self.estimator.score(block, y_dev))
+            return scores
 
         for i in range(k):
-            scores.fill(0)
-            X_selected = X.iloc[:, list(selected_features)]
-            for j in range(n_features):
-                if j not in selected_features:
-                    X_temp = X_selected.copy()
-                    X_temp.insert(len(X_temp.columns), str(j), X.iloc[:, j])
-                    if self.gpu:
-                        X_temp = cp.asarray(X_temp.values)
-                    else:
-                        X_temp = X_temp.values
-                    score = self.estimator.score(X_temp, y)
-                    scores[j] = score
+            candidates = np.flatnonzero(available).tolist()
+            scores = np.concatenate(backend.map(score_batch, split_batches(candidates, n_batches)))
+            best = int(np.argmin(scores))
+            j_min = candidates[best]
+            selected.append(j_min)
+            best_scores.append(float(scores[best]))
+            available[j_min] = False
+            if self.verbose:
+                print(f"Selected feature {i+1}: {j_min}, score: {scores[best]:.4f}")
+
+        support = np.zeros(n_features, dtype=bool)
+        support[selected] = True
+        self.selected_features_ = selected
+        self.admission_order_ = selected
+        self.scores_ = np.asarray(best_scores)
+        self.n_features_in_ = n_features
+        self.support_ = support
+        return self
+
+    def _evaluations(self, n_features):
+        """
+        Number of estimator scores of a fit on n_features features: one per remaining candidate and round.
+        """
+        k = min(self.k, n_features)
+        return k * n_features - k * (k - 1) // 2
+
+    def fit_path(self, X, y, ks):
+        """
+        Runs max(ks) forward-selection rounds once and returns the SelectionPath for all k in ks.
+        """
+        k = self.k
+        self.k = max(ks)
+        try:
+            self.fit(X, y)
+        finally:
+            self.k = k
+        self.path_ = SelectionPath(self.admission_order_, ks)
+        return self.path_
 
-            # Determine the feature with the minimum score
-            if self.gpu:
-                j_min = cp.argmin(scores)
-            else:
-                j_min = np.argmin(scores)
+    def _fit_cpu(self, X, y):
+        """
+        Forward selection on NumPy buffers, scoring candidates across n_jobs
+        workers, or on the workers of scheduler (a distributed.Scheduler) if given.
+        """
+        X = np.asarray(X)
+        y = np.asarray(y)
+        engine = ForwardSelection(self.estimator, self.k, n_jobs=self.n_jobs, prefer=self.prefer, scheduler=self.scheduler)
 
-            # Update selected features and support
-            selected_features.add(j_min)
-            selected_features.discard(j)
-            support[j_min] = True
+        def report(i, j, score):
             if self.verbose:
-                print(f"Selected feature {i+1}: {j_min}, score: {scores[j_min]:.4f}")
+                print(f"Selected feature {i+1}: {j}, score: {score:.4f}")
 
+        selected, scores = engine.run(X, y, callback=report)
+        support = np.zeros(X.shape[1], dtype=bool)
+        support[selected] = True
+        self.selected_features_ = selected
+        self.admission_order_ = selected
+        self.scores_ = scores
+        self.n_features_in_ = X.shape[1]
         self.support_ = support
         return self
\ No newline at end of file
@@ -2,60 +2,153 @@ import numpy as np
 import pandas as pd
 from sklearn.base import BaseEstimator, TransformerMixin
 
+from FeatureSelection.dtypes import as_float
+from FeatureSelection.path import SelectionPathMixin
+from FeatureSelection.plan import SelectionPlanMixin
 
-class SPFSR(BaseEstimator, TransformerMixin):
-    def __init__(self, n_features, max_iter=10, tol=1e-5):
+from .cache import data_token
+from .checkpoint import Budget, Checkpointer, load_checkpoint, pack_features
+from .colindex import column_index
+from .kernels import interpolate_batch
+from .trace import NULL_TRACER, make_tracer
+
+
+class SPFSR(SelectionPathMixin, SelectionPlanMixin, BaseEstimator, TransformerMixin):
+    _tracer = NULL_TRACER
+
+    def __init__(self, n_features, max_iter=10, tol=1e-5, callback=None, trace=False, random_state=None, dtype=None,
+                 engine="auto", max_evaluations=None, max_seconds=None, checkpoint=None, checkpoint_interval=60.0,
+                 resume_from=None, n_candidates=1):
         self.n_features = n_features
         self.max_iter = max_iter
         self.tol = tol
+        self.callback = callback
+        self.trace = trace
+        self.random_state = random_state
+        self.dtype = dtype
+        self.engine = engine
+        self.max_evaluations = max_evaluations
+        self.max_seconds = max_seconds
+        self.checkpoint = checkpoint
+        self.checkpoint_interval = checkpoint_interval
+        self.resume_from = resume_from
+        self.n_candidates = n_candidates
 
     def fit(self, X, y):
+        """
+        Adds features to the first n_features until all features are selected,
+        max_evaluations interpolations have run or max_seconds have passed.
+
+        With n_candidates > 1 every iteration starts that many searches from
+        random probe rows, runs them in one batched kernel call and continues
+        from the lowest point found; each search counts as one interpolation.
+
+        With checkpoint set, the search state is written to that file every
+        checkpoint_interval seconds and when a budget runs out; resume_from
+        continues the search from such a file.
+        """
+        X = as_float(X, self.dtype)
         n_samples, n_features = X.shape
+        self.n_features_in_ = n_features
+        # Per-column sort for the nearest-value lookups, rebuilt only when X changed
+        self._colindex = column_index(X, getattr(self, "_colindex", None))
 
         if self.n_features >= n_features:
             raise ValueError("Number of selected features must be less than the total number of features")
 
-        # Initialize set of selected features with the first n_features indices
-        selected_features = set(range(self.n_features))
+        # Only hashed when a checkpoint is read or written
+        token = data_token(X, y) if self.checkpoint is not None or self.resume_from is not None else None
+        state = load_checkpoint(self.resume_from, self, token) if self.resume_from is not None else None
+        self._tracer = tracer = make_tracer(self.trace, self.callback)
+        budget = Budget(self.max_evaluations, self.max_seconds, **(state["budget"] if state else {}))
+        checkpointer = Checkpointer(self.checkpoint, self.checkpoint_interval)
+        if state is not None:
+            selected_features = set(state["selected"].tolist())
+            admission_order = state["admission_order"].tolist()
+            self._rng = state["rng"]
+            iteration, f = state["iteration"], state["score"]
+        else:
+            # Initialize set of selected features with the first n_features indices
+            selected_features = set(range(self.n_features))
+            admission_order = list(range(self.n_features))
+            self._rng = np.random.default_rng(self.random_state)
+            iteration = 0
+            f = np.inf
+
+        columns = np.arange(n_features)
+        unselected = np.ones(n_features, dtype=bool)
+        unselected[sorted(selected_features)] = False
 
+        self.stop_reason_ = None
         while len(selected_features) < n_features:
-            # Find the point with minimum function value using parabolic interpolation
-            x, f = self._parabolic_interpolation(X, y, selected_features)
+            self.stop_reason_ = budget.exhausted()
+            if self.stop_reason_ is not None:
+                self._save_checkpoint(checkpointer, token, budget, iteration, selected_features, admission_order, f)
+                break
+            # Find the point with minimum function value using parabolic interpolation,
+            # from no more starts than the budget has left
+            n_candidates = self.n_candidates
+            if budget.remaining() is not None:
+                n_candidates = min(n_candidates, budget.remaining())
+            x, f = self._parabolic_interpolation(X, y, selected_features, n_candidates)
+            budget.spend(n_candidates)
 
-            # Add the new index to the set of selected features
-            selected_features.add(np.argmin(X[:, list(selected_features)] - x))
+            # Add the unselected feature with the value closest to x
+            with tracer.section("indexing"):
+                distance = np.abs(X[self._colindex.nearest(x, columns), columns] - x)
+            if not unselected[np.argmin(distance)]:
+                # The closest feature overall is already selected
+                tracer.count("duplicate_index")
+            j = int(np.argmin(np.where(unselected, distance, np.inf)))
+            selected_features.add(j)
+            admission_order.append(j)
+            unselected[j] = False
+
+            if tracer.iteration(iteration, selected_features, f):
+                break
+            iteration += 1
+            if checkpointer.due():
+                self._save_checkpoint(checkpointer, token, budget, iteration, selected_features, admission_order, f)
 
         # Store the indices of the selected features
         self.selected_indices_ = list(selected_features)
+        self.admission_order_ = admission_order
+        self.best_score_ = float(np.mean(f))
+        self.n_evaluations_ = budget.evaluations
+        if self.trace:
+            self.trace_ = tracer
+        self._tracer = NULL_TRACER
 
         return self
 
-    def transform(self, X):
-        return X[:, self.selected_indices_]
-
-    def _parabolic_interpolation(self, X, y, selected_features):
-        indices = list(selected_features)
-        x1, x2, x3 = X[:, np.random.choice(indices, size=3, replace=False)]
-        f1, f2, f3 = [y[np.argmin(x)] for x in [x1, x2, x3]]
-        for i in range(self.max_iter):
-            # Perform parabolic interpolation
-            numerator = (x2 - x1) * (x2 - x3) * (f2 - f3) + (x2 - x3) * (x3 - x1) * (f2 - f1) + (x3 - x1) * (x1 - x2) * (f3 - f1)
-            denominator = (x2 - x1) * (x2 - x3) * (x3 - x1)
-            x = 0.5 * (x1 + x2 - numerator / denominator)
-            # Check for convergence
-            if np.abs(x - x2) < self.tol:
-                break
-            # Evaluate function at new point
-            f = y[np.argmin(X[:, indices] - x, axis=0)]
-            # Update points for next iteration
-            if f2 < f3:
-                x1, x3 = x3, x2
-                x2 = x
-                f1, f3 = f3, f2
-                f2 = f
-            else:
-                x2, x3 = x3, x1
-                x1 = x
-                f2, f1 = f1, f
-
-        return x, f
+    def _evaluations(self, n_features):
+        """
+        Upper bound on the interpolations of a fit on n_features features, the
+        unit of max_evaluations: n_candidates for every feature admitted after
+        the first n_features.
+        """
+        evaluations = max(n_features - self.n_features, 0) * self.n_candidates
+        return evaluations if self.max_evaluations is None else min(evaluations, self.max_evaluations)
+
+    def _save_checkpoint(self, checkpointer, token, budget, iteration, selected_features, admission_order, f):
+        """
+        Writes the state at the start of iteration to the checkpoint file.
+        """
+        checkpointer.save(self, token, iteration=iteration, selected=pack_features(selected_features),
+                          admission_order=np.array(admission_order, dtype=np.int64), rng=self._rng, score=f,
+                          budget=budget.state())
+
+    def _parabolic_interpolation(self, X, y, selected_features, n_candidates=1):
+        with self._tracer.section("interpolation"):
+            return self._interpolate(X, y, selected_features, n_candidates)
+
+    def _interpolate(self, X, y, selected_features, n_candidates=1):
+        """
+        Searches the selected columns from n_candidates random probe triples in
+        one kernel call and returns the lowest (x, f) found.
+        """
+        probes = [self._rng.choice(X.shape[0], size=3, replace=False) for _ in range(n_candidates)]
+        indices = np.sort(np.fromiter(selected_features, dtype=np.intp, count=len(selected_features)))
+        results = interpolate_batch(X, y, self._colindex, [indices] * n_candidates, probes, self.max_iter, self.tol,
+                                    self.engine)
+        return min(results, key=lambda result: result[1])
@@ -0,0 +1,133 @@
+from concurrent.futures import as_completed
+
+import numpy as np
+from sklearn.metrics import check_scoring
+from sklearn.model_selection import check_cv
+from sklearn.preprocessing import StandardScaler
+
+from FeatureSelection.plan import copy_estimator, selected_indices
+
+from .parallel import effective_n_jobs, make_executor
+
+
+def _select_fold(selector, X, y, train, scale):
+    X_train = np.asarray(X[train], dtype=np.float64)
+    if scale:
+        scaler = StandardScaler().fit(X_train)
+        mean, std = scaler.mean_, scaler.scale_
+        X_train = scaler.transform(X_train)
+    else:
+        mean, std = np.zeros(X.shape[1]), np.ones(X.shape[1])
+    selector = copy_estimator(selector)
+    selector.fit(X_train, y[train])
+    indices = selected_indices(selector)
+    return mean[indices], std[indices], indices
+
+
+def _score_fold(estimator, X_selected, y, train, test, mean, std, scoring):
+    X_selected = (X_selected - mean) / std
+    estimator = copy_estimator(estimator).fit(X_selected[train], y[train])
+    return check_scoring(estimator, scoring)(estimator, X_selected[test], y[test])
+
+
+class SelectionCV:
+    """
+    Cross-validation of several classifiers behind one feature selector.
+
+    For every fold the StandardScaler statistics and the selected features
+    are computed once on the training part and shared by all classifiers,
+    so an E-classifier x F-fold grid costs F selections instead of E x F.
+    Selections and fold x classifier fits run on a worker pool; a fold's
+    classifier fits start as soon as its selection is done and receive only
+    the selected columns.
+
+    Parameters:
+    -----------
+    selector : object
+        Feature selector with fit(X, y), e.g. MicroarrayFeatureSelector or an SPFSR class.
+
+    estimators : dict
+        Classifiers keyed by name.
+
+    cv : int or cross-validation generator, optional (default=5)
+
+    scoring : str or callable, optional (default=None)
+        Scoring of the classifiers; None uses their score method.
+
+    scale : bool, optional (default=True)
+        Whether to standardize with the training fold's statistics before selecting.
+
+    n_jobs : int, optional (default=None)
+        Number of workers. None means 1 and -1 means all CPUs.
+
+    prefer : {'threads', 'processes'}, optional (default='processes')
+        Process workers are spawned and import the selector's and classifiers'
+        classes by name, so these must live in an importable module. Classes
+        defined in a notebook or an interactive __main__ break the pool
+        (BrokenProcessPool); use 'threads' for them.
+    """
+
+    def __init__(self, selector, estimators, cv=5, scoring=None, scale=True, n_jobs=None, prefer="processes"):
+        self.selector = selector
+        self.estimators = estimators
+        self.cv = cv
+        self.scoring = scoring
+        self.scale = scale
+        self.n_jobs = n_jobs
+        self.prefer = prefer
+
+    def run(self, X, y):
+        """
+        Returns the fold scores of every classifier, keyed by classifier name.
+        """
+        return self.run_many({None: (X, y)})[None]
+
+    def run_many(self, datasets):
+        """
+        Runs the grid on several datasets, given as {name: (X, y)}.
+
+        Returns {dataset: {classifier: fold scores}}. The selected indices of
+        every dataset and fold are kept in selections_.
+        """
+        folds = {}
+        for name, (X, y) in datasets.items():
+            y = np.asarray(y)
+            folds[name] = list(check_cv(self.cv, y, classifier=True).split(X, y))
+        scores = {name: {e: np.empty(len(folds[name])) for e in self.estimators} for name in datasets}
+        self.selections_ = {name: [None] * len(folds[name]) for name in datasets}
+
+        if effective_n_jobs(self.n_jobs) == 1:
+            for name, (X, y) in datasets.items():
+                y = np.asarray(y)
+                for f, (train, test) in enumerate(folds[name]):
+                    mean, std, indices = _select_fold(self.selector, X, y, train, self.scale)
+                    self.selections_[name][f] = indices
+                    X_selected = np.asarray(X[:, indices], dtype=np.float64)
+                    for e, estimator in self.estimators.items():
+                        scores[name][e][f] = _score_fold(estimator, X_selected, y, train, test, mean, std,
+                                                         self.scoring)
+            return scores
+
+        with make_executor(self.n_jobs, self.prefer) as executor:
+            selections = {}
+            for name, (X, y) in datasets.items():
+                y = np.asarray(y)
+                for f, (train, test) in enumerate(folds[name]):
+                    future = executor.submit(_select_fold, self.selector, X, y, train, self.scale)
+                    selections[future] = (name, f)
+            fits = {}
+            for future in as_completed(selections):
+                name, f = selections[future]
+                mean, std, indices = future.result()
+                self.selections_[name][f] = indices
+                X, y = datasets[name]
+                y = np.asarray(y)
+                X_selected = np.asarray(X[:, indices], dtype=np.float64)
+                train, test = folds[name][f]
+                for e, estimator in self.estimators.items():
+                    fit = executor.submit(_score_fold, estimator, X_selected, y, train, test, mean, std, self.scoring)
+                    fits[fit] = (name, e, f)
+            for fit in as_completed(fits):
+                name, e, f = fits[fit]
+                scores[name][e][f] = fit.result()
+        return scores
@@ -0,0 +1,422 @@
+"""
+Candidate scoring spread over worker processes on one or several machines.
+
+A Scheduler listens for workers over multiprocessing.connection sockets. The
+dataset and the scoring routine of a setup are shipped to a worker once,
+before its first task of that setup; afterwards only batches of feature
+indices go out and scores come back. Every task names its setup, so fits on
+different data can share one scheduler. Workers pull one task at a time, so
+faster workers take more of them. A task whose worker disconnects or exceeds
+lease_timeout is requeued, and once the queue is empty an idle worker also
+runs a copy of a task that has run for much longer than the average; the
+first result wins.
+
+    # coordinator, with 4 local workers and any number of remote ones
+    with Scheduler(address=("0.0.0.0", 6000), authkey=b"secret", n_local_workers=4) as scheduler:
+        SPFSR(k=20, scheduler=scheduler).fit(X, y)
+
+        # or directly: setup returns the key that map runs under, held until released
+        key = scheduler.setup("gram", X)
+        try:
+            partials = scheduler.map(key, [blocks])
+        finally:
+            scheduler.release(key)
+
+    # on every other machine
+    python -m SPFSR.distributed coordinator-host:6000 --authkey secret
+"""
+
+import argparse
+import hashlib
+import os
+import pickle
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from multiprocessing import AuthenticationError, get_context
+from multiprocessing.connection import Client, Listener
+
+import numpy as np
+
+from .forward import _CandidateScorer
+from .kernels import gram_blocks, partial_grams, standardize
+
+
+class _ForwardHandler:
+    """
+    Scores candidate columns appended to the selected block, see forward.ForwardSelection.
+    """
+
+    def __init__(self, X, y, estimator, k):
+        self.scorer = _CandidateScorer(X, y, estimator, k)
+
+    def __call__(self, payload):
+        selected, candidates = payload
+        return self.scorer.score_batch(list(selected), np.asarray(candidates).tolist())
+
+
+class _GramHandler:
+    """
+    Computes partial Gram matrices of blocks of standardized columns, see kernels.subset_gram.
+    """
+
+    def __init__(self, X):
+        self.Z = standardize(X)
+
+    def __call__(self, blocks):
+        return partial_grams(self.Z, blocks)
+
+
+HANDLERS = {"forward": _ForwardHandler, "gram": _GramHandler}
+
+
+def run_worker(address, authkey, connect_timeout=30.0):
+    """
+    Connects to the scheduler at address and runs its tasks until it says stop or goes away.
+    """
+    deadline = time.monotonic() + connect_timeout
+    while True:
+        try:
+            conn = Client(address, authkey=authkey)
+            break
+        except ConnectionRefusedError:
+            # The coordinator may not be listening yet
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.5)
+    # Setup key -> (handler, None) or (None, traceback of the failed setup)
+    handlers = {}
+    with conn:
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                return
+            if message[0] == "stop":
+                return
+            if message[0] == "setup":
+                _, key, blob = message
+                try:
+                    name, args = pickle.loads(blob)
+                    handlers[key] = (HANDLERS[name](*args), None)
+                except Exception:
+                    # Reported with every task; dying instead would get the task retried forever
+                    handlers[key] = (None, traceback.format_exc())
+                continue
+            if message[0] == "drop":
+                handlers.pop(message[1], None)
+                continue
+            _, task_id, key, payload = message
+            handler, setup_error = handlers[key]
+            if setup_error is not None:
+                conn.send(("error", task_id, setup_error))
+                continue
+            try:
+                reply = ("result", task_id, handler(payload))
+            except Exception:
+                reply = ("error", task_id, traceback.format_exc())
+            conn.send(reply)
+
+
+class Scheduler:
+    """
+    Coordinator that farms out scoring tasks to connected workers.
+
+    Parameters:
+    -----------
+    address : tuple, optional (default=('localhost', 0))
+        (host, port) to listen on. Port 0 picks a free port; the bound address is in address_.
+
+    authkey : bytes or str, optional (default=None)
+        Shared secret of coordinator and workers. None uses $SPFSR_AUTHKEY, or a random key.
+
+    n_local_workers : int, optional (default=0)
+        Number of worker processes started on this machine. -1 means one per CPU.
+
+    lease_timeout : float, optional (default=300)
+        Seconds a worker may spend on one task before it is dropped and the task requeued.
+
+    steal_factor : float, optional (default=3)
+        A running task is duplicated onto an idle worker once it has run steal_factor
+        times longer than the mean task. None disables duplication.
+
+    batches_per_worker : int, optional (default=4)
+        Number of tasks per connected worker that callers split their work into.
+    """
+
+    def __init__(self, address=("localhost", 0), authkey=None, n_local_workers=0, lease_timeout=300.0, steal_factor=3.0,
+                 batches_per_worker=4):
+        self.address = address
+        authkey = authkey if authkey is not None else os.environ.get("SPFSR_AUTHKEY")
+        self.authkey = authkey.encode() if isinstance(authkey, str) else (authkey or os.urandom(32))
+        self.n_local_workers = n_local_workers
+        self.lease_timeout = lease_timeout
+        self.steal_factor = steal_factor
+        self.batches_per_worker = batches_per_worker
+        self._cond = threading.Condition()
+        self._listener = None
+        self._processes = []
+        # Setup key -> [pickled (handler, args), number of holders]
+        self._setups = {}
+        self._next_id = 0
+        self._pending = deque()
+        self._tasks = {}
+        self._running = {}
+        self._started = {}
+        self._results = {}
+        self._error = None
+        self._mean_duration = None
+        self._n_workers = 0
+        self._closed = False
+
+    # Shared, not copied, when an estimator holding it is cloned
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    @property
+    def n_workers(self):
+        return self._n_workers
+
+    @property
+    def n_batches(self):
+        """
+        Number of tasks to split one round of work into.
+        """
+        return max(self._n_workers, 1) * self.batches_per_worker
+
+    def start(self):
+        if self._listener is not None:
+            return self
+        self._listener = Listener(self.address, authkey=self.authkey)
+        self.address_ = self._listener.address
+        n_local = self.n_local_workers if self.n_local_workers >= 0 else (os.cpu_count() or 1)
+        # Not forked: the parent may already run numba, BLAS or our own threads
+        context = get_context("spawn")
+        for _ in range(n_local):
+            process = context.Process(target=run_worker, args=(self.address_, self.authkey), daemon=True)
+            process.start()
+            self._processes.append(process)
+        threading.Thread(target=self._accept, daemon=True).start()
+        return self
+
+    def _accept(self):
+        while not self._closed:
+            try:
+                conn = self._listener.accept()
+            except (AuthenticationError, EOFError):
+                continue
+            except OSError:
+                return
+            if self._closed:
+                conn.close()
+                return
+            with self._cond:
+                self._n_workers += 1
+                self._cond.notify_all()
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def setup(self, handler, *args):
+        """
+        Registers a scoring routine (a key of HANDLERS) and its data, and returns
+        the key that map calls pass to run it. A worker receives a setup once,
+        before its first task of it; identical setups share one key.
+
+        Every setup call must be paired with a release of its key.
+        """
+        if handler not in HANDLERS:
+            raise ValueError(f"handler must be one of {sorted(HANDLERS)}, got {handler!r}")
+        self.start()
+        blob = pickle.dumps((handler, args), protocol=pickle.HIGHEST_PROTOCOL)
+        key = hashlib.blake2b(blob, digest_size=16).hexdigest()
+        with self._cond:
+            self._setups.setdefault(key, [blob, 0])[1] += 1
+        return key
+
+    def release(self, key):
+        """
+        Drops a hold on the setup under key; workers discard it once no caller holds it.
+        """
+        with self._cond:
+            entry = self._setups[key]
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._setups[key]
+                self._cond.notify_all()
+
+    def map(self, key, payloads):
+        """
+        Runs the handler of the setup under key on every payload across the
+        workers and returns the results in order.
+        """
+        with self._cond:
+            if key not in self._setups:
+                raise RuntimeError("map needs the key of a setup that has not been released")
+            ids = list(range(self._next_id, self._next_id + len(payloads)))
+            self._next_id += len(payloads)
+            for task_id, payload in zip(ids, payloads):
+                self._tasks[task_id] = (key, payload)
+                self._running[task_id] = 0
+            self._pending.extend(ids)
+            self._cond.notify_all()
+            idle_since = time.monotonic()
+            try:
+                while self._error is None and any(task_id not in self._results for task_id in ids):
+                    if self._n_workers:
+                        idle_since = time.monotonic()
+                    elif self._processes and not any(process.is_alive() for process in self._processes):
+                        exitcodes = [process.exitcode for process in self._processes]
+                        raise RuntimeError(f"all local workers exited (exit codes {exitcodes}) and no worker is "
+                                           "connected; spawned workers import the main module, which must guard "
+                                           "its entry point with if __name__ == '__main__'")
+                    elif time.monotonic() - idle_since > self.lease_timeout:
+                        raise RuntimeError(f"no worker connected to {self.address_} for {self.lease_timeout}s")
+                    self._cond.wait(1.0)
+                if self._error is not None:
+                    raise RuntimeError(f"a worker task failed:\n{self._error}")
+                return [self._results[task_id] for task_id in ids]
+            finally:
+                self._error = None
+                for task_id in ids:
+                    for state in (self._tasks, self._running, self._started, self._results):
+                        state.pop(task_id, None)
+
+    def _next_task(self):
+        """
+        Returns the next task id for an idle worker, waiting for one; None once closed. Holds _cond.
+        """
+        while not self._closed:
+            while self._pending:
+                task_id = self._pending.popleft()
+                if task_id in self._tasks and task_id not in self._results:
+                    self._running[task_id] += 1
+                    self._started.setdefault(task_id, time.monotonic())
+                    return task_id
+            if self.steal_factor is not None and self._mean_duration is not None:
+                # Back up the oldest straggler that runs on a single worker
+                threshold = time.monotonic() - self.steal_factor * self._mean_duration
+                stragglers = [task_id for task_id, n in self._running.items()
+                              if n == 1 and task_id not in self._results and self._started[task_id] < threshold]
+                if stragglers:
+                    task_id = min(stragglers, key=self._started.get)
+                    self._running[task_id] += 1
+                    return task_id
+            self._cond.wait(0.05 if self._running else None)
+        return None
+
+    def _serve(self, conn):
+        # Setups this worker holds
+        sent, task_id = set(), None
+        try:
+            while True:
+                with self._cond:
+                    task_id = self._next_task()
+                    if task_id is None:
+                        conn.send(("stop",))
+                        return
+                    key, payload = self._tasks[task_id]
+                    blob = self._setups[key][0] if key not in sent else None
+                    released = [old for old in sent if old not in self._setups]
+                for old in released:
+                    conn.send(("drop", old))
+                    sent.discard(old)
+                if blob is not None:
+                    conn.send(("setup", key, blob))
+                    sent.add(key)
+                conn.send(("task", task_id, key, payload))
+                if not conn.poll(self.lease_timeout):
+                    raise TimeoutError
+                kind, done_id, value = conn.recv()
+                with self._cond:
+                    self._finish(done_id, kind, value)
+                    task_id = None
+        except (EOFError, OSError, TimeoutError):
+            pass
+        finally:
+            with self._cond:
+                if task_id is not None and task_id in self._running:
+                    # Lost with the worker; rerun unless another copy is still running
+                    self._running[task_id] -= 1
+                    if task_id not in self._results and self._running[task_id] == 0:
+                        self._pending.appendleft(task_id)
+                self._n_workers -= 1
+                self._cond.notify_all()
+            conn.close()
+
+    def _finish(self, task_id, kind, value):
+        if task_id not in self._tasks:
+            # Late copy of a task of an earlier map
+            return
+        self._running[task_id] -= 1
+        if task_id in self._results:
+            return
+        if kind == "error":
+            self._error = value
+        else:
+            self._results[task_id] = value
+            duration = time.monotonic() - self._started[task_id]
+            self._mean_duration = duration if self._mean_duration is None else 0.9 * self._mean_duration + 0.1 * duration
+        self._cond.notify_all()
+
+    def close(self):
+        if self._listener is None or self._closed:
+            return
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        try:
+            # Wakes the accept thread
+            Client(self.address_, authkey=self.authkey).close()
+        except OSError:
+            pass
+        self._listener.close()
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def gram_remote(scheduler, key, columns):
+    """
+    Same result as kernels.subset_gram on the dataset of the "gram" setup under
+    key, with the column blocks spread over the workers and summed in the same order.
+    """
+    blocks = gram_blocks(np.asarray(columns, dtype=np.intp))
+    tasks = [list(chunk) for chunk in np.array_split(np.arange(len(blocks)), min(scheduler.n_batches, len(blocks)))]
+    gram = None
+    for partials in scheduler.map(key, [[blocks[b] for b in task] for task in tasks]):
+        for partial in partials:
+            if gram is None:
+                gram = np.zeros_like(partial)
+            gram += partial
+    return gram
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a scoring worker for a SPFSR scheduler.")
+    parser.add_argument("address", help="host:port of the coordinator")
+    parser.add_argument("--authkey", default=os.environ.get("SPFSR_AUTHKEY"),
+                        help="shared secret, defaults to $SPFSR_AUTHKEY")
+    parser.add_argument("--connect-timeout", type=float, default=30.0)
+    args = parser.parse_args(argv)
+    if not args.authkey:
+        parser.error("--authkey or $SPFSR_AUTHKEY is required")
+    host, _, port = args.address.rpartition(":")
+    run_worker((host, int(port)), args.authkey.encode(), args.connect_timeout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
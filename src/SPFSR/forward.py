@@ -0,0 +1,147 @@
+import copy
+import threading
+
+import numpy as np
+
+from .parallel import effective_n_jobs, make_executor, split_batches
+
+
+class _CandidateScorer:
+    """
+    Scores candidate columns appended to the selected block.
+
+    Every thread keeps one Fortran-ordered buffer of shape (n_samples, k + 1).
+    The selected columns are copied into it once per round, and each candidate
+    overwrites the spare column after them, so scoring a candidate costs one
+    column copy and no allocation.
+    """
+
+    def __init__(self, X, y, estimator, k):
+        self.X = np.asfortranarray(X)
+        self.y = y
+        self.estimator = estimator
+        self.k = k
+        self._local = threading.local()
+
+    def _state(self):
+        local = self._local
+        if not hasattr(local, "buffer"):
+            local.buffer = np.empty((self.X.shape[0], self.k + 1), dtype=self.X.dtype, order="F")
+            local.selected = None
+            local.estimator = copy.deepcopy(self.estimator)
+        return local
+
+    def score_batch(self, selected, candidates):
+        local = self._state()
+        s = len(selected)
+        if local.selected != selected:
+            local.buffer[:, :s] = self.X[:, selected]
+            local.selected = list(selected)
+        block = local.buffer[:, :s + 1]
+        scores = np.empty(len(candidates))
+        for i, j in enumerate(candidates):
+            block[:, s] = self.X[:, j]
+            scores[i] = local.estimator.score(block, self.y)
+        return scores
+
+
+_worker_scorer = None
+
+
+def _init_worker(X, y, estimator, k):
+    global _worker_scorer
+    _worker_scorer = _CandidateScorer(X, y, estimator, k)
+
+
+def _score_batch(selected, candidates):
+    return _worker_scorer.score_batch(selected, candidates)
+
+
+class ForwardSelection:
+    """
+    Greedy forward selection that adds, in each of k rounds, the candidate
+    feature with the minimum estimator.score on the selected block plus
+    that candidate.
+
+    Parameters:
+    -----------
+    estimator : object
+        Object with a score(X, y) method; lower scores are better.
+
+    k : int
+        Number of features to select.
+
+    n_jobs : int, optional (default=None)
+        Number of workers used to score candidates. None means 1 and -1 means all CPUs.
+
+    prefer : {'threads', 'processes'}, optional (default='threads')
+        Pool type. Process workers receive X, y and the estimator once, when they start.
+        Process workers are spawned and import the estimator's class by name,
+        so an estimator defined in a notebook or an interactive __main__ needs
+        'threads'.
+
+    batches_per_job : int, optional (default=4)
+        Number of candidate batches per worker and round, to balance the load.
+
+    scheduler : distributed.Scheduler, optional (default=None)
+        Scores the candidates on the scheduler's workers instead; n_jobs and prefer are then ignored.
+    """
+
+    def __init__(self, estimator, k, n_jobs=None, prefer="threads", batches_per_job=4, scheduler=None):
+        self.estimator = estimator
+        self.k = k
+        self.n_jobs = n_jobs
+        self.prefer = prefer
+        self.batches_per_job = batches_per_job
+        self.scheduler = scheduler
+
+    def run(self, X, y, callback=None):
+        """
+        Runs the selection and returns the selected indices in admission order
+        together with the score of each admitted feature.
+        """
+        X = np.asarray(X)
+        n_features = X.shape[1]
+        k = min(self.k, n_features)
+        n_jobs = effective_n_jobs(self.n_jobs)
+        selected, best_scores = [], []
+        available = np.ones(n_features, dtype=bool)
+
+        executor, key = None, None
+        if self.scheduler is not None:
+            # Workers receive X, y and the estimator once, then candidate batches
+            key = self.scheduler.setup("forward", X, y, self.estimator, k)
+        elif n_jobs > 1 and self.prefer == "processes":
+            executor = make_executor(n_jobs, "processes", _init_worker, (X, y, self.estimator, k))
+            score = _score_batch
+        else:
+            scorer = _CandidateScorer(X, y, self.estimator, k)
+            executor = make_executor(n_jobs, "threads") if n_jobs > 1 else None
+            score = scorer.score_batch
+
+        try:
+            for i in range(k):
+                candidates = np.flatnonzero(available).tolist()
+                if self.scheduler is not None:
+                    batches = split_batches(candidates, self.scheduler.n_batches)
+                    scores = np.concatenate(self.scheduler.map(key, [(list(selected), b) for b in batches]))
+                elif executor is None:
+                    scores = score(selected, candidates)
+                else:
+                    batches = split_batches(candidates, n_jobs * self.batches_per_job)
+                    futures = [executor.submit(score, list(selected), b) for b in batches]
+                    scores = np.concatenate([f.result() for f in futures])
+                best = int(np.argmin(scores))
+                j_min = candidates[best]
+                selected.append(j_min)
+                best_scores.append(float(scores[best]))
+                available[j_min] = False
+                if callback is not None:
+                    callback(i, j_min, scores[best])
+        finally:
+            if executor is not None:
+                executor.shutdown()
+            if key is not None:
+                self.scheduler.release(key)
+
+        return selected, np.asarray(best_scores)
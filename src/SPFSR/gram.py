@@ -0,0 +1,184 @@
+import numpy as np
+from scipy.linalg import solve_triangular
+
+from FeatureSelection.dtypes import ACCUMULATOR
+
+
+class SubsetRegression:
+    """
+    Least-squares scoring of feature subsets through a cached Cholesky factor.
+
+    A subset is scored through the Cholesky factor of the Gram matrix of its
+    columns, and the factor is updated with rank-one add/drop steps when the
+    next subset is a neighbour of the previous one. Gram entries are computed
+    only for the columns a subset touches, so a probe of s columns that adds
+    a columns costs O(n * a * s + s^2), whatever the number of features.
+
+    Parameters:
+    -----------
+    X : array-like of shape (n_samples, n_features)
+        The training input samples, kept without copying. float32 columns are
+        upcast when they are used; the Gram entries and the factor are float64.
+
+    y : array-like of shape (n_samples,)
+        Numeric target values.
+
+    max_updates : int, optional (default=8)
+        Largest number of added plus dropped columns handled by updating the
+        cached factor. Larger jumps refactorize from scratch.
+
+    eps : float, optional (default=1e-10)
+        Relative pivot below which a column is treated as linearly dependent
+        on the columns already in the factor.
+    """
+
+    def __init__(self, X, y, max_updates=8, eps=1e-10):
+        X = np.asarray(X)
+        self.n_samples, self.n_features = X.shape
+        self.max_updates = max_updates
+        self.eps = eps
+        self.X = X
+        self.y = np.asarray(y, dtype=ACCUMULATOR)
+        self.yty = float(self.y @ self.y)
+        # X^T y of the columns used so far
+        self._xty = {}
+        self._reset()
+
+    def _reset(self):
+        self._cols = []
+        self._dependent = set()
+        self._L = np.zeros((16, 16))
+        self._z = np.zeros(16)
+
+    def _columns(self, columns):
+        return np.asarray(self.X[:, columns], dtype=ACCUMULATOR)
+
+    def xty(self, columns):
+        """
+        Returns X^T y restricted to the given columns.
+        """
+        missing = [j for j in columns if j not in self._xty]
+        if missing:
+            self._xty.update(zip(missing, (self._columns(missing).T @ self.y).tolist()))
+        return np.array([self._xty[j] for j in columns])
+
+    def _as_indices(self, subset):
+        subset = np.asarray(subset)
+        if subset.dtype == bool and subset.shape == (self.n_features,):
+            return np.flatnonzero(subset)
+        return np.unique(subset.astype(np.intp).ravel())
+
+    def _grow(self, r):
+        if r < len(self._z):
+            return
+        size = 2 * len(self._z)
+        L = np.zeros((size, size))
+        L[:r, :r] = self._L[:r, :r]
+        z = np.zeros(size)
+        z[:r] = self._z[:r]
+        self._L, self._z = L, z
+
+    def _add(self, j):
+        r = len(self._cols)
+        self._grow(r)
+        L = self._L
+        x = self._columns(j)
+        if r:
+            w = solve_triangular(L[:r, :r], self._columns(self._cols).T @ x, lower=True, check_finite=False)
+        else:
+            w = np.zeros(0)
+        xx = x @ x
+        d2 = xx - w @ w
+        if d2 <= self.eps * max(xx, 1.0):
+            self._dependent.add(j)
+            return
+        d = np.sqrt(d2)
+        L[r, :r] = w
+        L[r, r] = d
+        self._z[r] = (self.xty([j])[0] - w @ self._z[:r]) / d
+        self._cols.append(j)
+
+    def _drop(self, j):
+        if j in self._dependent:
+            self._dependent.discard(j)
+            return
+        r = len(self._cols)
+        q = self._cols.index(j)
+        del self._cols[q]
+        L = self._L
+        # Remove row q, then rotate columns to restore the lower-triangular form
+        L[q:r - 1, :r] = L[q + 1:r, :r]
+        L[r - 1, :r] = 0.0
+        for k in range(q, r - 1):
+            a, b = L[k, k], L[k, k + 1]
+            rho = np.hypot(a, b)
+            c, s = a / rho, b / rho
+            col_k = L[k:r - 1, k].copy()
+            L[k:r - 1, k] = c * col_k + s * L[k:r - 1, k + 1]
+            L[k:r - 1, k + 1] = -s * col_k + c * L[k:r - 1, k + 1]
+            L[k, k + 1] = 0.0
+        L[:r, r - 1] = 0.0
+        r -= 1
+        if r:
+            self._z[:r] = solve_triangular(L[:r, :r], self.xty(self._cols), lower=True, check_finite=False)
+        self._z[r] = 0.0
+        # Columns that were dependent may span new directions now
+        dependent, self._dependent = self._dependent, set()
+        for i in sorted(dependent):
+            self._add(i)
+
+    def rss(self, subset):
+        """
+        Returns the residual sum of squares of regressing y on the given subset.
+
+        The subset is a boolean mask of length n_features or an array of column indices.
+        """
+        target = self._as_indices(subset)
+        current = set(self._cols) | self._dependent
+        wanted = set(target.tolist())
+        add, drop = wanted - current, current - wanted
+        if len(add) + len(drop) > self.max_updates:
+            self._reset()
+            add, drop = wanted, set()
+        for j in sorted(drop):
+            self._drop(j)
+        for j in sorted(add):
+            self._add(j)
+        z = self._z[:len(self._cols)]
+        return max(self.yty - z @ z, 0.0)
+
+    def mse(self, subset):
+        """
+        Returns the mean squared error of the least-squares fit on the given subset.
+        """
+        return self.rss(subset) / self.n_samples
+
+
+def lstsq_mse(X, y, subset):
+    """
+    Reference mean squared error computed with a full np.linalg.lstsq solve.
+    """
+    X_subset = np.asarray(X)[:, subset].astype(np.float64)
+    beta = np.linalg.lstsq(X_subset, y, rcond=None)[0]
+    y_pred = X_subset @ beta
+    return np.mean((y - y_pred) ** 2)
+
+
+def check_subset_mse(X, y, subsets, rtol=1e-6, atol=1e-8):
+    """
+    Checks that SubsetRegression gives the same MSE as the lstsq path.
+
+    The subsets are scored in order on one engine, so neighbouring subsets
+    exercise the incremental add/drop updates. Raises AssertionError on the
+    first mismatch and returns the largest absolute deviation otherwise.
+    """
+    engine = SubsetRegression(X, y)
+    worst = 0.0
+    for subset in subsets:
+        expected = lstsq_mse(X, y, subset)
+        actual = engine.mse(subset)
+        if not np.isclose(actual, expected, rtol=rtol, atol=atol):
+            raise AssertionError(f"MSE mismatch on subset {np.flatnonzero(subset) if np.asarray(subset).dtype == bool else subset}: "
+                                 f"{actual} != {expected}")
+        worst = max(worst, abs(actual - expected))
+    return worst
@@ -0,0 +1,315 @@
+"""
+Parabolic-interpolation kernels, batched over candidate subsets.
+
+score_subsets scores feature sets as a whole: the generalized cross-validation
+(GCV) error of a ridge regression of the target on the set's standardized
+columns, at the ridge penalty found by a parabolic line search over its
+logarithm. All candidates share one batched eigendecomposition of their
+(n_samples, n_samples) Gram matrices, so a candidate costs the same whatever
+the size of its set; the Gram matrix of a set is summed over fixed blocks of
+GRAM_BLOCK columns, which can also be computed elsewhere (see distributed.py).
+
+interpolate_batch runs the per-column search of class3: every column of a candidate subset runs its own parabolic search for the
+feature value minimizing the target: three probe rows give the starting
+points, the new point is looked up in the column's SortedColumnIndex, and the
+search stops after max_iter steps or once the point moves less than tol. A
+subset's result is the point and value of its best column.
+
+With numba installed the searches of all columns of all candidates run in
+one compiled call without intermediate arrays, parallel when called from the
+main thread. Without it the same
+updates run as NumPy operations over all columns at once.
+"""
+
+import threading
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+ENGINES = ("auto", "numba", "numpy")
+
+
+def _parabola(x1, x2, x3, f1, f2, f3):
+    numerator = (x2 - x1) * (x2 - x3) * (f2 - f3) + (x2 - x3) * (x3 - x1) * (f2 - f1) + (x3 - x1) * (x1 - x2) * (f3 - f1)
+    denominator = (x2 - x1) * (x2 - x3) * (x3 - x1)
+    return numerator, denominator
+
+
+def _search_numpy(index, y, columns, x1, x2, x3, f1, f2, f3, max_iter, tol):
+    x, f = x2.copy(), f2.copy()
+    active = np.ones(len(columns), dtype=bool)
+    for _ in range(max_iter):
+        numerator, denominator = _parabola(x1, x2, x3, f1, f2, f3)
+        degenerate = denominator == 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x_new = np.where(degenerate, x2, 0.5 * (x1 + x2 - numerator / np.where(degenerate, 1.0, denominator)))
+        x[active] = x_new[active]
+        active &= ~degenerate & (np.abs(x_new - x2) >= tol)
+        if not active.any():
+            break
+        f_new = f.copy()
+        f_new[active] = y[index.nearest(x_new[active], columns[active])]
+        f[active] = f_new[active]
+        # Same point and value rotation as the original loop, per column
+        right = active & (f2 < f3)
+        left = active & ~right
+        x1, x2, x3, f1, f2, f3 = (
+            np.where(right, x3, np.where(left, x_new, x1)),
+            np.where(right, x_new, np.where(left, x3, x2)),
+            np.where(right, x2, np.where(left, x1, x3)),
+            np.where(right, f3, np.where(left, f_new, f1)),
+            np.where(right, f_new, np.where(left, f1, f2)),
+            np.where(right, f2, f3),
+        )
+    return x, f
+
+
+if numba is not None:
+
+    @numba.njit(cache=True, nogil=True)
+    def _nearest_row(values, order, c, v):
+        n = values.shape[1]
+        lo, hi = 0, n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if values[c, mid] < v:
+                lo = mid + 1
+            else:
+                hi = mid
+        left = max(lo - 1, 0)
+        right = min(lo, n - 1)
+        if abs(v - values[c, left]) <= abs(values[c, right] - v):
+            return order[c, left]
+        return order[c, right]
+
+    def _search_columns(values, order, y, columns, x1s, x2s, x3s, f1s, f2s, f3s, max_iter, tol):
+        m = len(columns)
+        xs = np.empty(m)
+        fs = np.empty(m)
+        for k in numba.prange(m):
+            c = columns[k]
+            x1, x2, x3 = x1s[k], x2s[k], x3s[k]
+            f1, f2, f3 = f1s[k], f2s[k], f3s[k]
+            x, f = x2, f2
+            for _ in range(max_iter):
+                numerator = (x2 - x1) * (x2 - x3) * (f2 - f3) + (x2 - x3) * (x3 - x1) * (f2 - f1) + (x3 - x1) * (x1 - x2) * (f3 - f1)
+                denominator = (x2 - x1) * (x2 - x3) * (x3 - x1)
+                if denominator == 0:
+                    x = x2
+                    break
+                x = 0.5 * (x1 + x2 - numerator / denominator)
+                if abs(x - x2) < tol:
+                    break
+                f = y[_nearest_row(values, order, c, x)]
+                if f2 < f3:
+                    x1, x3, x2 = x3, x2, x
+                    f1, f3, f2 = f3, f2, f
+                else:
+                    x2, x3, x1 = x3, x1, x
+                    f2, f1 = f1, f
+            xs[k] = x
+            fs[k] = f
+        return xs, fs
+
+    # numba's default workqueue threading layer is not thread-safe: launched
+    # from a thread other than the main one it hangs the interpreter at exit,
+    # so other threads run the serial build
+    _search_numba = numba.njit(parallel=True, cache=True, nogil=True)(_search_columns)
+    _search_numba_serial = numba.njit(nogil=True)(_search_columns)
+
+
+def resolve_engine(engine="auto"):
+    """
+    Returns 'numba' or 'numpy' for an engine name; 'auto' picks numba when it is installed.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {ENGINES}, got {engine!r}")
+    if engine == "auto":
+        return "numpy" if numba is None else "numba"
+    if engine == "numba" and numba is None:
+        raise ImportError("engine='numba' needs numba; install it or use engine='numpy'")
+    return engine
+
+
+def interpolate_batch(X, y, index, subsets, probes, max_iter=100, tol=1e-6, engine="auto"):
+    """
+    Runs the parabolic search on several candidate subsets in one call.
+
+    Parameters:
+    -----------
+    X : array-like of shape (n_samples, n_features)
+
+    y : array-like of shape (n_samples,)
+        Numeric target values.
+
+    index : SortedColumnIndex
+        Index of X.
+
+    subsets : list of array-like of int
+        Column indices of every candidate.
+
+    probes : array-like of shape (n_candidates, 3)
+        The three starting rows of every candidate.
+
+    engine : {'auto', 'numba', 'numpy'}, optional (default='auto')
+
+    Returns:
+    --------
+    results : list of (x, f) tuples
+        Point and target value of the best column of every candidate.
+    """
+    engine = resolve_engine(engine)
+    y = np.asarray(y, dtype=np.float64)
+    sizes = [len(subset) for subset in subsets]
+    columns = np.concatenate([np.asarray(subset, dtype=np.intp) for subset in subsets])
+    rows = np.repeat(np.asarray(probes, dtype=np.intp).reshape(-1, 3), sizes, axis=0)
+    x1, x2, x3 = (np.asarray(X[rows[:, p], columns], dtype=np.float64) for p in range(3))
+    f1, f2, f3 = (y[rows[:, p]] for p in range(3))
+    if engine == "numba":
+        search = _search_numba if threading.current_thread() is threading.main_thread() else _search_numba_serial
+        x, f = search(index.values, index.order, y, columns, x1, x2, x3, f1, f2, f3, max_iter, tol)
+    else:
+        x, f = _search_numpy(index, y, columns, x1, x2, x3, f1, f2, f3, max_iter, tol)
+    results, start = [], 0
+    for size in sizes:
+        best = start + int(np.argmin(f[start:start + size]))
+        results.append((float(x[best]), float(f[best])))
+        start += size
+    return results
+
+
+# Columns per partial Gram matrix; the blocks are summed in order, so partial
+# sums computed by other processes add up to the same matrix
+GRAM_BLOCK = 256
+
+# Starting bracket of the line search, log10 of the ridge penalty relative to
+# the mean eigenvalue of the Gram matrix
+GRID = np.linspace(-4.0, 2.0, 7)
+
+_GOLDEN = 0.3819660112501051
+
+
+def standardize(X):
+    """
+    Returns the columns of X as float64 z-scores; constant columns become zero.
+    """
+    Z = np.asarray(X, dtype=np.float64)
+    std = Z.std(axis=0)
+    std[std == 0] = np.inf
+    return (Z - Z.mean(axis=0)) / std
+
+
+def gram_blocks(columns, block=GRAM_BLOCK):
+    """
+    Splits sorted column indices into the blocks summed by subset_gram.
+    """
+    return [columns[start:start + block] for start in range(0, len(columns), block)]
+
+
+def partial_grams(Z, blocks):
+    """
+    Returns Z[:, b] @ Z[:, b].T for every block b.
+    """
+    return [Z[:, block] @ Z[:, block].T for block in blocks]
+
+
+def subset_gram(Z, columns):
+    """
+    Returns the (n_samples, n_samples) Gram matrix of the given columns of Z.
+    """
+    G = np.zeros((Z.shape[0], Z.shape[0]))
+    for partial in partial_grams(Z, gram_blocks(columns)):
+        G += partial
+    return G
+
+
+def _gcv(t, s, uy2, scale, n):
+    # GCV of ridge regressions at penalties scale * 10**t, one per row of s
+    lam = (scale * 10.0 ** t)[:, None]
+    shrink = lam / (s + lam)
+    rss = (shrink ** 2 * uy2).sum(axis=1)
+    # Degrees of freedom of the fit, plus one for the intercept
+    df = n - shrink.sum(axis=1) + 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gcv = (rss / n) / (1 - df / n) ** 2
+    return np.where(df < n, gcv, np.inf)
+
+
+def _spectrum(grams, y):
+    s, U = np.linalg.eigh(np.asarray(grams, dtype=np.float64))
+    s = np.clip(s, 0, None)
+    y = np.asarray(y, dtype=np.float64)
+    uy = np.einsum("bji,j->bi", U, y - y.mean())
+    scale = np.maximum(s.mean(axis=1), np.finfo(np.float64).tiny)
+    return s, U, uy, scale
+
+
+def score_subsets(grams, y, max_iter=100, tol=1e-6):
+    """
+    Scores candidate feature sets from their Gram matrices.
+
+    For every candidate the GCV error of the ridge regression of y is
+    minimized over t = log10(penalty / mean eigenvalue): the best point of
+    GRID and its neighbours bracket the minimum, then successive parabolic
+    interpolation (a golden-section step when the parabola leaves the bracket)
+    refines it for max_iter steps or until t moves less than tol.
+
+    Parameters:
+    -----------
+    grams : array-like of shape (n_candidates, n_samples, n_samples)
+        Gram matrices of the standardized columns of every candidate, see subset_gram.
+
+    y : array-like of shape (n_samples,)
+        Numeric target values.
+
+    Returns:
+    --------
+    results : list of (x, f) tuples
+        Penalty t and GCV error of every candidate; lower f is better.
+    """
+    s, _, uy, scale = _spectrum(grams, y)
+    uy2, n = uy ** 2, s.shape[1]
+    values = np.stack([_gcv(np.full(len(s), t), s, uy2, scale, n) for t in GRID])
+    best = np.argmin(values, axis=0)
+    rows = np.arange(len(s))
+    x_best, f_best = GRID[best], values[best, rows]
+    middle = np.clip(best, 1, len(GRID) - 2)
+    a, b, c = GRID[middle - 1], GRID[middle], GRID[middle + 1]
+    fa, fb, fc = values[middle - 1, rows], values[middle, rows], values[middle + 1, rows]
+    active = np.isfinite(fb)
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        numerator = (b - a) ** 2 * (fb - fc) - (b - c) ** 2 * (fb - fa)
+        denominator = 2 * ((b - a) * (fb - fc) - (b - c) * (fb - fa))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            v = b - numerator / denominator
+        golden = ~np.isfinite(v) | (v <= a) | (v >= c)
+        v = np.where(golden, np.where(c - b > b - a, b + _GOLDEN * (c - b), b - _GOLDEN * (b - a)), v)
+        fv = _gcv(v, s, uy2, scale, n)
+        improved = active & (fv < f_best)
+        x_best, f_best = np.where(improved, v, x_best), np.where(improved, fv, f_best)
+        # Shrink the bracket around the lower of b and v
+        lower, left = active & (fv < fb), v < b
+        new_a = (lower & ~left) | (active & ~lower & left)
+        new_c = (lower & left) | (active & ~lower & ~left)
+        a, fa = np.where(new_a, np.where(lower, b, v), a), np.where(new_a, np.where(lower, fb, fv), fa)
+        c, fc = np.where(new_c, np.where(lower, b, v), c), np.where(new_c, np.where(lower, fb, fv), fc)
+        moved = np.abs(v - b)
+        b, fb = np.where(lower, v, b), np.where(lower, fv, fb)
+        active &= moved >= tol
+    return [(float(x), float(f)) for x, f in zip(x_best, f_best)]
+
+
+def ridge_coefficients(Z, columns, gram, y, t):
+    """
+    Returns the ridge coefficients of the given standardized columns of Z at
+    penalty t (as returned by score_subsets), solved in the dual from their Gram matrix.
+    """
+    s, U, uy, scale = _spectrum(gram[None], y)
+    alpha = U[0] @ (uy[0] / (s[0] + scale[0] * 10.0 ** t))
+    return Z[:, columns].T @ alpha
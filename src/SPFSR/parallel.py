@@ -0,0 +1,36 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import get_context
+
+from FeatureSelection.parallel import effective_n_jobs
+
+
+def make_executor(n_jobs, prefer="threads", initializer=None, initargs=()):
+    """
+    Returns a thread or process pool with effective_n_jobs(n_jobs) workers.
+
+    Process workers are spawned, not forked: a forked child deadlocks when the
+    parent has already started numba's, BLAS's or our own threads.
+    Everything submitted to them is pickled by reference, so functions and
+    classes defined in __main__ of an interactive session break the pool.
+    """
+    workers = effective_n_jobs(n_jobs)
+    if prefer == "processes":
+        return ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"), initializer=initializer,
+                                   initargs=initargs)
+    if prefer == "threads":
+        return ThreadPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs)
+    raise ValueError(f"prefer must be 'threads' or 'processes', got {prefer!r}")
+
+
+def split_batches(items, n_batches):
+    """
+    Splits a sequence into at most n_batches contiguous, non-empty batches.
+    """
+    n_batches = max(1, min(n_batches, len(items)))
+    size, extra = divmod(len(items), n_batches)
+    batches, start = [], 0
+    for i in range(n_batches):
+        stop = start + size + (i < extra)
+        batches.append(items[start:stop])
+        start = stop
+    return batches
@@ -0,0 +1,166 @@
+import multiprocessing
+import threading
+from concurrent.futures import as_completed
+
+import numpy as np
+from sklearn.base import BaseEstimator, TransformerMixin
+
+from FeatureSelection.path import SelectionPathMixin
+from FeatureSelection.plan import SelectionPlanMixin, copy_estimator, selected_indices
+
+from .parallel import make_executor
+
+# Best running score over all restarts, set in every worker by _init_worker
+_leader = None
+
+
+class _Leader:
+    """
+    Thread-shared stand-in for a multiprocessing.Value.
+    """
+
+    def __init__(self, value):
+        self.value = value
+        self._lock = threading.Lock()
+
+    def get_lock(self):
+        return self._lock
+
+
+def _init_worker(leader):
+    global _leader
+    _leader = leader
+
+
+class _LeaderCallback:
+    """
+    Iteration callback of a restart: publishes its score to the shared leader
+    and stops the restart when it trails the leader by more than margin after
+    grace iterations.
+    """
+
+    def __init__(self, margin, grace, callback=None):
+        self.margin = margin
+        self.grace = grace
+        self.callback = callback
+        self.cancelled = False
+
+    def __call__(self, info):
+        if self.callback is not None and self.callback(info):
+            return True
+        score = float(np.mean(info["score"]))
+        if not np.isfinite(score):
+            return False
+        with _leader.get_lock():
+            if score < _leader.value:
+                _leader.value = score
+            leader = _leader.value
+        self.cancelled = info["iteration"] >= self.grace and score - leader > self.margin * max(abs(leader), 1e-12)
+        return self.cancelled
+
+
+def _run_restart(selector, seed, X, y, margin, grace):
+    selector = copy_estimator(selector)
+    callback = _LeaderCallback(margin, grace, selector.get_params().get("callback"))
+    selector.set_params(random_state=np.random.default_rng(seed), callback=callback)
+    selector.fit(X, y)
+    selector.set_params(callback=callback.callback)
+    # Not worth shipping back to the parent
+    selector.__dict__.pop("_colindex", None)
+    return selector, callback.cancelled
+
+
+class MultiStart(SelectionPathMixin, SelectionPlanMixin, BaseEstimator, TransformerMixin):
+    """
+    Runs a randomized SPFSR selector from several independent starts and keeps the best.
+
+    Every restart gets its own Generator spawned from one SeedSequence, so the
+    restarts are reproducible and independent of each other and of the global
+    NumPy state. Restarts run on a worker pool and publish their running
+    objective to a shared leader score; a restart whose score trails the
+    leader by more than cancel_margin (relative) after grace iterations is
+    stopped early.
+
+    Parameters:
+    -----------
+    selector : estimator
+        Selector with random_state and callback parameters that sets best_score_
+        (lower is better), e.g. class2.SPFSR or class3.SPFSR.
+
+    n_starts : int, optional (default=8)
+        Number of restarts.
+
+    cancel_margin : float or None, optional (default=0.1)
+        Relative distance to the leader beyond which a restart is cancelled.
+        None runs every restart to the end.
+
+    grace : int, optional (default=10)
+        Number of iterations a restart runs before it can be cancelled.
+
+    n_jobs : int, optional (default=None)
+        Number of workers. None means 1 and -1 means all CPUs.
+
+    prefer : {'processes', 'threads'}, optional (default='processes')
+        Process workers are spawned and import the selector's and callback's
+        classes by name, so these must live in an importable module. Classes
+        defined in a notebook or an interactive __main__ break the pool
+        (BrokenProcessPool); use 'threads' for them.
+
+    random_state : int, SeedSequence or None, optional (default=None)
+        Root seed of the restarts.
+    """
+
+    def __init__(self, selector, n_starts=8, cancel_margin=0.1, grace=10, n_jobs=None, prefer="processes",
+                 random_state=None):
+        self.selector = selector
+        self.n_starts = n_starts
+        self.cancel_margin = cancel_margin
+        self.grace = grace
+        self.n_jobs = n_jobs
+        self.prefer = prefer
+        self.random_state = random_state
+
+    def fit(self, X, y):
+        """
+        Fits all restarts and keeps the one with the lowest best_score_.
+
+        Sets best_estimator_, selected_features_, admission_order_, the per-restart
+        scores_ and cancelled_ flags, and score_spread_ over the completed restarts (nan when every restart
+        was cancelled).
+        """
+        root = self.random_state
+        if not isinstance(root, np.random.SeedSequence):
+            root = np.random.SeedSequence(root)
+        seeds = root.spawn(self.n_starts)
+        margin = np.inf if self.cancel_margin is None else self.cancel_margin
+        if self.prefer == "processes":
+            leader = multiprocessing.get_context("spawn").Value("d", np.inf)
+        else:
+            leader = _Leader(np.inf)
+        _init_worker(leader)
+
+        results = [None] * self.n_starts
+        with make_executor(self.n_jobs, self.prefer, initializer=_init_worker, initargs=(leader,)) as executor:
+            futures = {executor.submit(_run_restart, self.selector, seed, X, y, margin, self.grace): i
+                       for i, seed in enumerate(seeds)}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+
+        self.estimators_ = [selector for selector, _ in results]
+        self.scores_ = np.array([selector.best_score_ for selector in self.estimators_])
+        self.cancelled_ = np.array([cancelled for _, cancelled in results])
+        best = int(np.nanargmin(self.scores_))
+        self.best_index_ = best
+        self.best_estimator_ = self.estimators_[best]
+        self.best_score_ = self.scores_[best]
+        self.n_features_in_ = X.shape[1]
+        self.selected_features_ = selected_indices(self.best_estimator_)
+        self.admission_order_ = getattr(self.best_estimator_, "admission_order_", self.selected_features_)
+        completed = self.scores_[~self.cancelled_]
+        if len(completed):
+            self.score_spread_ = {"min": float(np.min(completed)), "median": float(np.median(completed)),
+                                  "max": float(np.max(completed)), "std": float(np.std(completed))}
+        else:
+            # A leader that was overtaken later can be cancelled too, so every restart may be
+            self.score_spread_ = dict.fromkeys(("min", "median", "max", "std"), np.nan)
+        return self
@@ -0,0 +1,163 @@
+import time
+
+import numpy as np
+from sklearn.base import BaseEstimator, TransformerMixin
+
+from FeatureSelection.fs1 import MicroarrayFeatureSelector
+from FeatureSelection.path import SelectionPathMixin
+from FeatureSelection.plan import SelectionPlanMixin, copy_estimator, selected_indices
+from FeatureSelection.univariate import select_top_k
+
+
+
+def wrapper_evaluations(wrapper, n_features):
+    """
+    Returns the number of evaluations wrapper is expected to spend on n_features
+    features: its own _evaluations(n_features) when it defines one, else one per feature.
+
+    An evaluation is the unit the wrapper's max_evaluations counts, if it has one.
+    """
+    estimate = getattr(wrapper, "_evaluations", None)
+    return float(estimate(n_features)) if estimate is not None else float(n_features)
+
+
+class ScreenedSelector(SelectionPathMixin, SelectionPlanMixin, BaseEstimator, TransformerMixin):
+    """
+    Two-stage selection: a univariate screen ranks all probes, and the wrapper
+    search only runs on the best-ranked pool.
+
+    The pool size is the largest one whose estimated wrapper cost fits the
+    budget, so the cost of the wrapper depends on max_evaluations and
+    max_seconds rather than on the number of probes of the array. The cost of
+    a pool is the wrapper's own estimate (see wrapper_evaluations); for
+    max_seconds the time per evaluation is measured on a pilot fit on the
+    min_pool best features. Without a budget the pool is max_pool.
+
+    Wrappers that take max_evaluations or max_seconds themselves also get
+    what is left of the budget, pilot fit deducted, so the budget holds even
+    where the estimate is off.
+
+    Parameters:
+    -----------
+    wrapper : estimator
+        Wrapper selector run on the pool, e.g. class1.SPFSR, class2.SPFSR or SPFSR_GPU.
+
+    screen : estimator, optional (default=None)
+        Selector setting scores_ (higher is better) on fit. None uses MicroarrayFeatureSelector.
+
+    max_evaluations : int, optional (default=None)
+        Evaluation budget of the wrapper, pilot fit included.
+
+    max_seconds : float, optional (default=None)
+        Time budget of the wrapper, pilot fit included.
+
+    min_pool : int, optional (default=50)
+        Smallest pool, also the size of the pilot fit.
+
+    max_pool : int, optional (default=None)
+        Largest pool. None means all features.
+    """
+
+    def __init__(self, wrapper, screen=None, max_evaluations=None, max_seconds=None, min_pool=50, max_pool=None):
+        self.wrapper = wrapper
+        self.screen = screen
+        self.max_evaluations = max_evaluations
+        self.max_seconds = max_seconds
+        self.min_pool = min_pool
+        self.max_pool = max_pool
+
+    def fit(self, X, y):
+        """
+        Screen all features, size the pool from the budget and run the wrapper on it.
+
+        Sets pool_ (the pool's original column indices, ascending), screen_scores_,
+        wrapper_, and selected_features_ and admission_order_ mapped back to the
+        original columns of X.
+
+        Parameters:
+        -----------
+        X : array-like of shape (n_samples, n_features)
+            The training input samples.
+
+        y : array-like of shape (n_samples,)
+            The target values.
+
+        Returns:
+        --------
+        self : object
+        """
+        n_features = self.n_features_in_ = X.shape[1]
+        upper = n_features if self.max_pool is None else min(self.max_pool, n_features)
+        lower = min(self.min_pool, upper)
+
+        screen = copy_estimator(self.screen) if self.screen is not None else MicroarrayFeatureSelector()
+        screen.fit(X, y)
+        self.screen_scores_ = np.asarray(screen.scores_)
+        ranking = select_top_k(self.screen_scores_, upper)
+
+        evaluations = None if self.max_evaluations is None else float(self.max_evaluations)
+        seconds = self.max_seconds
+        limit = np.inf if evaluations is None else evaluations
+        pilot = None
+        if self.max_seconds is not None:
+            start = time.perf_counter()
+            pilot = self._fit_pool(X, y, ranking[:lower], evaluations, seconds)
+            elapsed = time.perf_counter() - start
+            spent = float(getattr(pilot[0], "n_evaluations_", wrapper_evaluations(self.wrapper, lower)))
+            per_evaluation = elapsed / max(spent, 1.0)
+            seconds = max(self.max_seconds - elapsed, 0.0)
+            if evaluations is not None:
+                evaluations = max(evaluations - spent, 0.0)
+                limit = evaluations
+            limit = min(limit, seconds / per_evaluation if per_evaluation > 0 else np.inf)
+        self.pool_size_ = self._pool_size(lower, upper, limit)
+
+        if pilot is not None and self.pool_size_ == lower:
+            wrapper, pool = pilot
+        else:
+            wrapper, pool = self._fit_pool(X, y, ranking[:self.pool_size_], evaluations, seconds)
+        self.pool_ = pool
+        self.wrapper_ = wrapper
+        self.selected_features_ = pool[selected_indices(wrapper)]
+        order = getattr(wrapper, "admission_order_", None)
+        self.admission_order_ = pool[np.asarray(order, dtype=np.intp)] if order is not None else self.selected_features_
+        return self
+
+    def _pool_size(self, lower, upper, limit):
+        """
+        Largest size in [lower, upper] whose estimated cost is within limit, by
+        bisection since the cost grows with the pool.
+        """
+        if wrapper_evaluations(self.wrapper, upper) <= limit:
+            return upper
+        lo, hi = lower, upper
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if wrapper_evaluations(self.wrapper, mid) <= limit:
+                lo = mid
+            else:
+                hi = mid
+        return lo
+
+    def _fit_pool(self, X, y, features, max_evaluations=None, max_seconds=None):
+        # Ascending, so the wrapper sees the columns in their original order
+        pool = np.sort(features)
+        wrapper = copy_estimator(self.wrapper)
+        # Hand what is left of the budget to wrappers that enforce one, within their own limits
+        params = wrapper.get_params(deep=False) if hasattr(wrapper, "get_params") else {}
+        budget = {}
+        for name, left in (("max_evaluations", max_evaluations), ("max_seconds", max_seconds)):
+            if left is not None and name in params:
+                own = params[name]
+                left = int(left) if name == "max_evaluations" else left
+                budget[name] = left if own is None else min(own, left)
+        if budget:
+            wrapper.set_params(**budget)
+        wrapper.fit(np.asarray(X[:, pool]), y)
+        return wrapper, pool
+
+# USAGE
+# from SPFSR.class2 import SPFSR
+# selector = ScreenedSelector(SPFSR(k=20, n_candidates=4), max_seconds=30, min_pool=100, max_pool=2000)
+# X_selected = selector.fit_transform(X_train, y_train)
+# selector.pool_size_, selector.pool_
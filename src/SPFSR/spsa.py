@@ -0,0 +1,220 @@
+import numpy as np
+from sklearn.base import BaseEstimator, TransformerMixin, clone
+from sklearn.model_selection import cross_val_score
+
+from FeatureSelection.path import SelectionPathMixin
+from FeatureSelection.plan import SelectionPlanMixin
+
+from .cache import ScoreCache, data_token
+from .parallel import effective_n_jobs, make_executor
+
+
+def _cv_score(estimator, X, y, subset, cv, scoring):
+    return cross_val_score(clone(estimator), X[:, subset], y, cv=cv, scoring=scoring).mean()
+
+
+_worker_args = None
+
+
+def _init_worker(estimator, X, y, cv, scoring):
+    global _worker_args
+    _worker_args = (estimator, X, y, cv, scoring)
+
+
+def _worker_score(subset):
+    estimator, X, y, cv, scoring = _worker_args
+    return _cv_score(estimator, X, y, subset, cv, scoring)
+
+
+class SpFSR(SelectionPathMixin, SelectionPlanMixin, BaseEstimator, TransformerMixin):
+    """
+    Simultaneous perturbation stochastic approximation for feature selection
+    and ranking (spFSR, https://github.com/akmand/spFSR).
+
+    A feature-importance vector in [0, 1] is perturbed as a whole with +/-1
+    Rademacher draws. Each iteration scores n_pairs perturbation pairs plus
+    the current subset as one batch of cross-validated wrapper fits, so the
+    number of evaluations per iteration does not depend on the number of genes.
+
+    Parameters:
+    -----------
+    estimator : object
+        scikit-learn estimator used as the wrapper.
+
+    n_features : int, optional (default=0)
+        Number of features to select. 0 selects the features whose importance exceeds 0.5.
+
+    scoring : str or callable, optional (default=None)
+        Scoring passed to cross_val_score; higher is better.
+
+    cv : int or cross-validation generator, optional (default=5)
+
+    max_iter : int, optional (default=100)
+
+    n_pairs : int, optional (default=4)
+        Perturbation pairs evaluated per iteration; their gradient estimates are averaged.
+
+    perturb_amount : float, optional (default=0.05)
+
+    gain_type : {'bb', 'mon'}, optional (default='bb')
+        Barzilai-Borwein step sizes, or a monotonically decaying gain.
+
+    gain, gain_min, gain_max : float, optional (default=1.0, 0.01, 2.0)
+        Initial gain and the bounds for Barzilai-Borwein gains.
+
+    grad_smoothing : int, optional (default=1)
+        Number of past gradient estimates averaged into each step.
+
+    gain_smoothing : int, optional (default=1)
+        Number of past gains averaged into each step.
+
+    stall_limit : int, optional (default=25)
+        Stop after this many iterations without improving the best score by more than stall_tol.
+
+    n_jobs : int, optional (default=None)
+        Number of workers for the cross-validated scores. None means 1 and -1 means all CPUs.
+
+    prefer : {'threads', 'processes'}, optional (default='threads')
+        Process workers are spawned and import the estimator's class by name,
+        so an estimator defined in a notebook or an interactive __main__ needs
+        'threads'.
+
+    random_state : int, Generator or None, optional (default=None)
+    """
+
+    def __init__(self, estimator, n_features=0, scoring=None, cv=5, max_iter=100, n_pairs=4,
+                 perturb_amount=0.05, gain_type="bb", gain=1.0, gain_min=0.01, gain_max=2.0,
+                 grad_smoothing=1, gain_smoothing=1, stall_limit=25, stall_tol=1e-7,
+                 n_jobs=None, prefer="threads", random_state=None):
+        self.estimator = estimator
+        self.n_features = n_features
+        self.scoring = scoring
+        self.cv = cv
+        self.max_iter = max_iter
+        self.n_pairs = n_pairs
+        self.perturb_amount = perturb_amount
+        self.gain_type = gain_type
+        self.gain = gain
+        self.gain_min = gain_min
+        self.gain_max = gain_max
+        self.grad_smoothing = grad_smoothing
+        self.gain_smoothing = gain_smoothing
+        self.stall_limit = stall_limit
+        self.stall_tol = stall_tol
+        self.n_jobs = n_jobs
+        self.prefer = prefer
+        self.random_state = random_state
+
+    @staticmethod
+    def _ranking(w):
+        """
+        Returns the features by decreasing importance, ties in index order.
+        """
+        return np.argsort(-w, kind="stable")
+
+    def _subset(self, w):
+        """
+        Returns the sorted leading features of the ranking of w: n_features of
+        them, or those whose importance exceeds 0.5 (at least one).
+        """
+        ranking = self._ranking(w)
+        k = min(self.n_features, len(w)) if self.n_features else max(int(np.count_nonzero(w > 0.5)), 1)
+        return np.sort(ranking[:k])
+
+    def _evaluate(self, subsets, X, y, executor):
+        scores = np.empty(len(subsets))
+        pending = []
+        for i, subset in enumerate(subsets):
+            key = self._cache.key(self._data_token, subset, X.shape[1])
+            score = self._cache.get(key)
+            if score is None:
+                pending.append((i, key, subset))
+            else:
+                scores[i] = score
+        if executor is None:
+            results = [_cv_score(self.estimator, X, y, s, self.cv, self.scoring) for _, _, s in pending]
+        elif self.prefer == "processes":
+            results = list(executor.map(_worker_score, [s for _, _, s in pending]))
+        else:
+            results = list(executor.map(lambda s: _cv_score(self.estimator, X, y, s, self.cv, self.scoring),
+                                        [s for _, _, s in pending]))
+        for (i, key, _), score in zip(pending, results):
+            self._cache.put(key, score)
+            scores[i] = score
+        self.n_evaluations_ += len(pending)
+        return scores
+
+    def fit(self, X, y):
+        if self.gain_type not in ("bb", "mon"):
+            raise ValueError(f"gain_type must be 'bb' or 'mon', got {self.gain_type!r}")
+        X = np.asarray(X)
+        y = np.asarray(y)
+        rng = np.random.default_rng(self.random_state)
+        p = self.n_features_in_ = X.shape[1]
+        c = self.perturb_amount
+        self._cache = ScoreCache()
+        self._data_token = data_token(X, y)
+        self.n_evaluations_ = 0
+
+        n_jobs = effective_n_jobs(self.n_jobs)
+        if n_jobs == 1:
+            executor = None
+        elif self.prefer == "processes":
+            executor = make_executor(n_jobs, "processes", _init_worker, (self.estimator, X, y, self.cv, self.scoring))
+        else:
+            executor = make_executor(n_jobs, "threads")
+
+        w = np.full(p, 0.5)
+        w_prev = g_prev = None
+        grads, gains = [], []
+        best_score, best_w, stall = -np.inf, w, 0
+        t = -1
+        try:
+            for t in range(self.max_iter):
+                delta = rng.choice([-1.0, 1.0], size=(self.n_pairs, p))
+                w_plus = np.clip(w + c * delta, 0, 1)
+                w_minus = np.clip(w - c * delta, 0, 1)
+                subsets = [self._subset(w)]
+                subsets += [self._subset(v) for v in w_plus] + [self._subset(v) for v in w_minus]
+                scores = self._evaluate(subsets, X, y, executor)
+
+                # Track the best subset and stop once the search stalls
+                if scores[0] > best_score + self.stall_tol:
+                    best_score, best_w, stall = scores[0], w, 0
+                else:
+                    stall += 1
+                    if stall >= self.stall_limit:
+                        break
+
+                # Averaged two-sided gradient estimate of the loss (negative score)
+                loss_plus = -scores[1:self.n_pairs + 1]
+                loss_minus = -scores[self.n_pairs + 1:]
+                g = np.mean((loss_plus - loss_minus)[:, None] / (2 * c * delta), axis=0)
+                grads = (grads + [g])[-self.grad_smoothing:]
+                g = np.mean(grads, axis=0)
+
+                if self.gain_type == "bb" and g_prev is not None:
+                    s, dg = w - w_prev, g - g_prev
+                    denom = s @ dg
+                    a = abs((s @ s) / denom) if denom != 0 else gains[-1]
+                    a = float(np.clip(a, self.gain_min, self.gain_max)) if np.isfinite(a) else gains[-1]
+                elif self.gain_type == "mon":
+                    a = self.gain / (t + 1) ** 0.602
+                else:
+                    a = self.gain
+                gains = (gains + [a])[-self.gain_smoothing:]
+                a = np.mean(gains)
+
+                w_prev, g_prev = w, g
+                w = np.clip(w - a * g, 0, 1)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        # Ranking and selection both come from the importances of the best subset
+        self.importance_ = best_w
+        self.admission_order_ = self._ranking(best_w)
+        self.selected_features_ = self.admission_order_[:len(self._subset(best_w))]
+        self.best_score_ = best_score if t >= 0 else np.nan
+        self.n_iter_ = t + 1
+        return self
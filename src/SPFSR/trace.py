@@ -0,0 +1,144 @@
+import json
+from collections import Counter, defaultdict
+from contextlib import nullcontext
+from time import perf_counter
+
+_NULL_SECTION = nullcontext()
+
+
+class _Section:
+    __slots__ = ("tracer", "name", "start")
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        tracer = self.tracer
+        duration = perf_counter() - self.start
+        tracer.totals[self.name] += duration
+        tracer.counters[self.name] += 1
+        if tracer.record:
+            tracer.events.append({"type": "section", "name": self.name, "ts": self.start - tracer.t0, "dur": duration})
+        return False
+
+
+class Tracer:
+    """
+    Counters, timers and per-iteration events of a search loop.
+
+    Parameters:
+    -----------
+    callback : callable, optional (default=None)
+        Called once per iteration with a dict holding the iteration number,
+        the current subset, its score, the time spent per section since the
+        previous iteration and the counters. Returning True stops the search.
+
+    record : bool, optional (default=True)
+        Whether to keep every section and iteration as an event for export.
+    """
+
+    enabled = True
+
+    def __init__(self, callback=None, record=True):
+        self.callback = callback
+        self.record = record
+        self.counters = Counter()
+        self.totals = defaultdict(float)
+        self.events = []
+        self.t0 = perf_counter()
+        self._last_totals = {}
+        self._last_time = self.t0
+
+    def section(self, name):
+        """
+        Context manager that times a block and counts its executions.
+        """
+        return _Section(self, name)
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def iteration(self, i, subset, score):
+        """
+        Records the end of iteration i and runs the callback. Returns True to stop.
+        """
+        now = perf_counter()
+        timings = {name: total - self._last_totals.get(name, 0.0) for name, total in self.totals.items()}
+        timings["iteration"] = now - self._last_time
+        self._last_totals = dict(self.totals)
+        self._last_time = now
+        info = {"iteration": i, "subset": list(subset), "score": score, "timings": timings,
+                "counters": dict(self.counters)}
+        if self.record:
+            self.events.append({"type": "iteration", "ts": now - self.t0, **info})
+        return bool(self.callback(info)) if self.callback is not None else False
+
+    def summary(self):
+        """
+        Returns the call count and total seconds of every section.
+        """
+        return {name: {"calls": self.counters[name], "seconds": total} for name, total in self.totals.items()}
+
+    def export_jsonl(self, path):
+        """
+        Writes one JSON object per event.
+        """
+        with open(path, "w") as handle:
+            for event in self.events:
+                handle.write(json.dumps(event, default=_to_json) + "\n")
+
+    def export_chrome(self, path):
+        """
+        Writes the events in Chrome trace format (chrome://tracing, Perfetto).
+        """
+        trace = []
+        for event in self.events:
+            if event["type"] == "section":
+                trace.append({"name": event["name"], "ph": "X", "ts": event["ts"] * 1e6,
+                              "dur": event["dur"] * 1e6, "pid": 0, "tid": 0})
+            else:
+                trace.append({"name": f"iteration {event['iteration']}", "ph": "i", "s": "t",
+                              "ts": event["ts"] * 1e6, "pid": 0, "tid": 0,
+                              "args": {"score": event["score"], "subset_size": len(event["subset"])}})
+        with open(path, "w") as handle:
+            json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, handle, default=_to_json)
+
+
+class NullTracer:
+    """
+    Tracer that does nothing, used when instrumentation is off.
+    """
+
+    enabled = False
+
+    def section(self, name):
+        return _NULL_SECTION
+
+    def count(self, name, n=1):
+        pass
+
+    def iteration(self, i, subset, score):
+        return False
+
+
+NULL_TRACER = NullTracer()
+
+
+def make_tracer(trace=False, callback=None):
+    """
+    Returns a Tracer when tracing or a callback is requested and NULL_TRACER otherwise.
+    """
+    if trace or callback is not None:
+        return Tracer(callback=callback, record=bool(trace))
+    return NULL_TRACER
+
+
+def _to_json(value):
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return str(value)
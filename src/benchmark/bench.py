@@ -0,0 +1,285 @@
+"""
+Benchmark harness for the feature selectors.
+
+Runs every selector on the gravier_csv datasets and on synthetic matrices,
+each case in its own process, and records wall time, objective-evaluation
+counts, the memory allocated by the fit and selection quality to JSON. A run
+can be compared with a stored baseline; errors, and slowdowns beyond the
+tolerances, fail the comparison.
+
+    cd src
+    python -m benchmark.bench --update-baseline       # store benchmark/baseline.json
+    python -m benchmark.bench --out results.json      # run and compare with the baseline
+"""
+
+import argparse
+import functools
+import importlib
+import importlib.util
+import json
+import multiprocessing
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+SRC = Path(__file__).resolve().parents[1]
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+SYNTHETIC_FEATURES = [1000, 2000, 5000, 10000, 20000, 50000]
+CLASS3_EVALUATIONS = 2000
+# Imported before timing so import cost does not count as selection time
+MODULES = ["SPFSR.class1", "SPFSR.class2", "SPFSR.class3", "SPFSR.spsa", "FeatureSelection.fs1",
+           "sklearn.naive_bayes", "sklearn.model_selection", "pandas"]
+
+
+@functools.lru_cache(maxsize=None)
+def _load_test1():
+    spec = importlib.util.spec_from_file_location("spfsr_test1", SRC / "test" / "test1.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _count_calls(obj, name):
+    """
+    Wraps obj.name with a call counter and returns the counter dictionary.
+    """
+    counter = {"calls": 0}
+    method = getattr(obj, name)
+
+    def counted(*args, **kwargs):
+        counter["calls"] += 1
+        return method(*args, **kwargs)
+
+    setattr(obj, name, counted)
+    return counter
+
+
+def _run_class1(X, y, k):
+    from SPFSR.class1 import SPFSR
+    selector = SPFSR(k=max(X.shape[1] - k, 1))
+    counter = _count_calls(selector, "_objective_function")
+    selector.fit(X, y.astype(np.float64))
+    return selector.feature_indices_, counter["calls"]
+
+
+def _run_class2(X, y, k):
+    from SPFSR.class2 import SPFSR
+    selector = SPFSR(k=k)
+    counter = _count_calls(selector, "_parabolic_interpolation")
+    selector.fit(X, y)
+    return selector.selected_features_, counter["calls"]
+
+
+def _run_class3(X, y, k):
+    from SPFSR.class3 import SPFSR
+    # Admitting every feature costs O(p^2); a fixed budget keeps the 50k-feature case within the timeout
+    selector = SPFSR(n_features=k, max_evaluations=CLASS3_EVALUATIONS)
+    counter = _count_calls(selector, "_parabolic_interpolation")
+    selector.fit(X, y)
+    return selector.selected_indices_, counter["calls"]
+
+
+def _run_spsa(X, y, k):
+    from sklearn.naive_bayes import GaussianNB
+    from SPFSR.spsa import SpFSR
+    selector = SpFSR(GaussianNB(), n_features=k, cv=3, max_iter=20, random_state=0).fit(X, y)
+    return selector.selected_features_, selector.n_evaluations_
+
+
+def _run_fs1(X, y, k):
+    from FeatureSelection.fs1 import MicroarrayFeatureSelector
+    selector = MicroarrayFeatureSelector(k=k).fit(X, y)
+    # Vectorized scoring has no separate objective evaluations to count
+    return selector.feature_indices_, None
+
+
+def _run_test1(X, y, k):
+    import pandas as pd
+    selected = _load_test1().SPFSR_feature_selection(pd.DataFrame(X), y, k)
+    return selected, None
+
+
+SELECTORS = {
+    "class1.SPFSR": _run_class1,
+    "class2.SPFSR": _run_class2,
+    "class3.SPFSR": _run_class3,
+    "spsa.SpFSR": _run_spsa,
+    "MicroarrayFeatureSelector": _run_fs1,
+    "SPFSR_feature_selection": _run_test1,
+}
+
+
+def make_synthetic(n_features, n_samples=80, n_informative=20, seed=0):
+    """
+    Two-class matrix whose first n_informative columns are shifted by class.
+    """
+    rng = np.random.default_rng(seed)
+    y = np.repeat([0, 1], [n_samples // 2, n_samples - n_samples // 2]).astype(np.int8)
+    X = rng.standard_normal((n_samples, n_features))
+    X[:, :n_informative] += 1.5 * y[:, None]
+    return X, y, np.arange(n_informative)
+
+
+def _load(dataset):
+    if dataset.startswith("synthetic-"):
+        return make_synthetic(int(dataset.split("-")[1]))
+    from Datasets.loader import load_dataset
+    X, y = load_dataset(dataset)
+    return np.asarray(X), np.asarray(y), None
+
+
+def _quality(X, y, selected, informative):
+    from sklearn.model_selection import cross_val_score
+    from sklearn.naive_bayes import GaussianNB
+    selected = np.unique(np.asarray(selected, dtype=np.intp))
+    quality = {"n_selected": int(len(selected))}
+    if len(selected):
+        quality["cv_accuracy"] = float(cross_val_score(GaussianNB(), X[:, selected], y, cv=3).mean())
+    if informative is not None:
+        quality["recall"] = float(np.isin(informative, selected).mean())
+    return quality
+
+
+def _run_case(selector, dataset, k, repeat, conn):
+    sys.path.insert(0, str(SRC))
+    result = {"selector": selector, "dataset": dataset, "k": k}
+    try:
+        for module in MODULES:
+            importlib.import_module(module)
+        _load_test1()
+        X, y, informative = _load(dataset)
+        result.update(n_samples=int(X.shape[0]), n_features=int(X.shape[1]))
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            selected, evaluations = SELECTORS[selector](X, y, k)
+            times.append(time.perf_counter() - start)
+        # Separate, untimed run: tracing allocations slows the fit down
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        SELECTORS[selector](X, y, k)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        result.update(status="ok", wall_time=min(times), evaluations=None if evaluations is None else int(evaluations),
+                      fit_memory_mb=(peak - before) / (1 << 20), quality=_quality(X, y, selected, informative))
+    except Exception as e:
+        result.update(status="error", error=f"{type(e).__name__}: {e}")
+    conn.send(result)
+    conn.close()
+
+
+def run_case(selector, dataset, k=10, repeat=1, timeout=600):
+    """
+    Runs one selector on one dataset in a fresh process and returns its record.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    parent, child = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_run_case, args=(selector, dataset, k, repeat, child))
+    process.start()
+    child.close()
+    if parent.poll(timeout):
+        result = parent.recv()
+    else:
+        process.terminate()
+        result = {"selector": selector, "dataset": dataset, "k": k, "status": "timeout",
+                  "error": f"exceeded {timeout}s"}
+    process.join()
+    return result
+
+
+def run(selectors, datasets, k=10, repeat=1, timeout=600, verbose=True):
+    results = []
+    for dataset in datasets:
+        for selector in selectors:
+            result = run_case(selector, dataset, k, repeat, timeout)
+            results.append(result)
+            if verbose:
+                evaluations = "-" if result.get("evaluations") is None else result["evaluations"]
+                detail = (f"{result['wall_time']:.3f}s, {evaluations} evals, "
+                          f"{result['fit_memory_mb']:.1f} MB" if result["status"] == "ok" else result["error"])
+                print(f"{dataset:>18} {selector:>26}: {result['status']} ({detail})", flush=True)
+    return {
+        "meta": {"python": platform.python_version(), "numpy": np.__version__, "machine": platform.machine(),
+                 "processor": platform.processor(), "time": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "results": results,
+    }
+
+
+def compare(report, baseline, time_tol=0.25, time_floor=0.05, eval_tol=0.0, memory_tol=0.25, memory_floor=1.0,
+            quality_tol=0.05):
+    """
+    Compares a report with a baseline report and returns a list of failures.
+
+    A case fails when it errors or times out, whatever the baseline did. A
+    case that passed in the baseline also fails when it is slower by more
+    than time_tol (and more than time_floor seconds), needs more evaluations
+    than allowed, allocates more than memory_tol more during the fit (and
+    more than memory_floor MB), or loses more than quality_tol of CV accuracy
+    or recall.
+    """
+    old = {(r["selector"], r["dataset"], r["k"]): r for r in baseline["results"]}
+    failures = []
+    for new in report["results"]:
+        key = (new["selector"], new["dataset"], new["k"])
+        name = f"{key[1]}/{key[0]}"
+        if new["status"] != "ok":
+            failures.append(f"{name}: {new['status']} ({new.get('error')})")
+            continue
+        ref = old.get(key)
+        if ref is None or ref["status"] != "ok":
+            continue
+        if new["wall_time"] > ref["wall_time"] * (1 + time_tol) and new["wall_time"] - ref["wall_time"] > time_floor:
+            failures.append(f"{name}: wall time {new['wall_time']:.3f}s vs baseline {ref['wall_time']:.3f}s")
+        if new["evaluations"] is not None and ref.get("evaluations") is not None \
+                and new["evaluations"] > ref["evaluations"] * (1 + eval_tol):
+            failures.append(f"{name}: {new['evaluations']} evaluations vs baseline {ref['evaluations']}")
+        if "fit_memory_mb" in ref and new["fit_memory_mb"] > ref["fit_memory_mb"] * (1 + memory_tol) \
+                and new["fit_memory_mb"] - ref["fit_memory_mb"] > memory_floor:
+            failures.append(f"{name}: fit memory {new['fit_memory_mb']:.1f} MB vs baseline {ref['fit_memory_mb']:.1f} MB")
+        for metric in ("cv_accuracy", "recall"):
+            if metric in ref["quality"] and new["quality"].get(metric, 0.0) < ref["quality"][metric] - quality_tol:
+                failures.append(f"{name}: {metric} {new['quality'].get(metric)} vs baseline {ref['quality'][metric]}")
+    return failures
+
+
+def main(argv=None):
+    sys.path.insert(0, str(SRC))
+    from Datasets.loader import list_datasets
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--selectors", nargs="+", default=list(SELECTORS), choices=list(SELECTORS))
+    parser.add_argument("--datasets", nargs="+", default=None, help="gravier_csv names (default: all)")
+    parser.add_argument("--synthetic", nargs="*", type=int, default=SYNTHETIC_FEATURES,
+                        help="feature counts of the synthetic matrices")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--out", type=Path, default=None)
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    datasets = (args.datasets or list_datasets()) + [f"synthetic-{p}" for p in args.synthetic]
+    report = run(args.selectors, datasets, k=args.k, repeat=args.repeat, timeout=args.timeout)
+    if args.out:
+        args.out.write_text(json.dumps(report, indent=1))
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(report, indent=1))
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+    failures = compare(report, json.loads(args.baseline.read_text()))
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print(f"{len(failures)} regression(s) against {args.baseline}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
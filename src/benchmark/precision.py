@@ -0,0 +1,85 @@
+"""
+Checks that float32 storage selects the same top features as float64.
+
+For every gravier_csv dataset the matrix is loaded in both dtypes and scored
+with MicroarrayFeatureSelector and the univariate statistics. The top-k sets
+must agree; a feature may only swap places with another across the k-th
+position when their float64 scores are equal within rtol.
+
+    cd src
+    python -m benchmark.precision --k 50
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+
+SRC = Path(__file__).resolve().parents[1]
+
+
+def _scorers():
+    from FeatureSelection.fs1 import MicroarrayFeatureSelector
+    from FeatureSelection.univariate import univariate_scores
+
+    def f_classif(X, y):
+        return MicroarrayFeatureSelector(k=1).fit(X, y).scores_
+
+    scorers = {"MicroarrayFeatureSelector": f_classif}
+    for statistic in ("welch_t", "rank_sum"):
+        scorers[statistic] = lambda X, y, statistic=statistic: univariate_scores(X, y, (statistic,))[statistic]
+    return scorers
+
+
+def compare_top_k(scores32, scores64, k, rtol=1e-4):
+    """
+    Returns the features in only one of the two top-k sets whose float64 score
+    differs from the k-th best float64 score by more than rtol.
+    """
+    from FeatureSelection.univariate import select_top_k
+
+    top32, top64 = select_top_k(scores32, k), select_top_k(scores64, k)
+    scores64 = np.nan_to_num(scores64, nan=-np.inf)
+    kth = scores64[top64[-1]] if len(top64) else 0.0
+    swapped = np.setxor1d(top32, top64)
+    return [int(j) for j in swapped if not np.isclose(scores64[j], kth, rtol=rtol)]
+
+
+def check(datasets=None, k=50, rtol=1e-4, verbose=True):
+    """
+    Runs the comparison on the given datasets (default: all) and returns the failures.
+    """
+    from Datasets.loader import list_datasets, load_dataset
+
+    failures = []
+    scorers = _scorers()
+    for name in datasets or list_datasets():
+        X32, y = load_dataset(name, dtype=np.float32)
+        X64, _ = load_dataset(name, dtype=np.float64)
+        for scorer, score in scorers.items():
+            if scorer == "welch_t" and len(np.unique(y)) != 2:
+                continue
+            mismatched = compare_top_k(score(X32, y), score(X64, y), k, rtol)
+            if mismatched:
+                failures.append(f"{name}/{scorer}: features {mismatched} differ in the top {k}")
+            if verbose:
+                print(f"{name:>18} {scorer:>26}: {'ok' if not mismatched else 'MISMATCH'}", flush=True)
+    return failures
+
+
+def main(argv=None):
+    sys.path.insert(0, str(SRC))
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--datasets", nargs="+", default=None, help="gravier_csv names (default: all)")
+    parser.add_argument("--k", type=int, default=50)
+    parser.add_argument("--rtol", type=float, default=1e-4)
+    args = parser.parse_args(argv)
+    failures = check(args.datasets, k=args.k, rtol=args.rtol)
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
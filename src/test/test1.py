@@ -1,7 +1,9 @@
 import numpy as np
 import pandas as pd
 
-def SPFSR_feature_selection(X, y, k, tol=1e-6):
+from FeatureSelection.univariate import encode_labels, select_top_k, univariate_scores
+
+def SPFSR_feature_selection(X, y, k, tol=1e-6, max_iter=100):
     """
     Implements the Successive Parabolic Interpolation-Fibonacci Search-Ridder's Method (SPFSR) algorithm for feature
     selection using univariate t-tests. The algorithm selects k features that have the highest univariate t-test
@@ -11,18 +13,23 @@ def SPFSR_feature_selection(X, y, k, tol=1e-6):
     y: the target variable vector, where each element corresponds to the target value for the corresponding instance
     k: the number of features to select
     tol: the tolerance for the minimum
+    max_iter: the maximum number of parabolic interpolation steps
     
     Returns the indices of the k selected features.
     """
     # Define the golden ratio
     golden_ratio = (np.sqrt(5) - 1) / 2
     
-    # Compute the univariate t-test statistics for each feature
-    t_values, _ = np.apply_along_axis(lambda col: np.abs(np.mean(col[y == 1]) - np.mean(col[y == 0])) / np.sqrt(
-        np.var(col[y == 1]) / np.sum(y == 1) + np.var(col[y == 0]) / np.sum(y == 0)), axis=0, arr=X.values)
+    # Labels as integer codes, so string labels such as 'n'/'t' can be correlated
+    classes, codes = encode_labels(y)
+
+    # Compute the univariate t-test statistics for all features in one pass; the
+    # t-test needs two classes, so more than two are ranked by the ANOVA F statistic
+    statistic = "welch_t" if len(classes) == 2 else "anova_f"
+    t_values = univariate_scores(X.values, y, statistics=(statistic,))[statistic]
     
     # Find the k features with the highest t-test statistics
-    feature_indices = np.argsort(t_values)[::-1][:k]
+    feature_indices = select_top_k(t_values, k)
     
     # Define the initial points for the Fibonacci search
     x = np.array([golden_ratio * (len(feature_indices) - 1), (1 - golden_ratio) * (len(feature_indices) - 1)])
@@ -32,7 +39,7 @@ def SPFSR_feature_selection(X, y, k, tol=1e-6):
     for i, x_i in enumerate(x):
         if x_i >= 0 and x_i < len(feature_indices) - 1:
             features = feature_indices[[int(np.floor(x_i)), int(np.ceil(x_i))]]
-            f_x[i] = np.abs(np.corrcoef(X.iloc[:, features].T, y)[0, 1])
+            f_x[i] = np.abs(np.corrcoef(X.iloc[:, features].T, codes)[0, 1])
     
     # Keep track of the best function value so far
     f_best = np.max(f_x)
@@ -41,14 +48,20 @@ def SPFSR_feature_selection(X, y, k, tol=1e-6):
     x1, x2, x3 = 0, np.mean(x), len(feature_indices) - 1
     f1, f2, f3 = f_x[0], f_x[1], f_x[-1]
     
-    while abs(x3 - x1) > tol:
+    for _ in range(max_iter):
+        if abs(x3 - x1) <= tol:
+            break
         # Determine the minimum point using parabolic interpolation
-        x_min = x2 + (f2 - f1) * (x2 - x3) / ((f2 - f3) * (x2 - x1) - (f2 - f1) * (x2 - x3))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x_min = x2 + (f2 - f1) * (x2 - x3) / ((f2 - f3) * (x2 - x1) - (f2 - f1) * (x2 - x3))
+        if not np.isfinite(x_min):
+            # Collinear or infinite values: the parabola has no minimum
+            break
         
         # Evaluate the function at the minimum point
         if x_min >= 0 and x_min < len(feature_indices) - 1:
             features = feature_indices[[int(np.floor(x_min)), int(np.ceil(x_min))]]
-            f_min = np.abs(np.corrcoef(X.iloc[:, features].T, y)[0, 1])
+            f_min = np.abs(np.corrcoef(X.iloc[:, features].T, codes)[0, 1])
         else:
             f_min = -np.inf
         
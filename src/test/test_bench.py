@@ -0,0 +1,25 @@
+from benchmark.bench import compare
+
+
+def _case(selector, status="ok", **fields):
+    record = {"selector": selector, "dataset": "alon", "k": 10, "status": status}
+    if status == "ok":
+        record.update({"wall_time": 1.0, "evaluations": 100, "fit_memory_mb": 10.0, "quality": {"cv_accuracy": 0.8}})
+    else:
+        record["error"] = "ValueError: boom"
+    record.update(fields)
+    return record
+
+
+def test_errors_fail_whatever_the_baseline():
+    baseline = {"results": [_case("a", status="error"), _case("b")]}
+    report = {"results": [_case("a", status="error"), _case("b", status="timeout"), _case("c", status="error")]}
+    failures = compare(report, baseline)
+    assert len(failures) == 3
+
+
+def test_fit_memory_and_missing_evaluations():
+    baseline = {"results": [_case("a"), _case("b", evaluations=None)]}
+    report = {"results": [_case("a", fit_memory_mb=20.0), _case("b", evaluations=None)]}
+    failures = compare(report, baseline)
+    assert failures == ["alon/a: fit memory 20.0 MB vs baseline 10.0 MB"]
@@ -0,0 +1,31 @@
+import numpy as np
+
+from SPFSR.cache import ScoreCache
+from SPFSR.class2 import SPFSR
+
+
+def _data(seed=0):
+    rng = np.random.default_rng(seed)
+    y = np.array(["normal", "tumor"])[rng.integers(0, 2, 50)]
+    return rng.normal(size=(50, 200)), y
+
+
+def test_fit_with_shared_cache():
+    X, y = _data()
+    cache = ScoreCache(max_entries=1024)
+    first = SPFSR(k=5, max_iter=20, cache=cache, random_state=0).fit(X, y)
+    assert first.cache_misses_ > 0
+    second = SPFSR(k=5, max_iter=20, cache=cache, random_state=0).fit(X, y)
+    assert second.cache_misses_ == 0
+    assert second.cache_hits_ == first.cache_hits_ + first.cache_misses_
+    assert second.admission_order_ == first.admission_order_
+    assert first.transform(X).shape == (50, 5)
+
+
+def test_cache_is_bounded():
+    cache = ScoreCache(max_entries=3)
+    for j in range(5):
+        cache.put(cache.key(b"data", {j}, 10), (0.0, float(j)))
+    assert len(cache) == 3
+    assert cache.get(cache.key(b"data", {0}, 10)) is None
+    assert cache.get(cache.key(b"data", {4}, 10)) == (0.0, 4.0)
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from SPFSR.class1 import SPFSR, fibonacci_numbers
+from SPFSR.gram import SubsetRegression, check_subset_mse, lstsq_mse
+
+
+@pytest.mark.parametrize("n_features, k", [(20, 18), (50, 45), (1000, 10)])
+def test_fit_completes(n_features, k):
+    rng = np.random.default_rng(0)
+    X, y = rng.normal(size=(30, n_features)), rng.normal(size=30)
+    selector = SPFSR(k=k).fit(X, y)
+    first, second = selector.feature_indices_
+    assert 0 <= first < n_features and second == first + 1
+    assert selector.transform(X).shape == (30, 2)
+
+
+def test_objective_scores_the_selected_columns():
+    rng = np.random.default_rng(0)
+    X, y = rng.normal(size=(30, 40)), rng.normal(size=30)
+    selector = SPFSR(k=5).fit(X, y)
+    expected = lstsq_mse(X, y, [7, 8])
+    assert selector._objective_function(7.3, X, y) == pytest.approx(expected)
+    selector._engine = SubsetRegression(X, y)
+    assert selector._objective_function(7.3, X, y) == pytest.approx(expected)
+
+
+def test_fibonacci_numbers():
+    assert fibonacci_numbers(8) == [0, 1, 1, 2, 3, 5, 8, 13]
+    assert fibonacci_numbers(2000)[-1] == np.inf
+
+
+def test_subset_mse_matches_lstsq_along_random_updates():
+    rng = np.random.default_rng(0)
+    X, y = rng.normal(size=(40, 30)).astype(np.float32), rng.normal(size=40)
+    # A copied column is linearly dependent on its original
+    X[:, 29] = X[:, 3]
+    subset, subsets = {0, 3}, []
+    for _ in range(200):
+        step = rng.integers(1, 12)
+        for j in rng.choice(30, size=step, replace=False).tolist():
+            if j in subset and len(subset) > 1:
+                subset.discard(j)
+            elif len(subset) < 15:
+                subset.add(j)
+        subsets.append(sorted(subset))
+    assert check_subset_mse(X, y, subsets, rtol=1e-5) < 1e-6
+
+
+def test_engine_cost_does_not_grow_with_the_features():
+    # A dense Gram matrix of these features would need 320 GB
+    X = np.zeros((10, 200_000), dtype=np.float32)
+    X[:, 150_000:150_002] = np.random.default_rng(0).normal(size=(10, 2))
+    y = X[:, 150_000] + 1.0
+    engine = SubsetRegression(X, y)
+    assert engine.mse([150_000, 150_001]) == pytest.approx(lstsq_mse(X, y, [150_000, 150_001]))
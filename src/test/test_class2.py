@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from SPFSR.class2 import SPFSR
+from SPFSR.kernels import score_subsets, standardize, subset_gram
+
+
+def _planted(n_samples=80, n_features=600, informative=range(500, 520), seed=0):
+    rng = np.random.default_rng(seed)
+    y = rng.integers(0, 2, n_samples)
+    X = rng.normal(size=(n_samples, n_features))
+    X[:, list(informative)] += 1.5 * y[:, None]
+    return X, y
+
+
+def test_finds_planted_columns():
+    X, y = _planted()
+    selector = SPFSR(k=10, max_iter=50, random_state=0).fit(X, y)
+    assert len(set(selector.selected_features_) & set(range(500, 520))) >= 8
+
+
+def test_score_depends_on_the_set():
+    X, y = _planted()
+    Z = standardize(X)
+    grams = [subset_gram(Z, np.arange(500, 520)), subset_gram(Z, np.arange(20))]
+    (_, informative), (_, noise) = score_subsets(grams, y)
+    assert informative < noise
+
+
+def test_random_starts_differ():
+    X, y = _planted()
+    fits = [SPFSR(k=10, max_iter=30, random_state=seed).fit(X, y) for seed in range(3)]
+    assert len({fit.best_score_ for fit in fits}) > 1
+
+
+def test_warm_start_keeps_the_selection_rule():
+    X, y = _planted()
+    cold = SPFSR(k=10, max_iter=30, random_state=0).fit(X, y)
+    warm = SPFSR(k=10, max_iter=30, random_state=0, warm_start=True).fit(X, y)
+    assert warm.admission_order_ == cold.admission_order_
+    # A refit on more rows continues from the previous set
+    warm.fit(np.vstack([X, X[:10]]), np.r_[y, y[:10]])
+    assert len(warm.search_features_) < X.shape[1] - 30
+
+
+def test_warm_start_rescores_the_set_on_the_new_rows():
+    X, y = _planted(n_features=60, informative=range(5))
+    warm = SPFSR(k=5, max_iter=40, random_state=0, warm_start=True).fit(X, y)
+    rng = np.random.default_rng(1)
+    X_new, y_new = np.vstack([X, rng.normal(size=(20, 60))]), np.r_[y, rng.integers(0, 2, 20)]
+    warm.fit(X_new, y_new)
+    # The best score is the one of the final set on all rows, not a stale one
+    grams = subset_gram(standardize(X_new), warm.search_features_)[None]
+    assert warm.best_score_ == pytest.approx(score_subsets(grams, y_new.astype(float), 40, 1e-6)[0][1])
+
+
+def test_candidate_batches_stay_within_the_budget():
+    X, y = _planted(n_features=60, informative=range(5))
+    for max_evaluations in (1, 10, 23):
+        selector = SPFSR(k=5, max_iter=50, n_candidates=4, max_evaluations=max_evaluations, random_state=0).fit(X, y)
+        assert selector.n_evaluations_ == max_evaluations
+        assert selector.stop_reason_ == "max_evaluations"
@@ -0,0 +1,82 @@
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from SPFSR.class3 import SPFSR
+from SPFSR.colindex import column_index
+from SPFSR.kernels import interpolate_batch
+
+
+def _data(n_samples=40, n_features=150, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.normal(size=(n_samples, n_features)), rng.integers(0, 2, n_samples)
+
+
+def test_full_fit_admits_every_feature_once():
+    X, y = _data()
+    selector = SPFSR(n_features=10, random_state=0).fit(X, y)
+    assert sorted(selector.admission_order_) == list(range(X.shape[1]))
+    assert selector.admission_order_[:10] == list(range(10))
+    assert selector.stop_reason_ is None
+
+
+def test_budget_stops_the_fit():
+    X, y = _data()
+    selector = SPFSR(n_features=10, random_state=0, max_evaluations=25).fit(X, y)
+    assert selector.stop_reason_ == "max_evaluations"
+    assert len(selector.admission_order_) == 35
+
+
+def test_candidates_run_in_one_batch():
+    X, y = _data()
+    single = SPFSR(n_features=10, random_state=0, max_evaluations=1).fit(X, y)
+    batched = SPFSR(n_features=10, random_state=0, max_evaluations=4, n_candidates=4).fit(X, y)
+    # The first start draws the same probes, and the batch keeps the lowest of its starts
+    assert batched.best_score_ <= single.best_score_
+    assert batched.n_evaluations_ == 4 and len(batched.admission_order_) == 11
+    # A batch is cut to the evaluations left
+    capped = SPFSR(n_features=10, random_state=0, max_evaluations=10, n_candidates=4).fit(X, y)
+    assert capped.n_evaluations_ == 10 and len(capped.admission_order_) == 13
+
+
+@pytest.mark.parametrize("engine", ["numpy", "numba"])
+def test_kernel_batch_matches_separate_calls(engine):
+    if engine == "numba":
+        pytest.importorskip("numba")
+    X, y = _data()
+    index = column_index(X)
+    rng = np.random.default_rng(1)
+    subsets = [np.sort(rng.choice(150, size=size, replace=False)) for size in (5, 20, 1)]
+    probes = [rng.choice(40, size=3, replace=False) for _ in subsets]
+    batched = interpolate_batch(X, y, index, subsets, probes, engine=engine)
+    assert batched == [interpolate_batch(X, y, index, [s], [p], engine=engine)[0] for s, p in zip(subsets, probes)]
+
+
+def test_duplicate_counter_counts_selected_nearest_features():
+    X, y = _data()
+    selector = SPFSR(n_features=10, random_state=0, trace=True).fit(X, y)
+    duplicates = selector.trace_.counters.get("duplicate_index", 0)
+    assert 0 < duplicates < len(selector.admission_order_) - 10
+
+
+def test_threaded_fit_exits():
+    # numba's parallel kernel used from other threads used to hang the interpreter at exit
+    script = textwrap.dedent("""
+        import threading
+        import numpy as np
+        from SPFSR.class3 import SPFSR
+        rng = np.random.default_rng(0)
+        X, y = rng.normal(size=(40, 150)), rng.integers(0, 2, 40)
+        threads = [threading.Thread(target=SPFSR(n_features=10, random_state=s).fit, args=(X, y)) for s in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        SPFSR(n_features=10, random_state=0).fit(X, y)
+    """)
+    src = Path(__file__).resolve().parent.parent
+    subprocess.run([sys.executable, "-c", script], cwd=src, check=True, timeout=120)
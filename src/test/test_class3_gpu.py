@@ -0,0 +1,67 @@
+import importlib.util
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from FeatureSelection import backend as backends
+
+_spec = importlib.util.spec_from_file_location("SPFSR.class3_gpu", Path(__file__).resolve().parents[1] / "SPFSR" /
+                                               "class3-GPU.py")
+class3_gpu = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(class3_gpu)
+
+
+class LeastSquares:
+    """
+    Residual sum of squares of y regressed on the block; lower is better.
+    """
+
+    def score(self, X, y):
+        coef, *_ = np.linalg.lstsq(X, y, rcond=None)
+        return float(np.sum((y - X @ coef) ** 2))
+
+
+class RecordingBackend(backends.NumpyBackend):
+    name = "recording"
+
+    def __init__(self, n_jobs=None, block_size=2048):
+        super().__init__(n_jobs, block_size)
+        self.calls = {"asarray": 0, "map": 0}
+        RecordingBackend.last = self
+
+    def asarray(self, X, dtype=None):
+        self.calls["asarray"] += 1
+        return super().asarray(X, dtype)
+
+    def map(self, fn, items):
+        self.calls["map"] += 1
+        return super().map(fn, items)
+
+
+def _data(n_samples=40, n_features=25, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_samples, n_features))
+    y = X[:, 3] - 2 * X[:, 17] + 0.1 * rng.normal(size=n_samples)
+    return X, y
+
+
+@pytest.mark.parametrize("n_jobs", [None, 2])
+def test_backend_path_matches_the_cpu_path(monkeypatch, n_jobs):
+    monkeypatch.setitem(backends._BACKENDS, "recording", RecordingBackend)
+    X, y = _data()
+    cpu = class3_gpu.SPFSR_GPU(LeastSquares(), k=4).fit(X, y)
+    device = class3_gpu.SPFSR_GPU(LeastSquares(), k=4, backend="recording", n_jobs=n_jobs).fit(X, y)
+    assert device.admission_order_ == cpu.admission_order_
+    assert device.admission_order_[:2] == [17, 3]
+    assert np.allclose(device.scores_, cpu.scores_)
+    assert np.array_equal(device.support_, cpu.support_) and device.support_.sum() == 4
+    # X and y are moved once, and every round scores its candidates through the backend
+    assert RecordingBackend.last.calls == {"asarray": 2, "map": 4}
+
+
+def test_gpu_flag_selects_the_cupy_backend(monkeypatch):
+    monkeypatch.setitem(backends._BACKENDS, "cupy", RecordingBackend)
+    X, y = _data()
+    selector = class3_gpu.SPFSR_GPU(LeastSquares(), k=3, gpu=True).fit(X, y)
+    assert RecordingBackend.last.calls["map"] == 3 and len(set(selector.admission_order_)) == 3
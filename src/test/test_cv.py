@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+from sklearn.model_selection import StratifiedKFold
+from sklearn.naive_bayes import GaussianNB
+from sklearn.preprocessing import StandardScaler
+
+from FeatureSelection.fs1 import MicroarrayFeatureSelector
+from FeatureSelection.mrmr import MRMRSelector
+from FeatureSelection.plan import copy_estimator, selected_indices
+from SPFSR.cv import SelectionCV
+
+
+def _data(n_samples=60, n_features=80, seed=0):
+    rng = np.random.default_rng(seed)
+    y = np.repeat([0, 1], n_samples // 2)
+    X = rng.normal(size=(n_samples, n_features))
+    X[:, :8] += y[:, None]
+    return X, y
+
+
+@pytest.mark.parametrize("n_jobs", [None, 2])
+def test_fold_selections_match_per_fold_fits(n_jobs):
+    X, y = _data()
+    cv = StratifiedKFold(4, shuffle=True, random_state=0)
+    runner = SelectionCV(MicroarrayFeatureSelector(k=5), {"nb": GaussianNB()}, cv=cv, n_jobs=n_jobs,
+                         prefer="threads")
+    scores = runner.run(X, y)["nb"]
+    for f, (train, test) in enumerate(cv.split(X, y)):
+        scaler = StandardScaler().fit(X[train])
+        indices = selected_indices(MicroarrayFeatureSelector(k=5).fit(scaler.transform(X[train]), y[train]))
+        assert np.array_equal(runner.selections_[None][f], indices)
+        Z = scaler.transform(X)[:, indices]
+        assert scores[f] == pytest.approx(GaussianNB().fit(Z[train], y[train]).score(Z[test], y[test]))
+
+
+def test_selector_without_get_params_is_copied():
+    selector = MRMRSelector(k=3)
+    copied = copy_estimator(selector)
+    assert copied is not selector and copied.k == 3
+    X, y = _data()
+    runner = SelectionCV(selector, {"nb": GaussianNB()}, cv=3)
+    runner.run(X, y)
+    assert not hasattr(selector, "feature_indices_")
+    assert all(len(indices) == 3 for indices in runner.selections_[None])
@@ -0,0 +1,79 @@
+import json
+import shutil
+from pathlib import Path
+
+import numpy as np
+
+from Datasets import cel, loader
+from Datasets.rdata import convert_all, convert_rdata
+
+DATA = Path(__file__).resolve().parents[2] / "data" / "gravier"
+
+
+def _dirs(tmp_path):
+    rdata_dir, csv_dir = tmp_path / "RData", tmp_path / "csv"
+    rdata_dir.mkdir()
+    csv_dir.mkdir()
+    for name in ("alon", "gravier"):
+        shutil.copy(DATA / "RData" / f"{name}.RData", rdata_dir)
+    shutil.copy(DATA / "gravier_csv" / "alon.csv", csv_dir)
+    return rdata_dir, csv_dir, tmp_path / "cache"
+
+
+def test_convert_all_skips_datasets_with_a_csv(tmp_path):
+    rdata_dir, csv_dir, cache_dir = _dirs(tmp_path)
+    metas = convert_all(rdata_dir, cache_dir, csv_dir=csv_dir, n_jobs=1)
+    assert list(metas) == ["gravier"]
+    stored = cache_dir / "gravier.X.float32.npy"
+    mtime = stored.stat().st_mtime_ns
+    # The loader keeps the converted store rather than parsing again
+    assert loader.load_metadata("gravier", csv_dir, cache_dir) == metas["gravier"]
+    assert stored.stat().st_mtime_ns == mtime
+
+
+def test_csv_is_the_source_when_there_is_one(tmp_path):
+    rdata_dir, csv_dir, cache_dir = _dirs(tmp_path)
+    convert_rdata(rdata_dir / "alon.RData", cache_dir)
+    meta = loader.load_metadata("alon", csv_dir, cache_dir)
+    assert Path(meta["source"]["path"]).suffix == ".csv"
+    X, y = loader.load_dataset("alon", csv_dir, cache_dir)
+    assert X.shape == (62, 2000) and np.asarray(y).shape == (62,)
+
+
+def test_cel_ingest_records_unreadable_chips(tmp_path, monkeypatch):
+    root = tmp_path / "cel" / "Acetate"
+    root.mkdir(parents=True)
+    for name in ("a", "b"):
+        (root / f"{name}.CEL").write_text("not a CEL file")
+
+    def unreadable(path):
+        raise ValueError(f"cannot parse {Path(path).name}")
+
+    monkeypatch.setattr(cel, "read_intensities", unreadable)
+    index = cel.ingest(tmp_path / "cel", tmp_path / "out", n_jobs=1)
+    assert index["n_probes"] is None
+    assert [c["status"] for c in index["chips"]] == ["failed", "failed"]
+    assert index["chips"][0]["error"] == "ValueError: cannot parse a.CEL"
+    with open(tmp_path / "out" / cel.INDEX) as handle:
+        assert json.load(handle) == index
+
+
+def test_cel_probe_count_comes_from_the_first_readable_chip(tmp_path, monkeypatch):
+    root = tmp_path / "cel" / "Acetate"
+    root.mkdir(parents=True)
+    for name in ("a", "b"):
+        (root / f"{name}.CEL").write_text("not a CEL file")
+
+    def read_intensities(path):
+        if Path(path).stem == "a":
+            raise ValueError("truncated")
+        return np.zeros(3)
+
+    monkeypatch.setattr(cel, "read_intensities", read_intensities)
+    index = cel.ingest(tmp_path / "cel", tmp_path / "out", n_jobs=1)
+    assert index["n_probes"] == 3
+    assert index["chips"][0]["status"] == "failed" and index["chips"][0]["error"] == "ValueError: truncated"
+    # Written from the probe, not parsed again by a worker that would not see the patched reader
+    assert index["chips"][1]["status"] == "done" and index["chips"][1]["error"] is None
+    matrix, _ = cel.load_intensities(tmp_path / "out")
+    assert np.array_equal(matrix[1], np.zeros(3))
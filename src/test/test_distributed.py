@@ -0,0 +1,90 @@
+import subprocess
+import sys
+import textwrap
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from SPFSR.class2 import SPFSR
+from SPFSR.distributed import Scheduler, gram_remote
+from SPFSR.kernels import standardize, subset_gram
+
+SRC = Path(__file__).resolve().parent.parent
+
+
+def test_class2_scores_the_same_on_workers():
+    rng = np.random.default_rng(0)
+    y = rng.integers(0, 2, 40)
+    X = rng.normal(size=(40, 700))
+    X[:, 600:610] += y[:, None]
+    local = SPFSR(k=5, max_iter=10, random_state=0).fit(X, y)
+    with Scheduler(n_local_workers=1) as scheduler:
+        remote = SPFSR(k=5, max_iter=10, random_state=0, scheduler=scheduler).fit(X, y)
+    assert remote.admission_order_ == local.admission_order_
+    assert remote.best_score_ == local.best_score_
+
+
+def test_concurrent_setups_keep_their_own_data():
+    rng = np.random.default_rng(0)
+    datasets = [rng.normal(size=(30, 300)) for _ in range(3)]
+    columns = np.arange(0, 300, 2)
+    errors = []
+
+    def run(X):
+        expected = subset_gram(standardize(X), columns)
+        for _ in range(25):
+            key = scheduler.setup("gram", X)
+            try:
+                if not np.array_equal(gram_remote(scheduler, key, columns), expected):
+                    errors.append("wrong gram")
+            finally:
+                scheduler.release(key)
+
+    with Scheduler(n_local_workers=2, batches_per_worker=2) as scheduler:
+        threads = [threading.Thread(target=run, args=(X,)) for X in datasets]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert scheduler._setups == {}
+    assert errors == []
+
+
+def test_concurrent_fits_share_a_scheduler():
+    rng = np.random.default_rng(1)
+    fits = []
+    for seed in range(3):
+        y = rng.integers(0, 2, 40)
+        X = rng.normal(size=(40, 300))
+        X[:, 10 * seed:10 * seed + 10] += y[:, None]
+        fits.append((X, y, SPFSR(k=5, max_iter=8, random_state=seed).fit(X, y).admission_order_))
+    results = [None] * len(fits)
+
+    def run(i, X, y):
+        results[i] = SPFSR(k=5, max_iter=8, random_state=i, scheduler=scheduler).fit(X, y).admission_order_
+
+    with Scheduler(n_local_workers=2) as scheduler:
+        threads = [threading.Thread(target=run, args=(i, X, y)) for i, (X, y, _) in enumerate(fits)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert results == [local for _, _, local in fits]
+
+
+def test_dead_local_workers_fail_fast(tmp_path):
+    # No __main__ guard: the spawned worker dies while importing this script
+    script = tmp_path / "unguarded.py"
+    script.write_text(textwrap.dedent(f"""
+        import sys
+        sys.path.insert(0, {str(SRC)!r})
+        import numpy as np
+        from SPFSR.distributed import Scheduler
+        scheduler = Scheduler(n_local_workers=1).start()
+        key = scheduler.setup("gram", np.ones((4, 4)))
+        scheduler.map(key, [[[0, 1]]])
+    """))
+    result = subprocess.run([sys.executable, str(script)], capture_output=True, text=True, timeout=120)
+    assert result.returncode != 0
+    assert "all local workers exited" in result.stderr
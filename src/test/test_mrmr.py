@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from FeatureSelection.mrmr import CorrelationCache, MRMRSelector
+
+
+def _data(n_samples=30, n_features=50, seed=0):
+    rng = np.random.default_rng(seed)
+    y = np.repeat([0, 1], n_samples // 2)
+    X = rng.normal(size=(n_samples, n_features))
+    X[:, :5] += y[:, None]
+    return X, y
+
+
+@pytest.mark.parametrize("tile_size", [7, 16, 64])
+def test_cached_correlations_match_corrcoef(tile_size):
+    X, _ = _data()
+    X[:, 3] = 0.0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # A constant column has no correlation; the cache reports 0 for it
+        expected = np.nan_to_num(np.corrcoef(X.T))
+    cache = CorrelationCache(X, tile_size=tile_size, dtype=np.float64)
+    columns = np.arange(X.shape[1])
+    for i in (0, 3, 20, 49):
+        assert np.allclose(cache.correlations(i, columns), expected[i])
+
+
+def test_eviction_keeps_correlations_exact():
+    X, _ = _data()
+    # Room for two standardized 30 x 8 tiles, so most queries recompute evicted ones
+    cache = CorrelationCache(X, tile_size=8, max_bytes=4096, dtype=np.float64)
+    expected = np.corrcoef(X.T)
+    for i in (1, 45, 17, 1):
+        assert np.allclose(cache.correlations(i, np.arange(50)), expected[i])
+    assert cache.evictions > 0 and cache.info()["bytes"] <= 4096
+
+
+def test_mrmr_follows_the_greedy_rule():
+    X, y = _data()
+    selector = MRMRSelector(k=6, tile_size=16).fit(X, y)
+    relevance = selector.scores_ / selector.scores_.max()
+    correlations = np.abs(np.corrcoef(X.T))
+    order = selector.admission_order_.tolist()
+    assert order[0] == int(np.argmax(relevance))
+    for step in range(1, len(order)):
+        rest = [j for j in range(X.shape[1]) if j not in order[:step]]
+        gain = relevance[rest] - correlations[np.ix_(order[:step], rest)].mean(axis=0)
+        assert order[step] == rest[int(np.argmax(gain))]
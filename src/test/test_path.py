@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from FeatureSelection.fs1 import MicroarrayFeatureSelector
+from FeatureSelection.mrmr import MRMRSelector
+from FeatureSelection.path import SelectionPath
+from SPFSR.class3 import SPFSR
+
+
+def _data(n_samples=40, n_features=60, seed=0):
+    rng = np.random.default_rng(seed)
+    y = np.repeat([0, 1], n_samples // 2)
+    X = rng.normal(size=(n_samples, n_features))
+    X[:, :6] += y[:, None]
+    return X, y
+
+
+@pytest.mark.parametrize("selector", [MRMRSelector(k=20, tile_size=16), MicroarrayFeatureSelector(k=20),
+                                      SPFSR(n_features=2, random_state=0)])
+def test_path_indices_are_nested(selector):
+    X, y = _data()
+    path = selector.fit_path(X, y, [2, 5, 10, 20])
+    for small, large in zip(path.ks, path.ks[1:]):
+        assert np.array_equal(path.indices(large)[:small], path.indices(small))
+        assert len(set(path.indices(large).tolist())) == large
+
+
+def test_path_matches_separate_mrmr_fits():
+    X, y = _data()
+    path = MRMRSelector(k=20, tile_size=16).fit_path(X, y, [3, 7, 20])
+    for k in path.ks:
+        assert np.array_equal(np.sort(path.indices(k)), MRMRSelector(k=k, tile_size=16).fit(X, y).feature_indices_)
+
+
+def test_transform_returns_views_of_the_largest_selection():
+    X, _ = _data()
+    path = SelectionPath([5, 1, 9, 3], [1, 3])
+    selected = path.transform(X)
+    assert np.array_equal(selected[3], X[:, [5, 1, 9]])
+    assert np.shares_memory(selected[1], selected[3])
+    with pytest.raises(ValueError):
+        SelectionPath([5, 1], [3])
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from SPFSR.class3 import SPFSR
+from SPFSR.portfolio import MultiStart
+
+
+def _data(n_samples=30, n_features=40, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.normal(size=(n_samples, n_features)), rng.integers(0, 2, n_samples)
+
+
+def _portfolio(random_state=0):
+    return MultiStart(SPFSR(n_features=2, max_evaluations=15), n_starts=3, cancel_margin=None, n_jobs=2,
+                      prefer="threads", random_state=random_state)
+
+
+def test_restarts_follow_their_spawned_seeds():
+    X, y = _data()
+    portfolio = _portfolio().fit(X, y)
+    seeds = np.random.SeedSequence(0).spawn(3)
+    for estimator, seed in zip(portfolio.estimators_, seeds):
+        alone = SPFSR(n_features=2, max_evaluations=15, random_state=np.random.default_rng(seed)).fit(X, y)
+        assert estimator.admission_order_ == alone.admission_order_
+        assert estimator.best_score_ == pytest.approx(alone.best_score_)
+    # Every restart draws its own stream, so they do not repeat each other
+    orders = {tuple(estimator.admission_order_) for estimator in portfolio.estimators_}
+    assert len(orders) == 3
+
+
+def test_restarts_ignore_the_global_state():
+    X, y = _data()
+    np.random.seed(1)
+    first = _portfolio().fit(X, y)
+    np.random.seed(2)
+    second = _portfolio().fit(X, y)
+    assert np.array_equal(first.scores_, second.scores_)
+    assert first.best_index_ == second.best_index_ and first.best_score_ == np.nanmin(first.scores_)
@@ -0,0 +1,61 @@
+import numpy as np
+
+from FeatureSelection.fs1 import MicroarrayFeatureSelector
+from FeatureSelection.resultcache import ResultCache, _source_files, sampled_digest
+from SPFSR.cache import ScoreCache
+from SPFSR.class2 import SPFSR
+
+
+def test_digest_covers_every_column():
+    X = np.random.default_rng(0).normal(size=(20, 3000)).astype(np.float32)
+    digest = sampled_digest(X)
+    for column in range(0, 3000, 97):
+        changed = X.copy()
+        changed[0, column] += 1
+        assert sampled_digest(changed) != digest
+
+
+def test_keys_do_not_depend_on_object_identity():
+    X, y = np.zeros((4, 5)), np.arange(4)
+    cache = ResultCache()
+    first = SPFSR(k=2, cache=ScoreCache(), callback=lambda info: False)
+    second = SPFSR(k=2, cache=ScoreCache(), callback=lambda info: False)
+    assert cache.key(first, X, y) == cache.key(second, X, y)
+    assert cache.key(first, X, y) != cache.key(SPFSR(k=3, cache=ScoreCache()), X, y)
+
+
+def test_random_states_are_keyed_by_their_state():
+    X, y = np.zeros((4, 5)), np.arange(4)
+    cache = ResultCache()
+
+    def key(random_state):
+        return cache.key(SPFSR(k=2, random_state=random_state), X, y)
+
+    assert key(np.random.default_rng(1)) == key(np.random.default_rng(1))
+    assert key(np.random.default_rng(1)) != key(np.random.default_rng(2))
+    assert key(np.random.RandomState(1)) != key(np.random.RandomState(2))
+    assert key(np.random.SeedSequence(1)) != key(np.random.SeedSequence(2))
+    root = np.random.SeedSequence(1)
+    first, second = root.spawn(2)
+    assert key(first) != key(second)
+    # A generator that has been drawn from is in another state
+    rng = np.random.default_rng(1)
+    before = key(rng)
+    rng.random()
+    assert key(rng) != before
+
+
+def test_code_version_covers_the_modules_a_selector_uses():
+    names = {path.name for path in _source_files(SPFSR())}
+    assert {"class2.py", "kernels.py", "colindex.py", "streaming.py"} <= names
+    assert "fs1.py" in {path.name for path in _source_files(MicroarrayFeatureSelector())}
+
+
+def test_fit_round_trip(tmp_path):
+    X = np.random.default_rng(0).normal(size=(30, 50))
+    y = np.repeat([0, 1], 15)
+    cache = ResultCache(tmp_path)
+    fitted = cache.fit(MicroarrayFeatureSelector(k=5), X, y)
+    loaded = cache.fit(MicroarrayFeatureSelector(k=5), X, y)
+    assert cache.hits == 1
+    assert list(loaded.feature_indices_) == list(fitted.feature_indices_)
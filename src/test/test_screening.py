@@ -0,0 +1,55 @@
+import numpy as np
+
+from SPFSR import class3
+from SPFSR.class2 import SPFSR
+from SPFSR.screening import ScreenedSelector, wrapper_evaluations
+
+
+def _data(n_samples=60, n_features=300, seed=0):
+    rng = np.random.default_rng(seed)
+    y = rng.integers(0, 2, n_samples)
+    X = rng.normal(size=(n_samples, n_features))
+    X[:, :10] += 1.5 * y[:, None]
+    return X, y
+
+
+def test_class2_estimate_counts_interpolations():
+    X, y = _data()
+    wrapper = SPFSR(k=5, max_iter=30, random_state=0)
+    fitted = SPFSR(k=5, max_iter=30, random_state=0).fit(X[:, :100], y)
+    assert fitted.n_evaluations_ <= wrapper_evaluations(wrapper, 100)
+    # The estimate is in the unit of max_evaluations, not in column products
+    assert wrapper_evaluations(wrapper, 100) == 31
+
+
+def test_class3_estimate_counts_interpolations():
+    X, y = _data()
+    wrapper = class3.SPFSR(n_features=5, n_candidates=2, random_state=0)
+    fitted = class3.SPFSR(n_features=5, n_candidates=2, random_state=0).fit(X[:, :40], y)
+    assert fitted.n_evaluations_ == wrapper_evaluations(wrapper, 40) == 70
+    assert wrapper_evaluations(class3.SPFSR(n_features=5, max_evaluations=20), 40) == 20
+
+
+def test_budget_reaches_the_wrapper():
+    X, y = _data()
+    selector = ScreenedSelector(SPFSR(k=5, max_iter=30, random_state=0), max_evaluations=12,
+                                min_pool=20).fit(X, y)
+    assert selector.wrapper_.max_evaluations == 12
+    assert selector.wrapper_.n_evaluations_ <= 12
+
+
+def test_wrapper_keeps_a_tighter_budget():
+    X, y = _data()
+    selector = ScreenedSelector(SPFSR(k=5, max_iter=30, max_evaluations=5, random_state=0),
+                                max_evaluations=2000, min_pool=20).fit(X, y)
+    assert selector.wrapper_.max_evaluations == 5
+
+
+def test_pilot_is_deducted():
+    X, y = _data()
+    selector = ScreenedSelector(SPFSR(k=5, max_iter=30, random_state=0), max_evaluations=100,
+                                max_seconds=60.0, min_pool=20, max_pool=200).fit(X, y)
+    # The rest after the pilot still covers a full fit, so the pool is not cut
+    assert selector.pool_size_ == 200
+    assert 100 - 31 <= selector.wrapper_.max_evaluations < 100
+    assert selector.wrapper_.max_seconds < 60.0
@@ -0,0 +1,30 @@
+import numpy as np
+from sklearn.naive_bayes import GaussianNB
+
+from SPFSR.spsa import SpFSR
+
+
+def _data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(60, 12))
+    y = (X[:, 3] + X[:, 7] > 0).astype(int)
+    return X, y
+
+
+def test_selection_is_the_head_of_the_ranking():
+    X, y = _data()
+    for n_features in (0, 3):
+        selector = SpFSR(GaussianNB(), n_features=n_features, cv=3, max_iter=8, random_state=0).fit(X, y)
+        k = len(selector.selected_features_)
+        np.testing.assert_array_equal(selector.selected_features_, selector.admission_order_[:k])
+        if n_features:
+            assert k == n_features
+
+
+def test_max_iter_zero_returns_the_initial_ranking():
+    X, y = _data()
+    selector = SpFSR(GaussianNB(), n_features=2, cv=3, max_iter=0).fit(X, y)
+    assert selector.n_iter_ == 0
+    assert selector.n_evaluations_ == 0
+    np.testing.assert_array_equal(selector.selected_features_, [0, 1])
+    assert np.isnan(selector.best_score_)
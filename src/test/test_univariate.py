@@ -0,0 +1,68 @@
+import importlib.util
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from FeatureSelection.univariate import select_top_k, univariate_scores
+
+
+def _data(n_classes=2, seed=0):
+    rng = np.random.default_rng(seed)
+    y = np.repeat(np.arange(n_classes), 15)
+    X = rng.normal(size=(len(y), 40))
+    X[:, :5] += y[:, None]
+    return X, y
+
+
+def test_binary_scores_match_scipy():
+    X, y = _data()
+    labels = np.where(y == 1, "t", "n")
+    scores = univariate_scores(X, labels)
+    a, b = X[y == 0], X[y == 1]
+    welch = np.abs(b.mean(0) - a.mean(0)) / np.sqrt(b.var(0) / len(b) + a.var(0) / len(a))
+    np.testing.assert_allclose(scores["welch_t"], welch)
+    np.testing.assert_allclose(scores["anova_f"], stats.f_oneway(a, b).statistic)
+    biserial = [stats.pointbiserialr(y, x).statistic for x in X.T]
+    np.testing.assert_allclose(scores["point_biserial"], np.abs(biserial))
+    p = stats.mannwhitneyu(b, a, use_continuity=False, method="asymptotic").pvalue
+    np.testing.assert_allclose(scores["rank_sum"], stats.norm.isf(p / 2))
+
+
+def test_multiclass_scores_match_scipy():
+    X, y = _data(n_classes=3)
+    scores = univariate_scores(X, y, statistics=("anova_f", "rank_sum"))
+    groups = [X[y == c] for c in range(3)]
+    np.testing.assert_allclose(scores["anova_f"], stats.f_oneway(*groups).statistic)
+    np.testing.assert_allclose(scores["rank_sum"], stats.kruskal(*groups).statistic)
+    with pytest.raises(ValueError):
+        univariate_scores(X, y, statistics=("welch_t",))
+
+
+def test_select_top_k_ranks_best_first():
+    scores = np.array([0.5, np.nan, 3.0, 1.0, 2.0])
+    assert select_top_k(scores, 3).tolist() == [2, 4, 3]
+    assert select_top_k(scores, 10)[-1] == 1
+
+
+def _load_test1():
+    spec = importlib.util.spec_from_file_location("spfsr_test1", Path(__file__).resolve().parent / "test1.py")
+    test1 = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(test1)
+    return test1
+
+
+@pytest.mark.parametrize("labels", [lambda y: y, lambda y: np.where(y == 1, "t", "n")])
+def test_spfsr_feature_selection_accepts_integer_and_string_labels(labels):
+    test1 = _load_test1()
+    X, y = _data()
+    selected = test1.SPFSR_feature_selection(pd.DataFrame(X), labels(y), 10)
+    assert len(selected) == 2 and set(selected.tolist()) <= set(range(40))
+
+
+def test_spfsr_feature_selection_accepts_multiclass_labels():
+    X, y = _data(n_classes=4)
+    selected = _load_test1().SPFSR_feature_selection(pd.DataFrame(X), y, 10)
+    assert len(selected) == 2 and set(selected.tolist()) <= set(range(40))